@@ -2,7 +2,13 @@ import tkinter as tk
 from tkinter import messagebox
 from PIL import Image, ImageTk, ImageDraw
 from audio import AudioManager
-from game import GameController
+from game import GameController, PileChange
+from moves import DISCARD_TO_FOUNDATION, TABLEAU_TO_FOUNDATION
+from hints import HintService
+from solvecache import SolveCache
+from sprites import SpriteCache
+from scene import CardScene
+from hitindex import HitIndex
 from cartes import Card
 
 
@@ -30,18 +36,20 @@ class SolitaireApp:
         tableau_start_y (int): Position Y de départ du tableau (7 colonnes).
         column_spacing (int): Espacement entre les colonnes du tableau.
 
-        image_refs (list): Liste des références d'images PhotoImage pour éviter
+        sprites (SpriteCache): Cache des images de cartes (faces et dos), chargées
+            une seule fois ; il garde aussi les références PhotoImage pour éviter
             le garbage collection de Tkinter.
-        card_zones (dict): Dictionnaire mappant zone_id → métadonnées de zone
-            pour la détection des clics. Structure: {zone_id: {x1, y1, x2, y2, 
-            type, ...}}
+        hit_index (HitIndex): Index spatial des zones cliquables, mis à jour
+            région par région lors du calcul de la disposition. Chaque zone est
+            un dict {x1, y1, x2, y2, type, ...} identifié par un zone_id.
 selected_card (None): Réservé pour système de sélection (non utilisé).
         selected_cards_count (int): Nombre de cartes sélectionnées (non utilisé).
         selected_zone (tuple): Zone actuellement sélectionnée (zone_id, zone_dict).
 
         dragging (bool): True si un drag est en cours, False sinon.
         drag_start_zone (dict): Métadonnées de la zone où le drag a commencé.
-        drag_cards_images (list): Liste des images PhotoImage des cartes en drag.
+        drag_card_ids (list): Identifiants des cartes déplacées pendant le drag ;
+            leurs items du canvas sont déplacés directement (tag "dragging").
         current_mousepos (tuple): Position actuelle (x, y) de la souris.
 
 
@@ -65,6 +73,14 @@ root = tk.Tk()
         avec le format: {valeur}
 {famille}.gif et dos_de_carte.webp
     """
+    # Auto-completion pacing (ms)
+    AUTO_STEP_DELAY = 60
+    AUTO_FRAME_DELAY = 15
+    AUTO_ANIMATION_FRAMES = 6
+
+    # Positions kept by the hint cache (a few megabytes on disk)
+    HINT_CACHE_ENTRIES = 20_000
+
     def __init__(self, root: tk.Tk, menu_root: tk.Tk = None) -> None:
         self.root = root
         self.root.title("Solitaire")
@@ -72,14 +88,12 @@ root = tk.Tk()
         self.root.configure(bg="darkgreen")
 
         # Game initialization
+        self._auto_moves = []
+        self._auto_job = None
         self.game = GameController()
-        self.game._redraw_callback = self._redraw
+        self._subscribe_game()
         # store menu root to return to it on victory
         self._menu_root = menu_root
-        try:
-            self.game.on_victory = self._on_victory
-        except Exception:
-            pass
 
         self.audio = AudioManager()
         self.audio.play_music()
@@ -193,27 +207,48 @@ root = tk.Tk()
         self.tableau_start_y = 300
         self.column_spacing = 150
 
-        # List to keep image references
-        self.image_refs = []
+        # Card images, decoded once for the whole session, and the canvas
+        # items kept from one redraw to the next
+        self.sprites = SpriteCache()
+        self.sprites.preload()
+        self.scene = CardScene(self.canvas, self.sprites)
 
         # Selection system
         self.selected_card = None
         self.selected_cards_count = 0
         self.selected_zone = None
 
-        # Dictionary to store clickable zones for each card
-        self.card_zones = {}
+        # Clickable zones of each card, indexed by position
+        self.hit_index = HitIndex()
+
+        # Background hint search; the current hint is shown on the canvas
+        # until the player moves. Solved positions are kept in a small cache
+        # in the game's data directory (see solvecache.data_dir)
+        self.hint_service = HintService(
+            max_seconds=3.0, cache=SolveCache(max_entries=self.HINT_CACHE_ENTRIES)
+        )
+        self._hint_key = None
+        self._hint_text = ""
+        self._hint_poll_job = None
 
         # Variables pour le drag-and-drop
         self.dragging = False
         self.drag_start_zone = None
-        self.drag_cards_images = []
+        self.drag_card_ids = []
+        self._drag_last_pos = (0, 0)
+        self._drag_job = None
         self.current_mouse_pos = (0, 0)
 
         # Bind mouse events
         self.canvas.bind("<ButtonPress-1>", self.on_mouse_press)
         self.canvas.bind("<ButtonRelease-1>", self.on_mouse_release)
         self.canvas.bind("<Motion>", self.on_mouse_motion)
+        # Window closed (or Escape): stop pending callbacks
+        self.canvas.bind("<Destroy>", self._on_destroy)
+
+        # Regions waiting for the next (idle) repaint
+        self._dirty = set()
+        self._flush_job = None
 
         # First display
         self._redraw()
@@ -258,22 +293,23 @@ root = tk.Tk()
         if messagebox.askyesno(
             "Nouvelle Partie", "Voulez-vous vraiment recommencer une nouvelle partie ?"
         ):
+            self._cancel_auto_complete()
             self.game = GameController()
-            self.game._redraw_callback = self._redraw
+            self._subscribe_game()
             self.selected_card = None
             self.selected_cards_count = 0
             self.selected_zone = None
-            self.card_zones.clear()
-            self.image_refs.clear()
-            self.dragging = False
-            self.drag_cards_images.clear()
+            self.hit_index.clear()
+            self._end_drag()
             self._redraw()
 
     def undo_move(self) -> None:
         """Undo the last move."""
         if self.game.save.history:
+            self._cancel_auto_complete()
             self.game.undo_move()
-            self._redraw()
+            # The piles are repainted from the "change" event
+            self.invalidate("info")
         else:
             messagebox.showinfo("Annuler", "Aucun coup à annuler.")
 
@@ -294,227 +330,192 @@ root = tk.Tk()
                     pass
 
     def show_hint(self) -> None:
-        """Show a hint to the player."""
-        hint = self.game.get_hint_message()
-        if hint:
-            message = hint.get("message", "Aucun indice disponible")
-
-            if hint.get("type") == "discard_to_foundation":
-                title = "💡 Excellent coup !"
-                detailed_message = (
-                    f"✨ {message}\n\n🎯 C'est le meilleur coup à jouer !"
+        """Start a background hint search; hints are displayed as they arrive."""
+        self.hint_service.start(self.game)
+        self._hint_key = (self.game, self.game.turns)
+        self._hint_text = "💡 Recherche d'un indice..."
+        self.invalidate("info")
+        if self._hint_poll_job is None:
+            self._hint_poll_job = self.root.after(50, self._poll_hint)
+
+    def _poll_hint(self) -> None:
+        """Display the hints published by the background search."""
+        self._hint_poll_job = None
+        for hint, final in self.hint_service.poll():
+            title, detailed_message = self._format_hint(hint)
+            if final and hint.get("exact") and hint.get("solver") == "won":
+                detailed_message += "\n\n🏆 Ce coup mène à une victoire."
+            elif final and hint.get("exact") and hint.get("solver") == "lost":
+                detailed_message += "\n\n⚠️ La partie ne peut plus être gagnée."
+            elif final and hint.get("solver") == "won":
+                detailed_message += (
+                    f"\n\n🏆 Ce coup gagne dans {hint['wins']} des "
+                    f"{hint['samples']} donnes simulées."
+                )
+            elif final and hint.get("solver") == "lost":
+                detailed_message += (
+                    f"\n\n⚠️ Aucune des {hint['samples']} donnes simulées "
+                    "ne peut être gagnée."
                 )
-            elif hint.get("type") == "tableau_to_foundation":
-                title = "💡 Excellent coup !"
+            self._hint_text = f"{title}\n{detailed_message}"
+            self.invalidate("info")
+        if self.hint_service.running:
+            self._hint_poll_job = self.root.after(50, self._poll_hint)
+
+    def _cancel_hint_if_moved(self) -> None:
+        """Drop the displayed hint once the player has played a move."""
+        if self._hint_key is not None and self._hint_key != (self.game, self.game.turns):
+            self.hint_service.cancel()
+            self._hint_key = None
+            self._hint_text = ""
+
+    def _format_hint(self, hint: dict) -> tuple:
+        """Return the (title, detailed message) shown for a hint."""
+        message = hint.get("message", "Aucun indice disponible")
+
+        if hint.get("type") == "discard_to_foundation":
+            title = "💡 Excellent coup !"
+            detailed_message = (
+                f"✨ {message}\n\n🎯 C'est le meilleur coup à jouer !"
+            )
+        elif hint.get("type") == "tableau_to_foundation":
+            title = "💡 Excellent coup !"
+            detailed_message = (
+                f"✨ {message}\n\n🎯 C'est le meilleur coup à jouer !"
+            )
+        elif hint.get("type") == "tableau_to_tableau_reveal":
+            title = "💡 Bon coup !"
+            detailed_message = f"✨ {message}\n\n🔓 Cela révélera une carte cachée."
+        elif hint.get("type") == "discard_to_tableau":
+            title = "💡 Coup possible"
+            detailed_message = f"✨ {message}\n\n📝 Un coup valide pour progresser."
+        elif hint.get("type") == "tableau_to_tableau":
+            title = "💡 Coup possible"
+            num_cards = hint.get("num_cards", 1)
+            if num_cards > 1:
                 detailed_message = (
-                    f"✨ {message}\n\n🎯 C'est le meilleur coup à jouer !"
+                    f"✨ {message}\n\n📚 Déplacez {num_cards} cartes ensemble."
                 )
-            elif hint.get("type") == "tableau_to_tableau_reveal":
-                title = "💡 Bon coup !"
-                detailed_message = f"✨ {message}\n\n🔓 Cela révélera une carte cachée."
-            elif hint.get("type") == "discard_to_tableau":
-                title = "💡 Coup possible"
-                detailed_message = f"✨ {message}\n\n📝 Un coup valide pour progresser."
-            elif hint.get("type") == "tableau_to_tableau":
-                title = "💡 Coup possible"
-                num_cards = hint.get("num_cards", 1)
-                if num_cards > 1:
-                    detailed_message = (
-                        f"✨ {message}\n\n📚 Déplacez {num_cards} cartes ensemble."
-                    )
-                else:
-                    detailed_message = f"✨ {message}"
-            elif hint.get("type") == "draw_stock":
-                title = "💡 Action suggérée"
-                detailed_message = "✨ Piochez 3 nouvelles cartes du stock\n\n🎴 Cela peut débloquer de nouvelles possibilités."
-            elif hint.get("type") == "recycle_stock":
-                title = "💡 Action suggérée"
-                detailed_message = "✨ Recyclez la défausse vers le stock\n\n♻️ Pour continuer à piocher des cartes."
             else:
-                title = "💡 Indice"
-                detailed_message = message
-
-            messagebox.showinfo(title, detailed_message)
+                detailed_message = f"✨ {message}"
+        elif hint.get("type") == "draw_stock":
+            title = "💡 Action suggérée"
+            detailed_message = "✨ Piochez 3 nouvelles cartes du stock\n\n🎴 Cela peut débloquer de nouvelles possibilités."
+        elif hint.get("type") == "recycle_stock":
+            title = "💡 Action suggérée"
+            detailed_message = "✨ Recyclez la défausse vers le stock\n\n♻️ Pour continuer à piocher des cartes."
         else:
-            messagebox.showinfo(
-                "💡 Indice",
-                "Aucun coup évident disponible.\n\nEssayez de piocher ou de réorganiser les colonnes.",
-            )
-
-    def load_card_image(self, card: Card) -> ImageTk.PhotoImage:
-        """Load a card image (or back if face down)."""
-        if not card.face:
-            img = Image.open("assets/cartes/dos_de_carte.jpg")
-        else:
-            img = Image.open(f"assets/cartes/{card.value}_{card.family}.png")
-        img = img.resize((100, 150))
-
-        img = self._round_corners(img, radius=5)
-
-        photo = ImageTk.PhotoImage(img)
-        self.image_refs.append(photo)
-        return photo
-
-    def _round_corners(self, img: Image.Image, radius: int = 15) -> Image.Image:
-        """Arrondir les coins d'une image."""
-        # Créer un masque circulaire
-        mask = Image.new("L", img.size, 0)
-        draw = ImageDraw.Draw(mask)
+            title = "💡 Indice"
+            detailed_message = message
 
-        # Dessiner les coins arrondis
-        draw.rounded_rectangle([(0, 0), img.size], radius=radius, fill=255)
+        return title, detailed_message
 
-        # Appliquer le masque
-        img.putalpha(mask)
-        return img
-
-    def draw_game(self) -> None:
-        """Update the entire graphical display of the game."""
-        self._normalize_columns()
-        self.canvas.delete("all")
-        self.image_refs.clear()
-        self.card_zones.clear()
+    def load_card_image(self, card: Card) -> ImageTk.PhotoImage:
+        """Return a card image (or back if face down) from the sprite cache."""
+        return self.sprites.get(card.id, card.face)
+
+    def _regions(self) -> list:
+        """Names of the table regions, each drawn independently."""
+        return (
+            ["stock", "discard"]
+            + [f"final_{i}" for i in range(len(self.game.final_piles))]
+            + [f"tableau_{i}" for i in range(len(self.game.grid.game))]
+        )
 
-        # Stock
+    def _layout_region(self, region: str) -> tuple:
+        """Return (cards, decor, zones) describing what a region shows.
+
+        cards is a list of (card_id, x, y, face) from bottom to top, decor the
+        placeholder items drawn under them (see CardScene.update) and zones
+        the clickable zones of the region, keyed by zone id.
+        """
+        if region == "stock":
+            return self._layout_stock()
+        if region == "discard":
+            return self._layout_discard()
+        kind, index = region.rsplit("_", 1)
+        if kind == "final":
+            return self._layout_foundation(int(index))
+        return self._layout_column(int(index))
+
+    def _layout_stock(self) -> tuple:
+        x, y = self.stock_position
+        zones = {
+            "stock": {"x1": x, "y1": y, "x2": x + 100, "y2": y + 150, "type": "stock"}
+        }
         if not self.game.stock.is_empty():
-            stock_img = Image.open("assets/cartes/dos_de_carte.jpg").resize((100, 150))
-            stock_img = self._round_corners(stock_img, radius=5)
-            stock_photo = ImageTk.PhotoImage(stock_img)
-            self.image_refs.append(stock_photo)
-            self.canvas.create_image(
-                self.stock_position[0],
-                self.stock_position[1],
-                image=stock_photo,
-                anchor="nw",
-                tags="stock",
+            return [(self.game.stock.peek().id, x, y, False)], (), zones
+        decor = (
+            (
+                "rectangle",
+                (x, y, x + 100, y + 150),
+                {"fill": "darkgreen", "outline": "white", "width": 2, "dash": (5, 5)},
+            ),
+            (
+                "text",
+                (x + 50, y + 75),
+                {"text": "♻️\nRecycler", "fill": "white", "font": ("Arial", 10)},
+            ),
+        )
+        return [], decor, zones
+
+    def _layout_discard(self) -> tuple:
+        x, y = self.discard_position
+        visible_cards = self.game.discard_pile.visible()
+        if not visible_cards:
+            decor = (
+                ("rectangle", (x, y, x + 100, y + 150), {"outline": "white", "width": 2}),
             )
-            self.card_zones["stock"] = {
-                "x1": self.stock_position[0],
-                "y1": self.stock_position[1],
-                "x2": self.stock_position[0] + 100,
-                "y2": self.stock_position[1] + 150,
-                "type": "stock",
+            return [], decor, {}
+
+        card_offset = 30
+        cards, zones = [], {}
+        for i, card in enumerate(visible_cards):
+            x_pos = x + i * card_offset
+            is_last = i == len(visible_cards) - 1
+            cards.append((card.id, x_pos, y, True))
+            zones[f"discard_{i}"] = {
+                "x1": x_pos,
+                "y1": y,
+                "x2": x_pos + 100,
+                "y2": y + (150 if is_last else card_offset),
+                "type": "discard",
+                "index": i,
+                "is_last": is_last,
+                "card_id": card.id,
             }
-        else:
-            self.canvas.create_rectangle(
-                self.stock_position[0],
-                self.stock_position[1],
-                self.stock_position[0] + 100,
-                self.stock_position[1] + 150,
-                fill="darkgreen",
-                outline="white",
-                width=2,
-                dash=(5, 5),
-                tags="stock",
-            )
-            self.canvas.create_text(
-                self.stock_position[0] + 50,
-                self.stock_position[1] + 75,
-                text="♻️\nRecycler",
-                fill="white",
-                font=("Arial", 10),
+        return cards, (), zones
+
+    def _layout_foundation(self, i: int) -> tuple:
+        pile = self.game.final_piles[i]
+        x = self.foundation_start_x + i * self.foundation_spacing
+        zone = {"x1": x, "y1": 100, "x2": x + 100, "y2": 250, "type": "final", "index": i}
+        if pile.is_empty():
+            zone["is_empty"] = True
+            decor = (("rectangle", (x, 100, x + 100, 250), {"outline": "white", "width": 2}),)
+            return [], decor, {f"final_{i}": zone}
+        top_card = pile.peek()
+        zone["card_id"] = top_card.id
+        return [(top_card.id, x, 100, True)], (), {f"final_{i}": zone}
+
+    def _layout_column(self, i: int) -> tuple:
+        queue, stack = self._pile_objects(i)
+        x = 100 + i * self.column_spacing
+        y = self.tableau_start_y
+        offset = 30
+        n_queue = queue.size()
+        n_stack = stack.size()
+
+        if n_queue == 0 and n_stack == 0:
+            decor = (
+                (
+                    "rectangle",
+                    (x, y, x + 100, y + 150),
+                    {"outline": "white", "width": 2, "dash": (5, 5)},
+                ),
             )
-            self.card_zones["stock"] = {
-                "x1": self.stock_position[0],
-                "y1": self.stock_position[1],
-                "x2": self.stock_position[0] + 100,
-                "y2": self.stock_position[1] + 150,
-                "type": "stock",
-            }
-
-        # Discard pile
-        if not self.game.discard_pile.is_empty():
-            visible_cards = self.game.discard_pile.visible()
-            if visible_cards:
-                card_offset = 30
-                for i, card in enumerate(visible_cards):
-                    card.face = True
-                    img = self.load_card_image(card)
-                    if img:
-                        x_pos = self.discard_position[0] + (i * card_offset)
-                        self.canvas.create_image(
-                            x_pos,
-                            self.discard_position[1],
-                            image=img,
-                            anchor="nw",
-                            tags=f"discard_{i}",
-                        )
-                        is_last = i == len(visible_cards) - 1
-                        self.card_zones[f"discard_{i}"] = {
-                            "x1": x_pos,
-                            "y1": self.discard_position[1],
-                            "x2": x_pos + 100,
-                            "y2": self.discard_position[1]
-                            + (150 if is_last else card_offset),
-                            "type": "discard",
-                            "index": i,
-                            "is_last": is_last,
-                        }
-        else:
-            self.canvas.create_rectangle(
-                self.discard_position[0],
-                self.discard_position[1],
-                self.discard_position[0] + 100,
-                self.discard_position[1] + 150,
-                outline="white",
-                width=2,
-            )
-
-        # Foundation piles
-        for i, pile in enumerate(self.game.final_piles):
-            x = self.foundation_start_x + i * self.foundation_spacing
-            if not pile.is_empty():
-                top_card = pile.peek()
-                top_card.face = True
-                img = self.load_card_image(top_card)
-                if img:
-                    self.canvas.create_image(
-                        x, 100, image=img, anchor="nw", tags=f"final_{i}"
-                    )
-                    self.card_zones[f"final_{i}"] = {
-                        "x1": x,
-                        "y1": 100,
-                        "x2": x + 100,
-                        "y2": 250,
-                        "type": "final",
-                        "index": i,
-                    }
-            else:
-                self.canvas.create_rectangle(
-                    x, 100, x + 100, 250, outline="white", width=2
-                )
-                self.card_zones[f"final_{i}"] = {
-                    "x1": x,
-                    "y1": 100,
-                    "x2": x + 100,
-                    "y2": 250,
-                    "type": "final",
-                    "index": i,
-                    "is_empty": True,
-                }
-
-        # Tableau piles
-        for i, elem in enumerate(self.game.grid.game):
-            queue = elem[0]
-            stack = elem[1]
-            x = 100 + i * self.column_spacing
-            y = self.tableau_start_y
-            offset = 30
-
-            try:
-                n_queue = queue.size()
-            except:
-                n_queue = len(list(queue.items))
-            try:
-                n_stack = stack.size()
-            except:
-                n_stack = len(list(stack.items))
-
-            if n_queue == 0 and n_stack == 0:
-                self.canvas.create_rectangle(
-                    x, y, x + 100, y + 150, outline="white", width=2, dash=(5, 5)
-                )
-                self.card_zones[f"tableau_{i}_empty"] = {
+            zones = {
+                f"tableau_{i}_empty": {
                     "x1": x,
                     "y1": y,
                     "x2": x + 100,
@@ -524,70 +525,94 @@ root = tk.Tk()
                     "card_index": None,
                     "is_empty": True,
                 }
-            else:
-                for j, card in enumerate(list(stack.items)):
-                    card.face = False
-                    img = self.load_card_image(card)
-                    card_y = y + j * offset
-                    if img:
-                        self.canvas.create_image(
-                            x, card_y, image=img, anchor="nw", tags=f"tableau_{i}_s_{j}"
-                        )
-                    is_top_stack = j == n_stack - 1
-                    clickable_height = 150 if is_top_stack and n_queue == 0 else offset
-                    self.card_zones[f"tableau_{i}_s_{j}"] = {
-                        "x1": x,
-                        "y1": card_y,
-                        "x2": x + 100,
-                        "y2": card_y + clickable_height,
-                        "type": "tableau",
-                        "pile_index": i,
-                        "card_index": j,
-                        "is_stack": True,
-                        "is_top_stack": is_top_stack,
-                    }
-
-                for j, card in enumerate(list(queue.items)):
-                    card.face = True
-                    img = self.load_card_image(card)
-                    card_y = y + (n_stack + j) * offset
-                    if img:
-                        self.canvas.create_image(
-                            x, card_y, image=img, anchor="nw", tags=f"tableau_{i}_q_{j}"
-                        )
-                    is_last = j == n_queue - 1
-                    clickable_height = 150 if is_last else offset
-                    self.card_zones[f"tableau_{i}_q_{j}"] = {
-                        "x1": x,
-                        "y1": card_y,
-                        "x2": x + 100,
-                        "y2": card_y + clickable_height,
-                        "type": "tableau",
-                        "pile_index": i,
-                        "card_index": j,
-                        "is_stack": False,
-                        "is_last": is_last,
-                    }
+            }
+            return [], decor, zones
+
+        cards, zones = [], {}
+        for j, card in enumerate(stack.items):
+            card_y = y + j * offset
+            cards.append((card.id, x, card_y, False))
+            is_top_stack = j == n_stack - 1
+            clickable_height = 150 if is_top_stack and n_queue == 0 else offset
+            zones[f"tableau_{i}_s_{j}"] = {
+                "x1": x,
+                "y1": card_y,
+                "x2": x + 100,
+                "y2": card_y + clickable_height,
+                "type": "tableau",
+                "pile_index": i,
+                "card_index": j,
+                "is_stack": True,
+                "is_top_stack": is_top_stack,
+                "card_id": card.id,
+            }
+
+        for j, card in enumerate(queue.items):
+            card_y = y + (n_stack + j) * offset
+            cards.append((card.id, x, card_y, True))
+            is_last = j == n_queue - 1
+            clickable_height = 150 if is_last else offset
+            zones[f"tableau_{i}_q_{j}"] = {
+                "x1": x,
+                "y1": card_y,
+                "x2": x + 100,
+                "y2": card_y + clickable_height,
+                "type": "tableau",
+                "pile_index": i,
+                "card_index": j,
+                "is_stack": False,
+                "is_last": is_last,
+                "card_id": card.id,
+            }
+        return cards, (), zones
+
+    def draw_game(self) -> None:
+        """Update the graphical display of the whole game now.
+
+        The canvas items are kept between redraws (see CardScene): only the
+        cards whose position, face or stacking changed are touched.
+        """
+        self._paint(self._regions())
+
+    def _paint(self, regions: list) -> None:
+        """Lay out and draw the given regions, then the texts."""
+        self._normalize_columns()
+        layouts = {}
+        for region in regions:
+            cards, decor, zones = self._layout_region(region)
+            layouts[region] = (cards, decor)
+            self.hit_index.set_region(region, zones, "x" if region == "discard" else "y")
+        self.scene.update(layouts)
 
         # Display moves
-        self.canvas.create_text(
+        self.scene.set_text(
+            "turns",
             600,
             50,
-            text=f"Coups: {self.game.turns}",
+            f"Coups: {self.game.turns}",
             fill="white",
             font=("Arial", 16, "bold"),
         )
 
+        # Current hint
+        self.scene.set_text(
+            "hint",
+            700,
+            10,
+            self._hint_text,
+            anchor="nw",
+            width=480,
+            fill="white",
+            font=("Arial", 10),
+        )
+
     def get_clicked_card(self, x: float, y: float) -> tuple:
-        """Determine which card was clicked."""
-        clicked_zones = []
-        for zone_id, zone in self.card_zones.items():
-            if zone["x1"] <= x <= zone["x2"] and zone["y1"] <= y <= zone["y2"]:
-                clicked_zones.append((zone_id, zone))
-        if clicked_zones:
-            clicked_zones.sort(key=lambda z: z[1]["y1"], reverse=True)
-            return clicked_zones[0]
-        return None, None
+        """Determine which card was clicked: (zone_id, zone) of the topmost
+        zone under the point, or (None, None)."""
+        if self._dirty:
+            # Zones must match the game, even before the idle repaint
+            self._flush()
+        return self.hit_index.hit(x, y)
 
     def _pile_objects(self, pile_index: int) -> tuple:
         """Return (queue, stack) for a tableau pile."""
@@ -599,15 +624,144 @@ root = tk.Tk()
         pass
 
     def _redraw(self) -> None:
-        """Redraw the GUI."""
-        try:
-            self._normalize_columns()
-        except:
-            pass
-        try:
-            self.draw_game()
-        except:
-            pass
+        """Redraw the whole GUI (coalesced, see invalidate)."""
+        self.invalidate()
+
+    def invalidate(self, *regions: str) -> None:
+        """Mark regions ("stock", "discard", "final_<i>", "tableau_<i>") as
+        needing a repaint, or all of them if none is given ("info" only
+        repaints the texts).
+
+        However many times regions are invalidated, they are repainted once,
+        together, when Tk is idle. Texts (moves, hint) are refreshed at each
+        repaint.
+        """
+        self._dirty.update(regions or self._regions())
+        if self._flush_job is None:
+            self._flush_job = self.root.after_idle(self._flush)
+
+    def _flush(self) -> None:
+        """Repaint the regions invalidated since the last repaint."""
+        if self._flush_job is not None:
+            self.root.after_cancel(self._flush_job)
+            self._flush_job = None
+        dirty, self._dirty = self._dirty, set()
+        self._cancel_hint_if_moved()
+        self._paint([region for region in self._regions() if region in dirty])
+
+    @staticmethod
+    def _zone_region(zone: dict | None) -> str | None:
+        """Return the region a clickable zone belongs to."""
+        if not zone:
+            return None
+        kind = zone.get("type")
+        if kind in ("stock", "discard"):
+            return kind
+        if kind == "final":
+            return f"final_{zone['index']}"
+        return f"tableau_{zone['pile_index']}"
+
+    @staticmethod
+    def _change_region(change: PileChange) -> str:
+        """Return the region showing a pile reported by a "change" event."""
+        if change.pile in ("stock", "discard"):
+            return change.pile
+        if change.pile == "foundation":
+            return f"final_{change.index}"
+        return f"tableau_{change.index}"
+
+    def _subscribe_game(self) -> None:
+        """Listen to the events emitted by the game controller."""
+        self.game.subscribe("auto_complete", self._on_auto_complete)
+        self.game.subscribe("victory", self._on_victory)
+        self.game.subscribe("change", self._on_game_change)
+
+    def _on_game_change(self, changes: list) -> None:
+        """Repaint only the regions of the piles a move touched."""
+        self.invalidate(*{self._change_region(change) for change in changes})
+
+    def _on_auto_complete(self, moves: list) -> None:
+        """Play the auto-completion moves one card at a time, from the Tk loop."""
+        self._cancel_auto_complete()
+        self._auto_moves = list(moves)
+        self._auto_job = self.root.after(self.AUTO_STEP_DELAY, self._auto_step)
+
+    def _cancel_auto_complete(self, event: tk.Event = None) -> None:
+        """Stop a running auto-completion (new game, undo, window closed)."""
+        self._auto_moves = []
+        if self._auto_job is not None:
+            try:
+                self.root.after_cancel(self._auto_job)
+            except tk.TclError:
+                pass
+            self._auto_job = None
+
+    def _on_destroy(self, event: tk.Event = None) -> None:
+        """Canvas destroyed: stop the hint search and every pending callback,
+        none of them may run against the dead widgets."""
+        self._cancel_auto_complete()
+        self.hint_service.cancel()
+        for name in ("_hint_poll_job", "_flush_job", "_drag_job"):
+            job = getattr(self, name)
+            if job is not None:
+                try:
+                    self.root.after_cancel(job)
+                except tk.TclError:
+                    pass
+                setattr(self, name, None)
+
+    def _auto_step(self) -> None:
+        """Start moving the next auto-completion card towards its foundation."""
+        self._auto_job = None
+        if not self._auto_moves:
+            return
+        move = self._auto_moves[0]
+        if move not in self.game.legal_moves():
+            # The player moved in between: plan again from here
+            self._auto_moves = self.game.plan_auto_complete()
+            if not self._auto_moves:
+                return
+            move = self._auto_moves[0]
+
+        kind, src, dst, _ = move
+        card = None
+        if kind == DISCARD_TO_FOUNDATION:
+            card = self.game.discard_pile.peek()
+        elif kind == TABLEAU_TO_FOUNDATION:
+            card = self.game.grid.game[src][0].peek()
+        tag = CardScene.card_tag(card.id) if card else None
+
+        coords = self.canvas.coords(tag) if tag else []
+        if not coords:
+            self._auto_finish_move(move)
+            return
+        target_x = self.foundation_start_x + dst * self.foundation_spacing
+        steps = self.AUTO_ANIMATION_FRAMES
+        dx = (target_x - coords[0]) / steps
+        dy = (100 - coords[1]) / steps
+        self.canvas.tag_raise(tag)
+        # Put the card back on the next redraw if the animation is cancelled
+        self.scene.refresh([card.id])
+        self._auto_animate(move, tag, dx, dy, steps)
+
+    def _auto_animate(self, move: tuple, tag: str, dx: float, dy: float, left: int) -> None:
+        """Slide the moving card item only, one frame per call."""
+        self.canvas.move(tag, dx, dy)
+        if left > 1:
+            self._auto_job = self.root.after(
+                self.AUTO_FRAME_DELAY, self._auto_animate, move, tag, dx, dy, left - 1
+            )
+        else:
+            self._auto_finish_move(move)
+
+    def _auto_finish_move(self, move: tuple) -> None:
+        """Play the move in the game and schedule the next one."""
+        self._auto_moves.pop(0)
+        self.game.play_auto_move(move)
+        if self._auto_moves:
+            self._auto_job = self.root.after(self.AUTO_STEP_DELAY, self._auto_step)
+        else:
+            self._auto_job = None
 
     def _on_victory(self) -> None:
         """Display a victory overlay and return to the menu after a delay."""
@@ -652,39 +806,53 @@ root = tk.Tk()
         self.root.update_idletasks()
         self.root.update()
 
-    def _prepare_dragged_cards(self, start_zone: dict) -> None:
-        """Prepare card images for drag."""
-        self.drag_cards_images = []
+    # Delay between two drag updates (ms), about one display frame
+    DRAG_FRAME_DELAY = 16
+
+    def _dragged_cards(self, start_zone: dict) -> list:
+        """Return the ids of the cards picked up from a zone, bottom to top."""
         if start_zone.get("type") == "discard":
             if start_zone.get("is_last", False):
-                top_card = self.game.discard_pile.peek()
-                if top_card:
-                    top_card.face = True
-                    img = self.load_card_image(top_card)
-                    if img:
-                        self.drag_cards_images.append(img)
+                return [start_zone["card_id"]]
         elif start_zone.get("type") == "tableau":
-            queue, stack = self._pile_objects(start_zone["pile_index"])
-            if not start_zone.get("is_stack", False):
-                clicked_index = start_zone.get("card_index", 0)
-                try:
-                    cards = list(queue.items)[clicked_index:]
-                except:
-                    cards = []
-                for card in cards:
-                    card.face = True
-                    img = self.load_card_image(card)
-                    if img:
-                        self.drag_cards_images.append(img)
+            if not start_zone.get("is_stack", False) and not start_zone.get("is_empty"):
+                queue, stack = self._pile_objects(start_zone["pile_index"])
+                return [card.id for card in list(queue.items)[start_zone["card_index"]:]]
         elif start_zone.get("type") == "final":
-            fpile = self.game.final_piles[start_zone["index"]]
-            if not fpile.is_empty():
-                top_card = fpile.peek()
-                if top_card:
-                    top_card.face = True
-                    img = self.load_card_image(top_card)
-                    if img:
-                        self.drag_cards_images.append(img)
+            if not start_zone.get("is_empty"):
+                return [start_zone["card_id"]]
+        return []
+
+    def _start_drag(self, zone: dict, x: float, y: float) -> None:
+        """Pick up the cards of a zone: raise their items once, above everything."""
+        self.dragging = True
+        self.drag_start_zone = zone
+        self.drag_card_ids = self._dragged_cards(zone)
+        self._drag_last_pos = (x, y)
+        for card_id in self.drag_card_ids:
+            tag = CardScene.card_tag(card_id)
+            self.canvas.addtag_withtag("dragging", tag)
+            self.canvas.tag_raise(tag)
+
+    def _drag_frame(self) -> None:
+        """Move the dragged items to the last known mouse position."""
+        self._drag_job = None
+        x, y = self.current_mouse_pos
+        last_x, last_y = self._drag_last_pos
+        if (x, y) != (last_x, last_y):
+            self.canvas.move("dragging", x - last_x, y - last_y)
+            self._drag_last_pos = (x, y)
+
+    def _end_drag(self) -> None:
+        """Drop the dragged items; the next redraw puts them in place."""
+        if self._drag_job is not None:
+            self.root.after_cancel(self._drag_job)
+            self._drag_job = None
+        self.canvas.dtag("dragging", "dragging")
+        self.scene.refresh(self.drag_card_ids)
+        self.drag_card_ids = []
+        self.dragging = False
+        self.drag_start_zone = None
 
     def on_mouse_press(self, event: tk.Event) -> None:
         """Handle mouse press."""
@@ -692,26 +860,19 @@ root = tk.Tk()
         zone_id, zone = self.get_clicked_card(x, y)
         self.selected_zone = (zone_id, zone)
         if zone_id:
-            self.dragging = True
-            self.drag_start_zone = zone
-            self._prepare_dragged_cards(zone)
+            self._start_drag(zone, x, y)
 
     def on_mouse_motion(self, event: tk.Event) -> None:
-        """Handle mouse motion during drag."""
+        """Handle mouse motion during drag.
+
+        Motion events only record the position; the items are moved at most
+        once per frame by _drag_frame.
+        """
         self.current_mouse_pos = (event.x, event.y)
         if not self.dragging or not self.drag_start_zone:
             return
-        self.draw_game()
-        offset_y = 0
-        for img in self.drag_cards_images:
-            self.canvas.create_image(
-                event.x,
-                event.y + offset_y,
-                image=img,
-                anchor="center",
-                tags="dragged_card",
-            )
-            offset_y += 30
+        if self._drag_job is None:
+            self._drag_job = self.root.after(self.DRAG_FRAME_DELAY, self._drag_frame)
 
     def on_mouse_release(self, event: tk.Event) -> None:
         """Handle mouse release."""
@@ -721,38 +882,41 @@ root = tk.Tk()
         )
         end_zone_id, end_zone = self.get_clicked_card(x, y)
 
-        self.dragging = False
-        self.drag_start_zone = None
-        self.drag_cards_images.clear()
+        self._end_drag()
         self.selected_zone = None
 
         if not start_zone:
             start_zone_id, start_zone = end_zone_id, end_zone
+        # Both ends are repainted so the dragged cards go back in place; the
+        # piles changed by the move are repainted from the "change" event
+        regions = [
+            r for r in (self._zone_region(start_zone), self._zone_region(end_zone)) if r
+        ]
 
         if end_zone and end_zone.get("type") == "stock":
             self.game.draw_from_stock()
-            self._redraw()
+            self.invalidate(*regions)
             return
 
         if not start_zone or not end_zone:
-            self._redraw()
+            self.invalidate(*regions)
             return
 
         # Discard to foundation/tableau
         if start_zone.get("type") == "discard":
             if not start_zone.get("is_last", False):
-                self._redraw()
+                self.invalidate(*regions)
                 return
             if end_zone.get("type") == "final":
                 dest = self.game.final_piles[end_zone["index"]]
                 self.game.move_from_discard(dest)
-                self._redraw()
+                self.invalidate(*regions)
                 return
             if end_zone.get("type") == "tableau":
                 dest_idx = end_zone["pile_index"]
                 dest_queue = self.game.grid.game[dest_idx][0]
                 self.game.move_from_discard(dest_queue)
-                self._redraw()
+                self.invalidate(*regions)
                 return
 
         # Tableau to tableau
@@ -760,7 +924,7 @@ root = tk.Tk()
             src_idx = start_zone["pile_index"]
             dst_idx = end_zone["pile_index"]
             if src_idx == dst_idx:
-                self._redraw()
+                self.invalidate(*regions)
                 return
             src_queue, src_stack = self._pile_objects(src_idx)
             dst_queue, dst_stack = self._pile_objects(dst_idx)
@@ -771,18 +935,18 @@ root = tk.Tk()
             if start_zone.get("is_stack", False) or (
                 start_zone_id and "_s_" in start_zone_id
             ):
-                self._redraw()
+                self.invalidate(*regions)
                 return
             clicked_card_index = start_zone.get("card_index")
             if clicked_card_index is None:
-                self._redraw()
+                self.invalidate(*regions)
                 return
             num_to_move = n_queue - clicked_card_index
             if num_to_move <= 0:
-                self._redraw()
+                self.invalidate(*regions)
                 return
             self.game.move_card(src_queue, dst_queue, num_to_move)
-            self._redraw()
+            self.invalidate(*regions)
             return
 
         # Tableau to foundation
@@ -791,17 +955,17 @@ root = tk.Tk()
             fpile = self.game.final_piles[end_zone["index"]]
             src_queue, src_stack = self._pile_objects(src_idx)
             if start_zone.get("is_stack", False):
-                self._redraw()
+                self.invalidate(*regions)
                 return
             try:
                 q_size = src_queue.size()
             except:
                 q_size = len(list(getattr(src_queue, "items", [])))
             if q_size <= 0:
-                self._redraw()
+                self.invalidate(*regions)
                 return
             self.game.move_card(src_queue, fpile, 1)
-            self._redraw()
+            self.invalidate(*regions)
             return
 
         # Foundation to tableau
@@ -810,10 +974,10 @@ root = tk.Tk()
             dst_idx = end_zone["pile_index"]
             dst_queue = self.game.grid.game[dst_idx][0]
             if src_fpile.is_empty():
-                self._redraw()
+                self.invalidate(*regions)
                 return
             self.game.move_card(src_fpile, dst_queue, 1)
-            self._redraw()
+            self.invalidate(*regions)
             return
 
-        self._redraw()
+        self.invalidate(*regions)
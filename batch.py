@@ -0,0 +1,210 @@
+"""Batch solving: win-rate statistics over a range of seeds.
+
+Each seed is a deal number (GameController(seed=...), see deals.py) and the
+deal is solved by solver.Solver within a per-deal budget. Deals are spread over a
+process pool and every result is appended to the output file as soon as it
+arrives, one tab-separated line per deal:
+
+    seed    outcome    nodes    seconds
+
+Seeds already in the output file are skipped, so an interrupted run is
+resumed by running the same command again.
+
+Example:
+    $ python batch.py --start 0 --count 100000 --max-seconds 2 -o wins.tsv
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from game import GameController
+from solver import Solver, WON, LOST, UNKNOWN
+from solvecache import SolveCache
+
+HEADER = "# seed\toutcome\tnodes\tseconds\n"
+
+
+# Cache path -> SolveCache of this process
+_caches = {}
+
+
+def solve_seed(
+    seed: int,
+    max_seconds: float | None,
+    max_nodes: int | None,
+    cache_path: str | None = None,
+) -> tuple:
+    """Deal the game of a seed and solve it, looking it up first in the
+    SolveCache at cache_path if given. Returns (seed, outcome, nodes, seconds)."""
+    cache = None
+    if cache_path is not None:
+        cache = _caches.get(cache_path)
+        if cache is None:
+            cache = _caches[cache_path] = SolveCache(cache_path)
+    game = GameController(seed)
+    result = Solver(max_nodes=max_nodes, max_seconds=max_seconds, cache=cache).solve(game)
+    return seed, result.status, result.nodes, result.elapsed
+
+
+def solve_seeds(
+    seeds: list,
+    max_seconds: float | None,
+    max_nodes: int | None,
+    cache_path: str | None = None,
+) -> list:
+    """Worker task: solve a chunk of seeds (fewer round trips to the pool)."""
+    return [solve_seed(seed, max_seconds, max_nodes, cache_path) for seed in seeds]
+
+
+def read_done(path: str) -> set:
+    """Return the seeds already solved in an output file.
+
+    A line cut by an interruption is removed from the file, so its seed is
+    solved again.
+    """
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end != len(data):
+            f.truncate(end)
+    for line in data[:end].decode().splitlines():
+        if line and not line.startswith("#"):
+            done.add(int(line.split("\t", 1)[0]))
+    return done
+
+
+def _chunks(seeds, size: int):
+    """Yield lists of at most size seeds."""
+    chunk = []
+    for seed in seeds:
+        chunk.append(seed)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class BatchStats:
+    """Running totals of a batch, printed as progress lines."""
+
+    def __init__(self) -> None:
+        self.outcomes = {WON: 0, LOST: 0, UNKNOWN: 0}
+        self.nodes = 0
+        self.start = time.perf_counter()
+
+    @property
+    def deals(self) -> int:
+        return sum(self.outcomes.values())
+
+    def add(self, outcome: str, nodes: int) -> None:
+        self.outcomes[outcome] += 1
+        self.nodes += nodes
+
+    def summary(self) -> str:
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        deals = self.deals
+        shares = ", ".join(
+            f"{outcome} {100 * n / deals:.1f}%" if deals else f"{outcome} -"
+            for outcome, n in self.outcomes.items()
+        )
+        return (
+            f"{deals} deals, {shares}, {deals / elapsed:.1f} deals/s, "
+            f"{self.nodes / elapsed:.0f} nodes/s"
+        )
+
+
+def run_batch(
+    seeds,
+    output: str,
+    workers: int | None = None,
+    max_seconds: float | None = 1.0,
+    max_nodes: int | None = None,
+    chunk_size: int = 4,
+    report_every: float = 5.0,
+    log=sys.stderr,
+    cache_path: str | None = None,
+) -> BatchStats:
+    """Solve every seed not already in output and append the results to it.
+    With cache_path, the workers share a SolveCache of proven results.
+
+    At most a few chunks per worker are queued at once, so the seed range can
+    be arbitrarily large. Returns the statistics of the deals solved by this
+    run (not those found in the file).
+    """
+    done = read_done(output)
+    todo = (seed for seed in seeds if seed not in done)
+    stats = BatchStats()
+    workers = workers or os.cpu_count() or 1
+
+    with open(output, "a", encoding="utf-8") as out, ProcessPoolExecutor(
+        workers
+    ) as pool:
+        if out.tell() == 0:
+            out.write(HEADER)
+        chunks = _chunks(todo, chunk_size)
+        pending = set()
+        last_report = time.perf_counter()
+        try:
+            while True:
+                while len(pending) < 4 * workers:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    pending.add(
+                        pool.submit(
+                            solve_seeds, chunk, max_seconds, max_nodes, cache_path
+                        )
+                    )
+                if not pending:
+                    break
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    for seed, outcome, nodes, seconds in future.result():
+                        out.write(f"{seed}\t{outcome}\t{nodes}\t{seconds:.3f}\n")
+                        stats.add(outcome, nodes)
+                out.flush()
+                if log and time.perf_counter() - last_report >= report_every:
+                    last_report = time.perf_counter()
+                    print(stats.summary(), file=log, flush=True)
+        except KeyboardInterrupt:
+            for future in pending:
+                future.cancel()
+            if log:
+                print("interrupted, run again to resume", file=log)
+    return stats
+
+
+def main(argv: list | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Solve a range of seeded deals.")
+    parser.add_argument("--start", type=int, default=0, help="first seed")
+    parser.add_argument("--count", type=int, default=1000, help="number of seeds")
+    parser.add_argument("-o", "--output", default="results.tsv", help="results file")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="processes")
+    parser.add_argument(
+        "--max-seconds", type=float, default=1.0, help="time budget per deal"
+    )
+    parser.add_argument("--max-nodes", type=int, default=None, help="node budget per deal")
+    parser.add_argument("--chunk", type=int, default=4, help="seeds per worker task")
+    parser.add_argument("--cache", default=None, help="SQLite cache of solved positions")
+    args = parser.parse_args(argv)
+
+    stats = run_batch(
+        range(args.start, args.start + args.count),
+        args.output,
+        workers=args.workers,
+        max_seconds=args.max_seconds,
+        max_nodes=args.max_nodes,
+        chunk_size=args.chunk,
+        cache_path=args.cache,
+    )
+    print(stats.summary())
+
+
+if __name__ == "__main__":
+    main()
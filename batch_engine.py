@@ -0,0 +1,427 @@
+"""Thousands of games stepped at once in NumPy arrays.
+
+BatchEngine stores K games as arrays, one row per game:
+
+    talon (K, 24), talon_n, cursor: the stock and the discard pile in a
+        single array, in drawing order. The first cursor cards are the
+        discard pile (talon[cursor - 1] on top), the rest is the stock
+        (talon[cursor] is drawn next). A draw moves the cursor by up to
+        three, a recycle puts it back to 0, and a card played from the
+        discard pile is removed from the array.
+    foundations (K, 4): top card of each foundation, EMPTY if none.
+    hidden (K, 7, 6), hidden_n: face-down cards of each column, bottom to top.
+    up (K, 7, 13), up_n: face-up cards of each column, bottom to top.
+
+Cards are ids as in cartes.py and unused slots hold EMPTY. Legality is read
+from cartes.TABLEAU_STACK and cartes.FOUNDATION_STACK, the tables of
+Game_queue.can_stack and FinalPile.can_stack, and a draw takes up to three
+cards like Stock.draw, so both engines follow exactly the same rules.
+cross_check() plays random games in both and compares every legal move and
+every position.
+
+Moves are actions of a fixed space of N_ACTIONS (see ACTIONS): the stock
+(draw, or recycle when the stock is empty), then the discard to each
+foundation and column, each column to each foundation, count cards of each
+column onto each other, and each foundation to each column. legal_mask()
+returns the legal actions of every game and step() plays one action per game.
+
+Example:
+    >>> engine = BatchEngine.from_seeds(range(4096))
+    >>> rng = np.random.default_rng(0)
+    >>> for _ in range(200):
+    ...     engine.step(random_actions(engine.legal_mask(), rng))
+    >>> engine.won().sum()
+
+    $ python batch_engine.py --games 4096 --steps 300   # throughput
+    $ python batch_engine.py --check 200                # compare with the object engine
+"""
+
+import argparse
+import time
+import numpy as np
+from cartes import DECK_SIZE, EMPTY, TABLEAU_STACK, FOUNDATION_STACK
+from moves import (
+    DRAW,
+    RECYCLE,
+    DISCARD_TO_FOUNDATION,
+    DISCARD_TO_TABLEAU,
+    TABLEAU_TO_FOUNDATION,
+    TABLEAU_TO_TABLEAU,
+    FOUNDATION_TO_TABLEAU,
+)
+from deals import COLUMNS, STOCK_SIZE, deal_order, initial_state, layout, layouts
+from state import GameState
+
+FOUNDATIONS = 4
+# Widest visible run (king to ace) and most hidden cards of a column
+MAX_RUN = 13
+MAX_HIDDEN = COLUMNS - 1
+
+# Move template (kind, src, dst, count) of each action. The stock action is
+# (DRAW, 0, 0, 0): its kind and count depend on the position (see move()).
+ACTIONS = []
+# Move kind -> index of its first action
+ACTION_OFFSET = {}
+
+
+def _actions(kind: int, moves: list) -> None:
+    ACTION_OFFSET[kind] = len(ACTIONS)
+    ACTIONS.extend(moves)
+
+
+_actions(DRAW, [(DRAW, 0, 0, 0)])
+_actions(DISCARD_TO_FOUNDATION, [(DISCARD_TO_FOUNDATION, 0, f, 1) for f in range(FOUNDATIONS)])
+_actions(DISCARD_TO_TABLEAU, [(DISCARD_TO_TABLEAU, 0, d, 1) for d in range(COLUMNS)])
+_actions(
+    TABLEAU_TO_FOUNDATION,
+    [(TABLEAU_TO_FOUNDATION, c, f, 1) for c in range(COLUMNS) for f in range(FOUNDATIONS)],
+)
+# (source, destination, count): action offset + (c * 7 + d) * 13 + count - 1
+_actions(
+    TABLEAU_TO_TABLEAU,
+    [
+        (TABLEAU_TO_TABLEAU, c, d, k)
+        for c in range(COLUMNS)
+        for d in range(COLUMNS)
+        for k in range(1, MAX_RUN + 1)
+    ],
+)
+_actions(
+    FOUNDATION_TO_TABLEAU,
+    [(FOUNDATION_TO_TABLEAU, f, d, 1) for f in range(FOUNDATIONS) for d in range(COLUMNS)],
+)
+ACTIONS = tuple(ACTIONS)
+ACTION_OFFSET[RECYCLE] = ACTION_OFFSET[DRAW]
+N_ACTIONS = len(ACTIONS)
+STOCK_ACTION = ACTION_OFFSET[DRAW]
+
+ACTION_KIND, ACTION_SRC, ACTION_DST, ACTION_COUNT = (
+    np.array(column, np.int16) for column in zip(*ACTIONS)
+)
+_ACTION_INDEX = {move: i for i, move in enumerate(ACTIONS)}
+
+
+def action_index(move: tuple) -> int:
+    """Action of a (kind, src, dst, count) move of the object engine."""
+    if move[0] in (DRAW, RECYCLE):
+        return STOCK_ACTION
+    return _ACTION_INDEX[move]
+
+
+def _rule(table: bytes) -> np.ndarray:
+    """[top, card] lookup of a cartes.py table, with an extra EMPTY card
+    column that never fits."""
+    rule = np.zeros((DECK_SIZE + 1, DECK_SIZE + 1), bool)
+    rule[:, :DECK_SIZE] = np.frombuffer(table, np.uint8).reshape(DECK_SIZE + 1, DECK_SIZE)
+    return rule
+
+
+_TABLEAU = _rule(TABLEAU_STACK)
+_FOUNDATION = _rule(FOUNDATION_STACK)
+# Cards that can go on each column top (four kings on EMPTY), EMPTY padded
+_ACCEPTS = np.full((DECK_SIZE + 1, 4), EMPTY, np.int8)
+for _top in range(DECK_SIZE + 1):
+    _cards = np.flatnonzero(_TABLEAU[_top])
+    _ACCEPTS[_top, : len(_cards)] = _cards
+del _top, _cards
+_RANK = np.arange(DECK_SIZE + 1) % 13
+_COUNTS = np.arange(1, MAX_RUN + 1)
+
+
+def random_actions(mask: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Pick one legal action per row of mask at random (-1 if none)."""
+    scores = np.where(mask, rng.random(mask.shape, np.float32), -1)
+    actions = scores.argmax(axis=1)
+    return np.where(mask.any(axis=1), actions, -1)
+
+
+class BatchEngine:
+    """K games as arrays (see the module docstring).
+
+    Args:
+        k (int): Number of games, all empty until loaded with set_state().
+    """
+
+    def __init__(self, k: int) -> None:
+        self.talon = np.full((k, STOCK_SIZE), EMPTY, np.int8)
+        self.talon_n = np.zeros(k, np.int16)
+        self.cursor = np.zeros(k, np.int16)
+        self.foundations = np.full((k, FOUNDATIONS), EMPTY, np.int8)
+        self.hidden = np.full((k, COLUMNS, MAX_HIDDEN), EMPTY, np.int8)
+        self.hidden_n = np.zeros((k, COLUMNS), np.int16)
+        self.up = np.full((k, COLUMNS, MAX_RUN), EMPTY, np.int8)
+        self.up_n = np.zeros((k, COLUMNS), np.int16)
+
+    def __len__(self) -> int:
+        return len(self.talon)
+
+    @classmethod
+    def from_states(cls, states: list) -> "BatchEngine":
+        """One game per GameState."""
+        engine = cls(len(states))
+        for row, state in enumerate(states):
+            engine.set_state(state, row)
+        return engine
+
+    @classmethod
+    def from_seeds(cls, seeds) -> "BatchEngine":
+        """The initial deals of a range of deal numbers (see deals.py)."""
+        engine = cls(len(seeds))
+        if isinstance(seeds, range) and seeds.step == 1:
+            deals = (deal for _, deal in layouts(seeds.start, seeds.stop))
+        else:
+            deals = (layout(deal_order(seed)) for seed in seeds)
+        for row, deal in enumerate(deals):
+            engine.set_state(initial_state(deal), row)
+        return engine
+
+    # Positions
+
+    def set_state(self, state: GameState, rows=slice(None)) -> None:
+        """Load a position into rows (every game by default)."""
+        talon = state.discard + state.stock[::-1]
+        self.talon[rows] = EMPTY
+        self.talon[rows, : len(talon)] = list(talon)
+        self.talon_n[rows] = len(talon)
+        self.cursor[rows] = len(state.discard)
+        self.foundations[rows] = [pile[-1] if pile else EMPTY for pile in state.foundations]
+        self.hidden[rows] = EMPTY
+        self.up[rows] = EMPTY
+        for i in range(COLUMNS):
+            self.hidden[rows, i, : len(state.hidden[i])] = list(state.hidden[i])
+            self.hidden_n[rows, i] = len(state.hidden[i])
+            self.up[rows, i, : len(state.columns[i])] = list(state.columns[i])
+            self.up_n[rows, i] = len(state.columns[i])
+
+    def state(self, row: int) -> GameState:
+        """Return the position of one game."""
+        cursor, talon_n = self.cursor[row], self.talon_n[row]
+        talon = self.talon[row].tobytes()
+        foundations = tuple(
+            b"" if top == EMPTY else bytes(range(top - top % 13, top + 1))
+            for top in self.foundations[row].tolist()
+        )
+        return GameState(
+            talon[cursor:talon_n][::-1],
+            talon[:cursor],
+            foundations,
+            tuple(self.up[row, i, : self.up_n[row, i]].tobytes() for i in range(COLUMNS)),
+            tuple(self.hidden[row, i, : self.hidden_n[row, i]].tobytes() for i in range(COLUMNS)),
+        )
+
+    def tops(self) -> np.ndarray:
+        """Top face-up card of every column, EMPTY if the column is empty."""
+        index = np.maximum(self.up_n - 1, 0)[:, :, None]
+        top = np.take_along_axis(self.up, index, axis=2)[:, :, 0]
+        return np.where(self.up_n > 0, top, EMPTY)
+
+    def discard_top(self) -> np.ndarray:
+        """Top card of every discard pile, EMPTY if the pile is empty."""
+        rows = np.arange(len(self))
+        top = self.talon[rows, np.maximum(self.cursor - 1, 0)]
+        return np.where(self.cursor > 0, top, EMPTY)
+
+    def runs(self) -> np.ndarray:
+        """(K, 7, 13) array: the card that moving count cards of a column
+        would lift (entry count - 1), EMPTY when the column has fewer."""
+        depth = self.up_n[:, :, None] - _COUNTS
+        cards = np.take_along_axis(self.up, np.maximum(depth, 0), axis=2)
+        return np.where(depth >= 0, cards, EMPTY)
+
+    def foundation_fits(self, cards: np.ndarray) -> np.ndarray:
+        """Whether each card can go on a foundation of its game; cards is
+        (K, ...) and EMPTY never fits."""
+        tops = self.foundations.reshape((len(self),) + (1,) * (cards.ndim - 1) + (FOUNDATIONS,))
+        return _FOUNDATION[tops, cards[..., None]].any(axis=-1)
+
+    def foundation_cards(self) -> np.ndarray:
+        """Number of cards on the foundations of every game."""
+        return np.where(self.foundations == EMPTY, 0, self.foundations % 13 + 1).sum(axis=1)
+
+    def won(self) -> np.ndarray:
+        return self.foundation_cards() == DECK_SIZE
+
+    # Legal moves
+
+    def legal_mask(self) -> np.ndarray:
+        """(K, N_ACTIONS) array of the legal actions of every game, the
+        same moves as GameController.legal_moves()."""
+        k = len(self)
+        tops = self.tops()
+        discard = self.discard_top()[:, None]
+        foundations = self.foundations
+        mask = np.zeros((k, N_ACTIONS), bool)
+
+        mask[:, STOCK_ACTION] = self.talon_n > 0
+        at = ACTION_OFFSET[DISCARD_TO_FOUNDATION]
+        mask[:, at : at + FOUNDATIONS] = _FOUNDATION[foundations, discard]
+        at = ACTION_OFFSET[DISCARD_TO_TABLEAU]
+        mask[:, at : at + COLUMNS] = _TABLEAU[tops, discard]
+        at = ACTION_OFFSET[TABLEAU_TO_FOUNDATION]
+        fits = _FOUNDATION[foundations[:, None, :], tops[:, :, None]]
+        mask[:, at : at + COLUMNS * FOUNDATIONS] = fits.reshape(k, -1)
+        # Runs: look up where the cards each top accepts are face up, rather
+        # than testing every card of every run against every top
+        where = np.full((k, DECK_SIZE + 1), -1, np.int16)
+        r, c, j = np.nonzero(np.arange(MAX_RUN) < self.up_n[:, :, None])
+        where[r, self.up[r, c, j]] = c * MAX_RUN + j
+        accepted = _ACCEPTS[tops].reshape(k, -1).astype(np.intp)
+        found = np.take_along_axis(where, accepted, axis=1).reshape(k, COLUMNS, -1)
+        r, d, i = np.nonzero(found >= 0)
+        c, j = np.divmod(found[r, d, i], MAX_RUN)
+        count = self.up_n[r, c] - j
+        at = ACTION_OFFSET[TABLEAU_TO_TABLEAU]
+        mask[r, at + (c * COLUMNS + d) * MAX_RUN + count - 1] = True
+        at = ACTION_OFFSET[FOUNDATION_TO_TABLEAU]
+        fits = _TABLEAU[tops[:, None, :], foundations[:, :, None]]
+        mask[:, at : at + FOUNDATIONS * COLUMNS] = fits.reshape(k, -1)
+        return mask
+
+    def move(self, row: int, action: int) -> tuple:
+        """The (kind, src, dst, count) move of an action in one game."""
+        if action != STOCK_ACTION:
+            return ACTIONS[action]
+        left = int(self.talon_n[row] - self.cursor[row])
+        if left:
+            return (DRAW, 0, 0, min(3, left))
+        return (RECYCLE, 0, 0, int(self.cursor[row]))
+
+    # Moves
+
+    def step(self, actions: np.ndarray) -> None:
+        """Play one legal action per game (-1 to skip a game)."""
+        actions = np.asarray(actions)
+        play = actions >= 0
+        actions = np.maximum(actions, 0)
+        kind = ACTION_KIND[actions]
+        src, dst, count = ACTION_SRC[actions], ACTION_DST[actions], ACTION_COUNT[actions]
+
+        r = np.flatnonzero(play & (kind == DRAW))
+        drawing = self.cursor[r] < self.talon_n[r]
+        self._draw(r[drawing])
+        self.cursor[r[~drawing]] = 0
+        r = np.flatnonzero(play & (kind == DISCARD_TO_FOUNDATION))
+        self.foundations[r, dst[r]] = self._pop_discard(r)
+        r = np.flatnonzero(play & (kind == DISCARD_TO_TABLEAU))
+        self._push(r, dst[r], self._pop_discard(r))
+        r = np.flatnonzero(play & (kind == TABLEAU_TO_FOUNDATION))
+        self._tableau_to_foundation(r, src[r], dst[r])
+        r = np.flatnonzero(play & (kind == TABLEAU_TO_TABLEAU))
+        self._tableau_to_tableau(r, src[r], dst[r], count[r])
+        r = np.flatnonzero(play & (kind == FOUNDATION_TO_TABLEAU))
+        self._foundation_to_tableau(r, src[r], dst[r])
+
+    # Vectorized moves on the rows r (distinct), with per-row piles
+
+    def _draw(self, r: np.ndarray) -> None:
+        self.cursor[r] = np.minimum(self.cursor[r] + 3, self.talon_n[r])
+
+    def _pop_discard(self, r: np.ndarray) -> np.ndarray:
+        """Remove the top card of the discard piles, shifting the stock."""
+        self.cursor[r] -= 1
+        cards = self.talon[r, self.cursor[r]]
+        index = np.arange(STOCK_SIZE)
+        shifted = index + (index >= self.cursor[r][:, None])
+        talon = np.take_along_axis(self.talon[r], np.minimum(shifted, STOCK_SIZE - 1), axis=1)
+        talon[:, -1] = EMPTY
+        self.talon[r] = talon
+        self.talon_n[r] -= 1
+        return cards
+
+    def _push(self, r: np.ndarray, d: np.ndarray, cards: np.ndarray) -> None:
+        self.up[r, d, self.up_n[r, d]] = cards
+        self.up_n[r, d] += 1
+
+    def _flip(self, r: np.ndarray, c: np.ndarray) -> None:
+        """Turn up the top hidden card of the columns left without visible cards."""
+        m = (self.up_n[r, c] == 0) & (self.hidden_n[r, c] > 0)
+        r, c = r[m], c[m]
+        self.hidden_n[r, c] -= 1
+        self.up[r, c, 0] = self.hidden[r, c, self.hidden_n[r, c]]
+        self.hidden[r, c, self.hidden_n[r, c]] = EMPTY
+        self.up_n[r, c] = 1
+
+    def _tableau_to_foundation(self, r: np.ndarray, c: np.ndarray, f: np.ndarray) -> None:
+        self.up_n[r, c] -= 1
+        self.foundations[r, f] = self.up[r, c, self.up_n[r, c]]
+        self.up[r, c, self.up_n[r, c]] = EMPTY
+        self._flip(r, c)
+
+    def _tableau_to_tableau(
+        self, r: np.ndarray, c: np.ndarray, d: np.ndarray, k: np.ndarray
+    ) -> None:
+        start = self.up_n[r, c] - k
+        for j in range(int(k.max(initial=0))):
+            m = j < k
+            rm, cm, dm = r[m], c[m], d[m]
+            self.up[rm, dm, self.up_n[rm, dm] + j] = self.up[rm, cm, start[m] + j]
+            self.up[rm, cm, start[m] + j] = EMPTY
+        self.up_n[r, d] += k
+        self.up_n[r, c] -= k
+        self._flip(r, c)
+
+    def _foundation_to_tableau(self, r: np.ndarray, f: np.ndarray, d: np.ndarray) -> None:
+        cards = self.foundations[r, f]
+        self.foundations[r, f] = np.where(_RANK[cards] == 0, EMPTY, cards - 1)
+        self._push(r, d, cards)
+
+
+def cross_check(seeds, steps: int = 200, seed: int = 0) -> int:
+    """Play random games in BatchEngine and in GameController side by side.
+
+    Every legal move set and every position is compared; a difference
+    raises AssertionError. Returns the number of positions compared.
+    """
+    from game import GameController
+
+    games = [GameController(s) for s in seeds]
+    engine = BatchEngine.from_seeds(seeds)
+    rng = np.random.default_rng(seed)
+    compared = 0
+    for step in range(steps):
+        mask = engine.legal_mask()
+        actions = random_actions(mask, rng)
+        for row, game in enumerate(games):
+            where = f"deal {game.seed}, move {step}"
+            if engine.state(row) != game.state():
+                raise AssertionError(f"{where}: positions differ")
+            legal = list(game.legal_moves())
+            expected = sorted(action_index(move) for move in legal)
+            if np.flatnonzero(mask[row]).tolist() != expected:
+                raise AssertionError(f"{where}: legal moves differ")
+            if actions[row] >= 0:
+                move = engine.move(row, actions[row])
+                if move not in legal:
+                    raise AssertionError(f"{where}: {move} is not legal")
+                game.apply(move)
+            compared += 1
+        engine.step(actions)
+    return compared
+
+
+def main(argv: list | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Vectorized game engine.")
+    parser.add_argument("--games", type=int, default=4096, help="games stepped at once")
+    parser.add_argument("--steps", type=int, default=300, help="random moves per game")
+    parser.add_argument(
+        "--check", type=int, default=0, metavar="N",
+        help="compare N deals with the object engine instead",
+    )
+    args = parser.parse_args(argv)
+
+    if args.check:
+        compared = cross_check(range(args.check), args.steps)
+        print(f"{compared} positions identical in both engines")
+        return
+
+    engine = BatchEngine.from_seeds(range(args.games))
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        engine.step(random_actions(engine.legal_mask(), rng))
+    elapsed = time.perf_counter() - start
+    print(f"{args.games * args.steps / elapsed:.0f} moves/s ({args.games} games)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,91 @@
+# cards defini
+family = ("pique", "trefle", "carreau", "coeur")
+height = ("as", "2", "3", "4", "5", "6", "7", "8", "9", "10", "valet", "dame", "roi")
+
+# A card is identified by an int id in 0..51: id = suit * 13 + rank.
+# This is also the order in which Stock builds the deck.
+DECK_SIZE = 52
+# Pseudo card id used as the "top card" of an empty pile in the rule tables.
+EMPTY = DECK_SIZE
+
+RANK = tuple(i % 13 for i in range(DECK_SIZE))
+SUIT = tuple(i // 13 for i in range(DECK_SIZE))
+# 0 = black (pique, trefle), 1 = red (carreau, coeur)
+COLOR = tuple(SUIT[i] // 2 for i in range(DECK_SIZE))
+
+_FAMILY_INDEX = {name: i for i, name in enumerate(family)}
+_HEIGHT_INDEX = {name: i for i, name in enumerate(height)}
+
+
+def _build_tableau_table() -> bytes:
+    """TABLEAU_STACK[top * 52 + card] is 1 if card can go on top in the tableau."""
+    table = bytearray((DECK_SIZE + 1) * DECK_SIZE)
+    for card in range(DECK_SIZE):
+        table[EMPTY * DECK_SIZE + card] = RANK[card] == 12
+        for top in range(DECK_SIZE):
+            table[top * DECK_SIZE + card] = (
+                COLOR[top] != COLOR[card] and RANK[card] == RANK[top] - 1
+            )
+    return bytes(table)
+
+
+def _build_foundation_table() -> bytes:
+    """FOUNDATION_STACK[top * 52 + card] is 1 if card can go on top in a foundation."""
+    table = bytearray((DECK_SIZE + 1) * DECK_SIZE)
+    for card in range(DECK_SIZE):
+        table[EMPTY * DECK_SIZE + card] = RANK[card] == 0
+        for top in range(DECK_SIZE):
+            table[top * DECK_SIZE + card] = (
+                SUIT[top] == SUIT[card] and RANK[card] == RANK[top] + 1
+            )
+    return bytes(table)
+
+
+# Row EMPTY (52) holds the rule for an empty pile, so lookups never branch.
+TABLEAU_STACK = _build_tableau_table()
+FOUNDATION_STACK = _build_foundation_table()
+
+
 class Card:
+    """A playing card stored as a compact int id plus its face-up flag.
+
+    ``family`` and ``value`` are derived from the id so the UI can keep
+    using the French names (e.g. for ``assets/cartes/{value}_{family}.png``).
+    """
+
+    __slots__ = ("id", "face")
+
     def __init__(self, c: str, h: str) -> None:
-        self.family = c
-        self.value = h
-        self.face = False
\ No newline at end of file
+        self.id = _FAMILY_INDEX[c] * 13 + _HEIGHT_INDEX[h]
+        self.face = False
+
+    @classmethod
+    def from_id(cls, card_id: int) -> "Card":
+        """Build a face-down card from its int id."""
+        card = cls.__new__(cls)
+        card.id = card_id
+        card.face = False
+        return card
+
+    @property
+    def family(self) -> str:
+        return family[SUIT[self.id]]
+
+    @property
+    def value(self) -> str:
+        return height[RANK[self.id]]
+
+    @property
+    def rank(self) -> int:
+        return RANK[self.id]
+
+    @property
+    def suit(self) -> int:
+        return SUIT[self.id]
+
+    @property
+    def color(self) -> int:
+        return COLOR[self.id]
+
+    def __repr__(self) -> str:
+        return f"Card({self.family!r}, {self.value!r})"
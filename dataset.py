@@ -0,0 +1,442 @@
+"""Labelled positions exported to memory-mapped .npy shards.
+
+Games are played from seeded deals, by the hint policy (selfplay.py) or
+along the winning line found by the solver, and every position met is
+written as one row of fixed-width arrays:
+
+    positions (N, POSITION_SIZE) int8: the full position, hidden cards
+        included (see encode_state / decode_state),
+    masks (N, MASK_BYTES) uint8: the legal actions of batch_engine.ACTIONS,
+        packed with np.packbits (np.unpackbits(..., count=N_ACTIONS)),
+    actions (N,) int16: the action played from the position (-1 at the
+        end of a game),
+    outcomes (N,) int8: 1 if the game was won from there, 0 if not (lost
+        for the solver, not won for the hint policy), -1 if unknown,
+    seeds (N,) int64 and plies (N,) int16: deal number and move number.
+
+Rows are appended as games arrive into shards of shard_size rows, one .npy
+file per array and shard, created with np.lib.format.open_memmap.
+manifest.json lists the fields, the shards and their row counts, and readers
+only trust it. It is rewritten (atomically) when a shard is complete, and
+every checkpoint_seconds with the rows of the open shard so far (flushed to
+its files first). A killed export thus loses at most the rows appended
+since the last checkpoint, and the dataset stays readable: the shard it was
+filling keeps its full-size files, of which the manifest counts the rows
+written. Dataset memory-maps the shards without loading them.
+
+Example:
+    $ python dataset.py data/ --source solver --start 0 --count 10000 -j 8
+
+    >>> data = Dataset("data/")
+    >>> len(data), data.fields
+    >>> positions = data.read("positions", 0, 4096)   # only these rows are read
+    >>> for positions, outcomes in data.batches(("positions", "outcomes"), 65536):
+    ...     train(positions, outcomes)
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import numpy as np
+from cartes import EMPTY
+from batch_engine import MAX_HIDDEN, MAX_RUN, N_ACTIONS, action_index
+from deals import COLUMNS, STOCK_SIZE
+from game import GameController
+from selfplay import play_game, WON as SELFPLAY_WON
+from solver import Solver, WON, LOST
+from state import GameState
+
+MANIFEST = "manifest.json"
+VERSION = 1
+
+# Position layout: every pile bottom to top, padded with EMPTY
+STOCK_AT = 0
+DISCARD_AT = STOCK_AT + STOCK_SIZE
+FOUNDATIONS_AT = DISCARD_AT + STOCK_SIZE
+COLUMNS_AT = FOUNDATIONS_AT + 4  # top card of each foundation
+HIDDEN_AT = COLUMNS_AT + COLUMNS * MAX_RUN
+POSITION_SIZE = HIDDEN_AT + COLUMNS * MAX_HIDDEN
+MASK_BYTES = (N_ACTIONS + 7) // 8
+
+# Field name -> (dtype, shape of a row)
+FIELDS = {
+    "positions": ("int8", (POSITION_SIZE,)),
+    "masks": ("uint8", (MASK_BYTES,)),
+    "actions": ("int16", ()),
+    "outcomes": ("int8", ()),
+    "seeds": ("int64", ()),
+    "plies": ("int16", ()),
+}
+
+
+def encode_state(state: GameState, out: np.ndarray) -> None:
+    """Write a position into a row of POSITION_SIZE int8."""
+    out[:] = EMPTY
+    out[STOCK_AT : STOCK_AT + len(state.stock)] = np.frombuffer(state.stock, np.int8)
+    out[DISCARD_AT : DISCARD_AT + len(state.discard)] = np.frombuffer(state.discard, np.int8)
+    for i, pile in enumerate(state.foundations):
+        if pile:
+            out[FOUNDATIONS_AT + i] = pile[-1]
+    for i in range(COLUMNS):
+        at = COLUMNS_AT + i * MAX_RUN
+        out[at : at + len(state.columns[i])] = np.frombuffer(state.columns[i], np.int8)
+        at = HIDDEN_AT + i * MAX_HIDDEN
+        out[at : at + len(state.hidden[i])] = np.frombuffer(state.hidden[i], np.int8)
+
+
+def decode_state(row: np.ndarray) -> GameState:
+    """The GameState of a row written by encode_state."""
+
+    def pile(start: int, size: int) -> bytes:
+        cards = row[start : start + size]
+        return cards[cards != EMPTY].tobytes()
+
+    foundations = tuple(
+        b"" if top == EMPTY else bytes(range(top - top % 13, top + 1))
+        for top in row[FOUNDATIONS_AT : FOUNDATIONS_AT + 4].tolist()
+    )
+    return GameState(
+        pile(STOCK_AT, STOCK_SIZE),
+        pile(DISCARD_AT, STOCK_SIZE),
+        foundations,
+        tuple(pile(COLUMNS_AT + i * MAX_RUN, MAX_RUN) for i in range(COLUMNS)),
+        tuple(pile(HIDDEN_AT + i * MAX_HIDDEN, MAX_HIDDEN) for i in range(COLUMNS)),
+    )
+
+
+def _rows(n: int) -> dict:
+    return {name: np.empty((n,) + shape, dtype) for name, (dtype, shape) in FIELDS.items()}
+
+
+def _encode_trace(seed: int, states: list, masks: list, actions: list, outcome: int) -> dict:
+    """Rows of one game: states[i] is followed by actions[i]."""
+    rows = _rows(len(states))
+    for i, state in enumerate(states):
+        encode_state(state, rows["positions"][i])
+    rows["masks"][:] = np.packbits(np.array(masks), axis=1)
+    rows["actions"][:] = actions
+    rows["outcomes"][:] = outcome
+    rows["seeds"][:] = seed
+    rows["plies"][:] = np.arange(len(states))
+    return rows
+
+
+def _mask(game: GameController) -> np.ndarray:
+    mask = np.zeros(N_ACTIONS, bool)
+    for move in game.legal_moves():
+        mask[action_index(move)] = True
+    return mask
+
+
+def _replay(game: GameController, moves: list) -> tuple:
+    """States, masks and actions along moves, plus the final position."""
+    states, masks, actions = [], [], []
+    for move in moves:
+        states.append(game.state())
+        masks.append(_mask(game))
+        actions.append(action_index(move))
+        game.apply(move)
+    states.append(game.state())
+    masks.append(_mask(game))
+    actions.append(-1)
+    return states, masks, actions
+
+
+def selfplay_trace(seed: int, max_turns: int = 2000) -> dict:
+    """Rows of the game of the hint policy on a deal (see selfplay.py)."""
+    moves = []
+    result = play_game(seed, max_turns, on_move=lambda game, move: moves.append(move))
+    states, masks, actions = _replay(GameController(seed), moves)
+    return _encode_trace(seed, states, masks, actions, int(result.outcome == SELFPLAY_WON))
+
+
+def solver_trace(seed: int, max_seconds: float | None = 1.0, max_nodes: int | None = None) -> dict:
+    """Rows of the winning line of a deal, all labelled won; a lost or
+    unsolved deal gives its first position only, labelled 0 or -1."""
+    game = GameController(seed)
+    result = Solver(max_nodes=max_nodes, max_seconds=max_seconds).solve(game)
+    outcome = {WON: 1, LOST: 0}.get(result.status, -1)
+    states, masks, actions = _replay(game, result.moves)
+    return _encode_trace(seed, states, masks, actions, outcome)
+
+
+def export_chunk(seeds: list, source: str, options: dict) -> dict:
+    """Worker task: the rows of a chunk of deals, concatenated."""
+    trace = selfplay_trace if source == "selfplay" else solver_trace
+    traces = [trace(seed, **options) for seed in seeds]
+    return {name: np.concatenate([t[name] for t in traces]) for name in FIELDS}
+
+
+class DatasetWriter:
+    """Streams rows into the shards of a dataset directory.
+
+    An existing dataset is appended to: new rows start a new shard after
+    the ones in its manifest. Rows are in the manifest, so safe from a
+    crash, once their shard is complete or at the first append()
+    checkpoint_seconds after the previous checkpoint.
+
+    Args:
+        path (str): Dataset directory, created if needed.
+        shard_size (int): Rows per shard.
+        meta (dict, optional): Free-form description of the rows (source,
+            budgets...), stored in the manifest with each shard.
+        checkpoint_seconds (float): Time between two manifest rewrites
+            recording the rows of the open shard.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        shard_size: int = 1 << 20,
+        meta: dict | None = None,
+        checkpoint_seconds: float = 10.0,
+    ) -> None:
+        self.path = path
+        self.shard_size = shard_size
+        self.checkpoint_seconds = checkpoint_seconds
+        os.makedirs(path, exist_ok=True)
+        manifest_path = os.path.join(path, MANIFEST)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {
+                "version": VERSION,
+                "fields": {name: [dtype, list(shape)] for name, (dtype, shape) in FIELDS.items()},
+                "rows": 0,
+                "shards": [],
+            }
+        self.meta = meta or {}
+        self._shard = None
+        self._index = len(self.manifest["shards"])
+        self._filled = 0
+        # Rows of the open shard already in the manifest
+        self._recorded = None
+        self._checkpoint_at = time.perf_counter()
+
+    def _file(self, index: int, name: str) -> str:
+        return f"shard-{index:05d}.{name}.npy"
+
+    def _open_shard(self) -> None:
+        self._index = len(self.manifest["shards"])
+        self._shard = {
+            name: np.lib.format.open_memmap(
+                os.path.join(self.path, self._file(self._index, name)),
+                mode="w+",
+                dtype=dtype,
+                shape=(self.shard_size,) + shape,
+            )
+            for name, (dtype, shape) in FIELDS.items()
+        }
+        self._filled = 0
+        self._recorded = None
+
+    def _record_shard(self) -> None:
+        """Flush the open shard and write the manifest with its rows."""
+        for array in self._shard.values():
+            array.flush()
+        entry = {
+            "rows": self._filled,
+            "files": {name: self._file(self._index, name) for name in FIELDS},
+            "meta": self.meta,
+        }
+        if self._recorded is None:
+            self.manifest["shards"].append(entry)
+            self.manifest["rows"] += self._filled
+        else:
+            self.manifest["shards"][-1] = entry
+            self.manifest["rows"] += self._filled - self._recorded
+        self._recorded = self._filled
+        self._save_manifest()
+        self._checkpoint_at = time.perf_counter()
+
+    def _close_shard(self) -> None:
+        """Flush the open shard (cut to its rows), unmap it and record it."""
+        rows = self._filled
+        parts = {}
+        for name in FIELDS:
+            array = self._shard.pop(name)
+            array.flush()
+            if rows < self.shard_size:
+                parts[name] = np.array(array[:rows])
+            mapping = array._mmap
+            del array
+            # Unmap before the file is replaced (Windows refuses to replace
+            # a mapped file); raises BufferError if a view of it is left
+            mapping.close()
+        for name, part in parts.items():
+            # Rewrite with the exact shape, so the file stands on its own
+            path = os.path.join(self.path, self._file(self._index, name))
+            with open(path + ".tmp", "wb") as f:
+                np.save(f, part)
+            os.replace(path + ".tmp", path)
+        self._record_shard()
+        self._shard = None
+
+    def _save_manifest(self) -> None:
+        path = os.path.join(self.path, MANIFEST)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=1)
+        os.replace(path + ".tmp", path)
+
+    def append(self, rows: dict) -> None:
+        """Append rows given as {field: array}, all with the same length."""
+        n = len(rows["positions"])
+        at = 0
+        while at < n:
+            if self._shard is None:
+                self._open_shard()
+            take = min(n - at, self.shard_size - self._filled)
+            for name in FIELDS:
+                self._shard[name][self._filled : self._filled + take] = rows[name][at : at + take]
+            self._filled += take
+            at += take
+            if self._filled == self.shard_size:
+                self._close_shard()
+        if (
+            self._shard is not None
+            and self._filled != self._recorded
+            and time.perf_counter() - self._checkpoint_at >= self.checkpoint_seconds
+        ):
+            self._record_shard()
+
+    def close(self) -> None:
+        """Record the last, partial shard."""
+        if self._shard is not None and self._filled:
+            self._close_shard()
+        self._shard = None
+
+    def __enter__(self) -> "DatasetWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class Dataset:
+    """Read-only view of a dataset directory, shard files memory-mapped.
+
+    Args:
+        path (str): Dataset directory (with its manifest.json).
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(os.path.join(path, MANIFEST), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        self.fields = list(self.manifest["fields"])
+        self._maps = {}
+        # First row of each shard, and the end
+        self._starts = [0]
+        for shard in self.manifest["shards"]:
+            self._starts.append(self._starts[-1] + shard["rows"])
+
+    def __len__(self) -> int:
+        return self._starts[-1]
+
+    def shard(self, index: int, name: str) -> np.ndarray:
+        """Memory map of one field of one shard."""
+        key = (index, name)
+        if key not in self._maps:
+            shard = self.manifest["shards"][index]
+            array = np.load(os.path.join(self.path, shard["files"][name]), mmap_mode="r")
+            self._maps[key] = array[: shard["rows"]]
+        return self._maps[key]
+
+    def read(self, name: str, start: int, stop: int) -> np.ndarray:
+        """Rows start to stop - 1 of a field, across shards."""
+        stop = min(stop, len(self))
+        parts = []
+        index = int(np.searchsorted(self._starts, start, side="right")) - 1
+        while start < stop:
+            first = self._starts[index]
+            end = min(stop, self._starts[index + 1])
+            parts.append(self.shard(index, name)[start - first : end - first])
+            start = end
+            index += 1
+        if len(parts) == 1:
+            return parts[0]
+        dtype, shape = self.manifest["fields"][name]
+        return np.concatenate(parts) if parts else np.empty((0, *shape), dtype)
+
+    def batches(self, names: tuple, size: int):
+        """Yield tuples of size rows of the named fields, in order."""
+        for start in range(0, len(self), size):
+            yield tuple(self.read(name, start, start + size) for name in names)
+
+
+def export(
+    path: str,
+    seeds,
+    source: str = "solver",
+    workers: int | None = None,
+    shard_size: int = 1 << 20,
+    chunk_size: int = 16,
+    log=sys.stderr,
+    **options,
+) -> int:
+    """Play every seed with source ("selfplay" or "solver", options going
+    to selfplay_trace or solver_trace) and append the rows to the dataset
+    at path. Returns the number of rows written.
+
+    Seeds are taken lazily and at most two chunks per worker are in flight,
+    so seeds can be any iterable, however long; rows are appended in the
+    order of the seeds."""
+    seeds = iter(seeds)
+    workers = workers or os.cpu_count() or 1
+    written = 0
+    done = 0
+    start = time.perf_counter()
+    meta = {"source": source, **options}
+    with DatasetWriter(path, shard_size, meta) as writer, ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+        while True:
+            while len(pending) < 2 * workers:
+                chunk = list(islice(seeds, chunk_size))
+                if not chunk:
+                    break
+                pending.append(pool.submit(export_chunk, chunk, source, options))
+            if not pending:
+                break
+            rows = pending.popleft().result()
+            writer.append(rows)
+            written += len(rows["positions"])
+            done += 1
+            if log and done % 64 == 0:
+                elapsed = time.perf_counter() - start
+                print(f"{written} rows, {written / elapsed:.0f} rows/s", file=log, flush=True)
+    return written
+
+
+def main(argv: list | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Export labelled positions to .npy shards.")
+    parser.add_argument("path", help="dataset directory")
+    parser.add_argument("--source", choices=("solver", "selfplay"), default="solver")
+    parser.add_argument("--start", type=int, default=0, help="first seed")
+    parser.add_argument("--count", type=int, default=1000, help="number of seeds")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="processes")
+    parser.add_argument("--shard-size", type=int, default=1 << 20, help="rows per shard")
+    parser.add_argument(
+        "--max-seconds", type=float, default=1.0, help="solver budget per deal"
+    )
+    args = parser.parse_args(argv)
+
+    options = {"max_seconds": args.max_seconds} if args.source == "solver" else {}
+    rows = export(
+        args.path,
+        range(args.start, args.start + args.count),
+        source=args.source,
+        workers=args.workers,
+        shard_size=args.shard_size,
+        **options,
+    )
+    print(f"{rows} rows written to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
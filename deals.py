@@ -0,0 +1,85 @@
+"""Reproducible deals: deal numbers to initial layouts, in bulk.
+
+A deal number is the seed of Game: Game(seed=n) shuffles the 52 cards (in
+card id order) with random.Random(n), then Grid deals from the top of the
+stock, one visible card per column first, then the hidden cards of columns
+1 to 6. This module reproduces that without building any Card, pile or
+GameController, so ranges of deals can be generated fast for benchmarks,
+batch jobs and precomputed tables.
+
+A deal order is a bytes of the 52 card ids as the shuffled stock holds them,
+bottom to top. Orders of consecutive deal numbers are packed back to back by
+deal_orders().
+
+Example:
+    >>> block = deal_orders(0, 1000)          # 52000 bytes
+    >>> deal = layout(block[52 * 7 : 52 * 8]) # deal number 7
+    >>> deal.visible, deal.hidden[6], len(deal.stock)
+"""
+
+import random
+from collections import namedtuple
+from cartes import DECK_SIZE
+from state import GameState
+
+COLUMNS = 7
+# Cards left in the stock after dealing the tableau
+STOCK_SIZE = DECK_SIZE - COLUMNS * (COLUMNS + 1) // 2
+
+# stock: bytes of card ids bottom to top (the top is drawn first),
+# hidden: one bytes per column, bottom to top,
+# visible: bytes of the face-up card of each column.
+Deal = namedtuple("Deal", "stock hidden visible")
+
+
+def deal_order(seed: int) -> bytes:
+    """Return the shuffled stock of a deal number, bottom to top."""
+    order = list(range(DECK_SIZE))
+    random.Random(seed).shuffle(order)
+    return bytes(order)
+
+
+def deal_orders(start: int, stop: int) -> bytes:
+    """Return the orders of deal numbers start to stop - 1, back to back
+    (DECK_SIZE bytes each). One generator is reseeded for every deal."""
+    rng = random.Random()
+    shuffle = rng.shuffle
+    deck = list(range(DECK_SIZE))
+    block = bytearray()
+    for seed in range(start, stop):
+        rng.seed(seed)
+        order = deck[:]
+        shuffle(order)
+        block += bytes(order)
+    return bytes(block)
+
+
+def layout(order: bytes) -> Deal:
+    """Split a deal order into the initial stock and columns, as Grid deals it."""
+    top = DECK_SIZE - 1
+    visible = bytes(order[top - i] for i in range(COLUMNS))
+    top -= COLUMNS
+    hidden = []
+    for i in range(COLUMNS):
+        # Popped one by one from the top, pushed onto the column's stack
+        hidden.append(bytes(order[top - j] for j in range(i)))
+        top -= i
+    return Deal(bytes(order[: top + 1]), tuple(hidden), visible)
+
+
+def initial_state(deal: Deal) -> GameState:
+    """The position of a deal before any move (GameController(seed).state())."""
+    return GameState(
+        deal.stock,
+        b"",
+        (b"",) * 4,
+        tuple(deal.visible[i : i + 1] for i in range(COLUMNS)),
+        deal.hidden,
+    )
+
+
+def layouts(start: int, stop: int):
+    """Yield (deal number, Deal) for deal numbers start to stop - 1."""
+    block = deal_orders(start, stop)
+    for k, seed in enumerate(range(start, stop)):
+        yield seed, layout(block[k * DECK_SIZE : (k + 1) * DECK_SIZE])
@@ -1,11 +1,23 @@
 from collections import deque
-from cartes import Card
-from piles import Stock, Stack, height
+from cartes import Card, DECK_SIZE, EMPTY, TABLEAU_STACK
+from piles import Stock, Stack
 
 
 class Queue:
     def __init__(self) -> None:
         self.items = deque()
+        self._observers = []
+
+    def __getstate__(self) -> dict:
+        """Observers are neither copied nor pickled with the queue."""
+        state = self.__dict__.copy()
+        state["_observers"] = []
+        return state
+
+    def observe(self, callback) -> None:
+        """Call callback(queue, added, card) after each enqueue (added=True)
+        or dequeue."""
+        self._observers.append(callback)
 
     def is_empty(self) -> bool:
         return len(self.items) == 0
@@ -13,10 +25,15 @@ class Queue:
     def enqueue(self, item) -> None:
         # Append to the right so the newest card becomes the top (peek() uses [-1])
         self.items.append(item)
+        for callback in self._observers:
+            callback(self, True, item)
 
     def dequeue(self) -> Card | None:
         if not self.is_empty():
-            return self.items.pop()
+            item = self.items.pop()
+            for callback in self._observers:
+                callback(self, False, item)
+            return item
         else:
             return None
 
@@ -43,22 +60,8 @@ class Game_queue(Queue):
 
     def can_stack(self, elem: Card) -> bool:
         """Check if a card can be placed on this tableau pile."""
-        if self.is_empty():
-            return elem.value == "roi"
-        else:
-            top_card = self.peek()
-            if top_card.family in ("pique", "trefle"):
-                return (
-                    elem.family in ("coeur", "carreau")
-                    and height.index(elem.value) == height.index(top_card.value) - 1
-                )
-            elif top_card.family in ("coeur", "carreau"):
-                return (
-                    elem.family in ("pique", "trefle")
-                    and height.index(elem.value) == height.index(top_card.value) - 1
-                )
-            else:
-                return False
+        top = self.items[-1].id if self.items else EMPTY
+        return TABLEAU_STACK[top * DECK_SIZE + elem.id] == 1
 
     def move(self, num_cards: int, destination_queue: "Game_queue") -> bool:
         """Move the bottom num_cards cards from this queue to destination."""
@@ -1,47 +1,108 @@
+import random
+from array import array
+from collections import namedtuple
 from copy import deepcopy
 from piles import Stock, DiscardPile, FinalPile
 from files import Grid, Game_queue
-from typing import Union
-import tkinter as tk
-from cartes import Card
+from cartes import Card, DECK_SIZE, EMPTY, TABLEAU_STACK, FOUNDATION_STACK
+from state import (
+    GameState,
+    ZOBRIST,
+    MAX_DEPTH,
+    SYMMETRIC_SLOT,
+    zobrist_hash,
+    symmetric_parts,
+    combine_symmetric,
+    canonical,
+)
+from moves import (
+    DRAW,
+    RECYCLE,
+    DISCARD_TO_FOUNDATION,
+    DISCARD_TO_TABLEAU,
+    TABLEAU_TO_FOUNDATION,
+    TABLEAU_TO_TABLEAU,
+    FOUNDATION_TO_TABLEAU,
+    FLIP,
+    CHAINED,
+    pack,
+    unpack,
+)
+
+# One pile touched by a move: pile is "stock", "discard", "foundation",
+# "column" (visible cards of a tableau column) or "hidden" (its face-down
+# cards); index is the foundation or column index (0 otherwise); gained and
+# lost are the ids of the cards that entered and left the pile.
+PileChange = namedtuple("PileChange", "pile index gained lost")
 
 
 class Game:
-    """Represents the overall game state."""
+    """Represents the overall game state.
 
-    def __init__(self) -> None:
+    Args:
+        seed (int, optional): Deal number. The same seed always deals the same
+            game (see deals.py); without one, a seed is drawn from the global
+            random module. The game shuffles with its own random.Random, so
+            dealing never disturbs the global generator.
+    """
+
+    def __init__(self, seed: int | None = None) -> None:
+        if seed is None:
+            seed = random.getrandbits(32)
+        self.seed = seed
         self.stock = Stock()
-        self.stock.shuffle()
+        self.stock.shuffle(random.Random(seed))
         self.discard_pile = DiscardPile()
         self.final_piles = [FinalPile() for _ in range(4)]
         self.grid = Grid(self.stock)
 
 
 class Save:
-    """Handles saving and undoing game states."""
+    """Undo/redo journal of the moves played.
+
+    Each entry is a packed int (see moves.pack) holding only the reversible
+    delta of a move: kind, source, destination, card count and whether a
+    hidden card was flipped. Moves played automatically right after another
+    one are flagged CHAINED and are undone/redone together with it.
+    """
 
-    def __init__(self, game: Game) -> None:
+    def __init__(self, game: "GameController") -> None:
         self.game = game
-        self.history = []
-
-    def save_state(self) -> None:
-        """Save current game state."""
-        state = {
-            "stock": deepcopy(self.game.stock),
-            "discard_pile": deepcopy(self.game.discard_pile),
-            "final_piles": deepcopy(self.game.final_piles),
-            "grid": deepcopy(self.game.grid),
-        }
-        self.history.append(state)
+        self.history = array("I")
+        self.redo_history = array("I")
+
+    def record(
+        self,
+        kind: int,
+        src: int,
+        dst: int,
+        count: int,
+        flipped: bool = False,
+        chained: bool = False,
+    ) -> None:
+        """Record a move that has just been played. Clears the redo path."""
+        flags = (FLIP if flipped else 0) | (CHAINED if chained else 0)
+        self.history.append(pack(kind, src, dst, count, flags))
+        del self.redo_history[:]
 
     def undo(self) -> None:
-        """Restore previous game state."""
-        if self.history:
-            state = self.history.pop()
-            self.game.stock = state["stock"]
-            self.game.discard_pile = state["discard_pile"]
-            self.game.final_piles = state["final_piles"]
-            self.game.grid = state["grid"]
+        """Revert the last move, together with the moves chained to it."""
+        while self.history:
+            entry = self.history.pop()
+            self.game._revert(entry)
+            self.redo_history.append(entry)
+            if not unpack(entry)[4] & CHAINED:
+                break
+
+    def redo(self) -> None:
+        """Play again the last undone move, together with its chained moves."""
+        while self.redo_history:
+            entry = self.redo_history.pop()
+            kind, src, dst, count, _ = unpack(entry)
+            self.game._do(kind, src, dst, count)
+            self.history.append(entry)
+            if not (self.redo_history and unpack(self.redo_history[-1])[4] & CHAINED):
+                break
 
 
 class GameController(Game):
@@ -52,54 +113,320 @@ class GameController(Game):
     des états, l'auto-complétion et le système d'indices.
 
     Attributes:
-        save (Save): Gestionnaire de sauvegarde et d'annulation des coups.
+        seed (int): Numéro de la donne, qui permet de la rejouer.
+        zobrist (int): Hash 64 bits de la position, mis à jour à chaque coup.
+        symmetric_zobrist (int): Hash qui ignore l'ordre des colonnes et des
+            fondations, pour les recherches.
+        save (Save): Journal des coups permettant d'annuler et de rejouer.
         turns (int): Nombre de coups effectués depuis le début de la partie.
-        _redraw_callback (callable, optional): Fonction callback pour redessiner l'interface
-            pendant l'auto-complétion.
+        stock_seen (bool): Vrai dès que la défausse a été recyclée une fois :
+            le joueur a vu tout le talon. Reste vrai après une annulation,
+            est copié par clone() et conservé par set_state().
+        _listeners (dict): Abonnés aux événements du jeu, par nom d'événement.
+            "auto_complete" reçoit les coups de fin de partie à jouer,
+            "auto_move" est émis après chaque carte posée par l'auto-complétion,
+            "victory" quand les quatre fondations sont complètes,
+            "change" après chaque coup joué, annulé ou rejoué, avec la liste
+            des PileChange des piles modifiées.
 
     Inherits:
         Game: Classe de base contenant l'état du jeu (stock, défausse, fondations, tableau).
 
     Examples:
 game = GameController()
+        >>> game = GameController(seed=42)  # Donne n°42, toujours la même
         >>> game.draw_from_stock()  # Tirer 3 cartes
         >>> game.undo_move()  # Annuler le dernier coup
+        >>> game.redo_move()  # Rejouer le coup annulé
         >>> hint = game.get_hint_message()  # Obtenir un indice
     """
 
-    def __init__(self) -> None:
-        super().__init__()
+    def __init__(self, seed: int | None = None) -> None:
+        super().__init__(seed)
         self.save = Save(self)
         self.turns = 0
-        # Optional callback that will be called when the game is completed
-        self.on_victory = None
+        self.stock_seen = False
+        # Event name -> callbacks, see subscribe()
+        self._listeners = {}
+        # (pile, index) -> (gained, lost) card ids since the last "change",
+        # None until something subscribes to "change"
+        self._changes = None
+        self._track_hash()
+
+    def clone(self) -> "GameController":
+        """Return a detached copy of the current position, with an empty
+        journal and no event listeners (used by searches and background hints)."""
+        copy = type(self).__new__(type(self))
+        copy.stock, copy.discard_pile, copy.final_piles, copy.grid = deepcopy(
+            (self.stock, self.discard_pile, self.final_piles, self.grid)
+        )
+        copy.seed = self.seed
+        copy.save = Save(copy)
+        copy.turns = self.turns
+        copy.stock_seen = self.stock_seen
+        copy._listeners = {}
+        copy._changes = None
+        copy._track_hash()
+        return copy
+
+    @classmethod
+    def from_state(cls, state: GameState) -> "GameController":
+        """Build a game at a given position, with an empty journal."""
+        game = cls()
+        game.set_state(state)
+        return game
+
+    def _piles(self) -> list:
+        """Return every pile as (name, index, pile), in hash slot order
+        (see state.py). name is the one used by PileChange."""
+        piles = [("stock", 0, self.stock), ("discard", 0, self.discard_pile)]
+        piles += [("foundation", i, p) for i, p in enumerate(self.final_piles)]
+        piles += [("column", i, q) for i, q in enumerate(self.grid.queue)]
+        piles += [("hidden", i, s) for i, s in enumerate(self.grid.stack)]
+        return piles
+
+    def state(self) -> GameState:
+        """Return an immutable snapshot of the position."""
+        ids = lambda pile: bytes(c.id for c in pile.items)
+        return GameState(
+            ids(self.stock),
+            ids(self.discard_pile),
+            tuple(ids(p) for p in self.final_piles),
+            tuple(ids(q) for q in self.grid.queue),
+            tuple(ids(s) for s in self.grid.stack),
+        )
+
+    def set_state(self, state: GameState) -> None:
+        """Put the game at the position of a snapshot. The journal is cleared
+        (the turn count and stock_seen are kept) and "change" is emitted for
+        every pile."""
+        for (name, _, pile), cards in zip(self._piles(), state.piles()):
+            take = pile.dequeue if name == "column" else pile.pop
+            put = pile.enqueue if name == "column" else pile.push
+            while pile.items:
+                take()
+            for card_id in cards:
+                card = Card.from_id(card_id)
+                card.face = name == "column"
+                put(card)
+        del self.save.history[:]
+        del self.save.redo_history[:]
+        self._flush_changes()
+
+    def canonical(self) -> GameState:
+        """Return the canonical form of the position (see state.canonical):
+        the same for every position equivalent by column order, foundation
+        slots or colour-preserving suit swaps."""
+        return canonical(self.state())
+
+    def save_game(self, path: str, snapshot_every: int = 0) -> None:
+        """Save the game (deal number and journal) to a binary file, with a
+        snapshot of the position every snapshot_every moves (see savefile.py)."""
+        from savefile import save
+
+        save(self, path, snapshot_every)
+
+    @classmethod
+    def load_game(cls, path: str, move: int | None = None) -> "GameController":
+        """Load a game saved by save_game, at its last move or after move
+        moves (the following ones can be redone)."""
+        from savefile import load
+
+        return load(path, move)
+
+    @property
+    def zobrist(self) -> int:
+        """64-bit Zobrist hash of the position (see state.py)."""
+        return self._zobrist
+
+    @property
+    def symmetric_zobrist(self) -> int:
+        """64-bit hash of the position that ignores the order of the columns
+        and of the foundations (see state.symmetric_hash)."""
+        return combine_symmetric(self._symmetric, self._column_hashes)
+
+    def _track_hash(self) -> None:
+        """Compute the hashes and keep them up to date by observing the
+        piles: a card pushed at depth d, or popped from it, toggles the key of
+        (pile slot, d, card), in the exact and in the symmetric hash."""
+        state = self.state()
+        self._zobrist = zobrist_hash(state)
+        self._symmetric, self._column_hashes = symmetric_parts(state)
+        for slot, (name, index, pile) in enumerate(self._piles()):
+            base = slot * MAX_DEPTH
+            shared = SYMMETRIC_SLOT[slot] * MAX_DEPTH
+            column = index if name in ("column", "hidden") else None
+
+            def changed(
+                pile,
+                added: bool,
+                card: Card,
+                base: int = base,
+                shared: int = shared,
+                column: int | None = column,
+            ) -> None:
+                depth = len(pile.items) - 1 if added else len(pile.items)
+                self._zobrist ^= ZOBRIST[(base + depth) * DECK_SIZE + card.id]
+                key = ZOBRIST[(shared + depth) * DECK_SIZE + card.id]
+                if column is None:
+                    self._symmetric ^= key
+                else:
+                    self._column_hashes[column] ^= key
+
+            pile.observe(changed)
+
+    def subscribe(self, event: str, callback) -> None:
+        """Register a callback for a game event
+        ("auto_complete", "auto_move", "victory", "change")."""
+        if event == "change" and self._changes is None:
+            self._watch_piles()
+        self._listeners.setdefault(event, []).append(callback)
+
+    def unsubscribe(self, event: str, callback) -> None:
+        """Remove a callback registered with subscribe()."""
+        callbacks = self._listeners.get(event, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    def _emit(self, event: str, *args) -> None:
+        """Call every callback subscribed to event."""
+        for callback in list(self._listeners.get(event, ())):
+            callback(*args)
+
+    def _watch_piles(self) -> None:
+        """Observe every pile to collect the changes sent with "change"."""
+        self._changes = {}
+        for name, index, pile in self._piles():
+            pile.observe(
+                lambda _, added, card, key=(name, index): self._pile_changed(
+                    key, added, card
+                )
+            )
+
+    def _pile_changed(self, key: tuple, added: bool, card: Card) -> None:
+        """Pile observer: record a card entering or leaving a pile. A card
+        that leaves and comes back before the next "change" cancels out."""
+        gained, lost = self._changes.setdefault(key, ([], []))
+        if added:
+            if card.id in lost:
+                lost.remove(card.id)
+            else:
+                gained.append(card.id)
+        elif card.id in gained:
+            gained.remove(card.id)
+        else:
+            lost.append(card.id)
+
+    def _flush_changes(self) -> None:
+        """Emit "change" with the piles modified since the last call."""
+        if not self._changes:
+            return
+        changes = [
+            PileChange(name, index, gained, lost)
+            for (name, index), (gained, lost) in self._changes.items()
+            if gained or lost
+        ]
+        self._changes.clear()
+        if changes:
+            self._emit("change", changes)
+
+    def _do(self, kind: int, src: int, dst: int, count: int) -> bool:
+        """Apply a move without checking it.
+        Returns True if a hidden tableau card was flipped by the move."""
+        if kind == DRAW:
+            for _ in range(count):
+                self.discard_pile.push(self.stock.pop())
+            return False
+        if kind == RECYCLE:
+            for _ in range(count):
+                self.stock.push(self.discard_pile.pop())
+            self.stock_seen = True
+            return False
+        if kind == DISCARD_TO_FOUNDATION:
+            self.final_piles[dst].push(self.discard_pile.pop())
+            return False
+        if kind == DISCARD_TO_TABLEAU:
+            self.grid.game[dst][0].enqueue(self.discard_pile.pop())
+            return False
+        if kind == FOUNDATION_TO_TABLEAU:
+            self.grid.game[dst][0].enqueue(self.final_piles[src].pop())
+            return False
+
+        queue, stack = self.grid.game[src]
+        if kind == TABLEAU_TO_FOUNDATION:
+            self.final_piles[dst].push(queue.dequeue())
+        else:
+            dest_queue = self.grid.game[dst][0]
+            moved = [queue.dequeue() for _ in range(count)]
+            for card in reversed(moved):
+                dest_queue.enqueue(card)
+        if queue.is_empty() and not stack.is_empty():
+            stack.flip_into_queue(queue)
+            return True
+        return False
+
+    def _revert(self, entry: int) -> None:
+        """Undo a journal entry produced by Save.record."""
+        kind, src, dst, count, flags = unpack(entry)
+        if flags & FLIP:
+            queue, stack = self.grid.game[src]
+            card = queue.dequeue()
+            card.face = False
+            stack.push(card)
+
+        if kind == DRAW:
+            for _ in range(count):
+                self.stock.push(self.discard_pile.pop())
+        elif kind == RECYCLE:
+            for _ in range(count):
+                self.discard_pile.push(self.stock.pop())
+        elif kind == DISCARD_TO_FOUNDATION:
+            self.discard_pile.push(self.final_piles[dst].pop())
+        elif kind == DISCARD_TO_TABLEAU:
+            self.discard_pile.push(self.grid.game[dst][0].dequeue())
+        elif kind == FOUNDATION_TO_TABLEAU:
+            self.final_piles[src].push(self.grid.game[dst][0].dequeue())
+        elif kind == TABLEAU_TO_FOUNDATION:
+            self.grid.game[src][0].enqueue(self.final_piles[dst].pop())
+        else:
+            queue = self.grid.game[dst][0]
+            moved = [queue.dequeue() for _ in range(count)]
+            for card in reversed(moved):
+                self.grid.game[src][0].enqueue(card)
+
+    def _play(
+        self, kind: int, src: int, dst: int, count: int, chained: bool = False
+    ) -> bool:
+        """Apply a checked move, journal it and count the turn."""
+        flipped = self._do(kind, src, dst, count)
+        self.save.record(kind, src, dst, count, flipped, chained)
+        self.turns += 1
+        self._flush_changes()
+        return flipped
+
+    def _pile_index(self, pile: Game_queue | FinalPile) -> int | None:
+        """Return the index of a tableau queue or foundation pile."""
+        piles = self.final_piles if isinstance(pile, FinalPile) else self.grid.queue
+        for i, elem in enumerate(piles):
+            if elem is pile:
+                return i
+        return None
 
     def recycle_discard_to_stock(self) -> None:
         """Recycle all cards from the discard pile back to the stock."""
-        while not self.discard_pile.is_empty():
-            card = self.discard_pile.pop()
-            if card:
-                self.stock.push(card)
+        if not self.discard_pile.is_empty():
+            self._play(RECYCLE, 0, 0, self.discard_pile.size())
 
     def draw_from_stock(self) -> None:
         """Draw up to three cards from the stock to the discard pile."""
-        self.save.save_state()
-
         if self.stock.is_empty():
             if not self.discard_pile.is_empty():
                 self.recycle_discard_to_stock()
-                self.turns += 1
                 self._normalize_grid()
-                return
-            else:
-                return
+            return
 
-        drawn_cards = self.stock.draw()
-        if drawn_cards:
-            for card in drawn_cards:
-                self.discard_pile.push(card)
-            self.turns += 1
-            self._normalize_grid()
+        self._play(DRAW, 0, 0, min(3, self.stock.size()))
+        self._normalize_grid()
 
     def _normalize_grid(self) -> None:
         """Normalize the grid if the method exists."""
@@ -109,114 +436,62 @@ game = GameController()
         except Exception as e:
             pass
 
-    def move_from_discard(self, destination: Union[FinalPile, Game_queue]) -> bool:
+    def move_from_discard(self, destination: FinalPile | Game_queue) -> bool:
         """Move top card from discard pile to destination."""
-        self.save.save_state()
-
-        card_to_move = self.discard_pile.pop()
-        dest_pile_index = None
-
-        if isinstance(destination, Game_queue):
-            for i, elem in enumerate(self.grid.game):
-                if elem[0] == destination:
-                    dest_pile_index = i
-                    break
-
-        if card_to_move:
-            if isinstance(destination, FinalPile):
-                if destination.can_stack(card_to_move):
-                    destination.push(card_to_move)
-                    self.turns += 1
-                    self._normalize_grid()
-                    self.check_and_auto_complete()
-                    return True
-                else:
-                    self.discard_pile.push(card_to_move)
-                    self.save.history.pop()
-                    return False
-            elif isinstance(destination, Game_queue):
-                if destination.can_stack(card_to_move):
-                    destination.enqueue(card_to_move)
-                    self.turns += 1
-                    self._normalize_grid()
-                    return True
-                else:
-                    self.discard_pile.push(card_to_move)
-                    self.save.history.pop()
-                    return False
-        return False
+        card_to_move = self.discard_pile.peek()
+        dest_index = self._pile_index(destination)
+        if card_to_move is None or dest_index is None:
+            return False
+        if not destination.can_stack(card_to_move):
+            return False
 
-    def _reveal_top_card(self, pile_index: int) -> None:
-        """reveal the top hidden card of the specified tableau pile if needed."""
-        try:
-            elem = self.grid.game[pile_index]
-            queue = elem[0]
-            stack = elem[1]
-
-            if queue.is_empty() and not stack.is_empty():
-                card = stack.pop()
-                if card:
-                    card.face = True
-                    queue.enqueue(card)
-                    self.check_and_auto_complete()
-        except Exception as e:
-            pass
+        if isinstance(destination, FinalPile):
+            self._play(DISCARD_TO_FOUNDATION, 0, dest_index, 1)
+            self._normalize_grid()
+            self.check_and_auto_complete()
+        else:
+            self._play(DISCARD_TO_TABLEAU, 0, dest_index, 1)
+            self._normalize_grid()
+        return True
 
     def move_card(
         self,
-        source: Union[Game_queue, FinalPile],
-        destination: Union[Game_queue, FinalPile],
+        source: Game_queue | FinalPile,
+        destination: Game_queue | FinalPile,
         num_cards: int = 1,
     ) -> bool:
         """Move card from source to destination if the move is valid."""
-        self.save.save_state()
-
-        source_pile_index = None
-
-        for i, elem in enumerate(self.grid.game):
-            if elem[0] == source:
-                source_pile_index = i
-                break
+        src_index = self._pile_index(source)
+        dest_index = self._pile_index(destination)
+        if src_index is None or dest_index is None or source is destination:
+            return False
 
         if isinstance(source, Game_queue) and isinstance(destination, Game_queue):
-            if source.move(num_cards, destination):
-                self.turns += 1
-                if source_pile_index is not None:
-                    self._reveal_top_card(source_pile_index)
-                self._normalize_grid()
-                return True
-            else:
-                self.save.history.pop()
+            if not 0 < num_cards <= source.size():
+                return False
+            if not destination.can_stack(source.items[-num_cards]):
                 return False
+            if self._play(TABLEAU_TO_TABLEAU, src_index, dest_index, num_cards):
+                self.check_and_auto_complete()
+            self._normalize_grid()
+            return True
 
         elif isinstance(source, Game_queue) and isinstance(destination, FinalPile):
-            card_to_move = source.dequeue()
-            if card_to_move and destination.can_stack(card_to_move):
-                destination.push(card_to_move)
-                self.turns += 1
-                if source_pile_index is not None:
-                    self._reveal_top_card(source_pile_index)
-                self._normalize_grid()
-                self.check_and_auto_complete()
-                return True
-            else:
-                if card_to_move:
-                    source.enqueue(card_to_move)
-                self.save.history.pop()
+            card_to_move = source.peek()
+            if card_to_move is None or not destination.can_stack(card_to_move):
                 return False
+            self._play(TABLEAU_TO_FOUNDATION, src_index, dest_index, 1)
+            self._normalize_grid()
+            self.check_and_auto_complete()
+            return True
 
         elif isinstance(source, FinalPile) and isinstance(destination, Game_queue):
-            card_to_move = source.pop()
-            if card_to_move and destination.can_stack(card_to_move):
-                destination.enqueue(card_to_move)
-                self.turns += 1
-                self._normalize_grid()
-                return True
-            else:
-                if card_to_move:
-                    source.push(card_to_move)
-                self.save.history.pop()
+            card_to_move = source.peek()
+            if card_to_move is None or not destination.can_stack(card_to_move):
                 return False
+            self._play(FOUNDATION_TO_TABLEAU, src_index, dest_index, 1)
+            self._normalize_grid()
+            return True
 
         return False
 
@@ -226,6 +501,15 @@ game = GameController()
             self.save.undo()
             self.turns += 1
             self._normalize_grid()
+            self._flush_changes()
+
+    def redo_move(self) -> None:
+        """Play again the last undone move."""
+        if self.save.redo_history:
+            self.save.redo()
+            self.turns += 1
+            self._normalize_grid()
+            self._flush_changes()
 
     def all_tableau_cards_revealed(self) -> bool:
         """check if all tableau cards are revealed."""
@@ -242,262 +526,277 @@ game = GameController()
         except Exception as e:
             return False
 
-    def can_move_to_foundation(self, card: Card) -> Union[FinalPile, None]:
+    def can_move_to_foundation(self, card: Card) -> FinalPile | None:
         """Check if a card can be moved to any foundation pile."""
         for foundation in self.final_piles:
             if foundation.can_stack(card):
                 return foundation
         return None
 
-    def auto_complete(self) -> None:
-        """Automatically complete the game by placing all cards on the foundations."""
-        moves_made = True
-        redraw_callback = getattr(self, "_redraw_callback", None)
-
-        while moves_made:
-            moves_made = False
-
-            if not self.discard_pile.is_empty():
-                top_card = self.discard_pile.peek()
-                foundation = self.can_move_to_foundation(top_card)
-                if foundation:
-                    card = self.discard_pile.pop()
-                    foundation.push(card)
-                    self.turns += 1
-                    moves_made = True
-                    if redraw_callback:
-                        redraw_callback()
-                        import time
-
-                        time.sleep(0.15)
-                    continue
-
-            for i, elem in enumerate(self.grid.game):
-                queue = elem[0]
-                try:
-                    if not queue.is_empty():
-                        top_card = queue.peek()
-                        foundation = self.can_move_to_foundation(top_card)
-                        if foundation:
-                            card = queue.dequeue()
-                            foundation.push(card)
-                            self.turns += 1
-                            stack = elem[1]
-                            if queue.is_empty() and not stack.is_empty():
-                                hidden_card = stack.pop()
-                                hidden_card.face = True
-                                queue.enqueue(hidden_card)
-                            moves_made = True
-                            if redraw_callback:
-                                redraw_callback()
-                                import time
-
-                                time.sleep(0.15)
-                            break
-                except Exception as e:
-                    pass
-
-        # After auto-complete finishes, if all foundations are full show a victory overlay
-        try:
-            complete = all([p.size() == 13 for p in self.final_piles])
-            if complete:
-                # Try to get the UI app instance from the redraw callback
-                redraw_callback = getattr(self, '_redraw_callback', None)
-                app_instance = None
-                try:
-                    if callable(redraw_callback) and hasattr(redraw_callback, '__self__'):
-                        app_instance = redraw_callback.__self__
-                except Exception:
-                    app_instance = None
-
-                if app_instance is not None:
-                    ui_root = getattr(app_instance, 'root', None)
-                    menu_root = getattr(app_instance, '_menu_root', None)
-                    if ui_root is not None:
-                        # Create overlay on UI root
-                        overlay = tk.Toplevel(ui_root)
-                        overlay.attributes("-fullscreen", True)
-                        overlay.config(bg="black")
-                        try:
-                            overlay.attributes("-alpha", 0.85)
-                        except Exception:
-                            pass
-
-                        frame = tk.Frame(overlay, bg="black")
-                        frame.place(relx=0.5, rely=0.5, anchor="center")
-                        label = tk.Label(frame, text="Victoire!", font=("Arial", 64, "bold"), fg="white", bg="black")
-                        label.pack(padx=20, pady=20)
-
-                        def finish():
-                            try:
-                                overlay.destroy()
-                            except Exception:
-                                pass
-                            try:
-                                ui_root.destroy()
-                            except Exception:
-                                pass
-                            try:
-                                if menu_root:
-                                    menu_root.deiconify()
-                            except Exception:
-                                pass
-
-                        overlay.after(4000, finish)
-                else:
-                    # No UI instance available; nothing to display here
-                    pass
-        except Exception:
-            pass
-
-        return True
+    def is_won(self) -> bool:
+        """Check if the four foundations are complete."""
+        return all(p.size() == 13 for p in self.final_piles)
+
+    def plan_auto_complete(self) -> list:
+        """Compute, without changing the game, the moves that finish it.
+
+        Cards go to the foundations from the discard pile first, then from the
+        columns left to right; when none can, the stock is drawn (or recycled)
+        until one can. Planning stops when every card is up, or after two
+        passes over the stock without any card placed.
+        """
+        moves, tokens = [], []
+        last_useful = 0
+        idle = 0
+        while not self.is_won():
+            move = None
+            for candidate in self.legal_moves():
+                if candidate[0] in (DISCARD_TO_FOUNDATION, TABLEAU_TO_FOUNDATION):
+                    move = candidate
+                    break
+                if candidate[0] in (DRAW, RECYCLE):
+                    move = candidate
+            if move is None:
+                break
+            if move[0] in (DRAW, RECYCLE):
+                idle += 1
+                if idle > 2 * ((self.stock.size() + self.discard_pile.size()) // 3 + 2):
+                    break
+            else:
+                idle = 0
+            tokens.append(self.apply(move))
+            moves.append(move)
+            if idle == 0:
+                last_useful = len(moves)
+
+        for token in reversed(tokens):
+            self.unapply(token)
+        # Drop the draws that did not lead to any card being placed
+        return moves[:last_useful]
+
+    def play_auto_move(self, move: tuple) -> None:
+        """Play one planned auto-completion move, chained to the previous move
+        in the journal. Emits "auto_move", then "victory" if the game is won."""
+        self._play(*move, chained=True)
+        self._emit("auto_move", move)
+        if self.is_won():
+            self._emit("victory")
+
+    def auto_complete(self) -> bool:
+        """Automatically complete the game by placing all cards on the foundations.
+
+        Plays the whole plan_auto_complete() sequence at once. The UI plays it
+        card by card instead, see check_and_auto_complete().
+        Returns True if at least one move was played.
+        """
+        moves = self.plan_auto_complete()
+        for move in moves:
+            self.play_auto_move(move)
+        return bool(moves)
 
     def check_and_auto_complete(self) -> bool:
-        """Check if all tableau cards are revealed and start auto-completion."""
-        if self.all_tableau_cards_revealed():
-            return self.auto_complete()
-        return False
-
-    def find_best_hint(self) -> Union[dict, None]:
-        """Find the best move hint for the player."""
-        hints = []
-
-        # Priority 1: Move to foundation (highest priority)
-        # Check discard pile
-        if not self.discard_pile.is_empty():
-            top_card = self.discard_pile.peek()
-            foundation = self.can_move_to_foundation(top_card)
-            if foundation:
-                foundation_index = self.final_piles.index(foundation)
-                hints.append(
-                    {
-                        "priority": 1,
-                        "type": "discard_to_foundation",
-                        "card": top_card,
-                        "foundation_index": foundation_index,
-                        "message": f"Placer {top_card.value} de {top_card.family} de la défausse vers la fondation {foundation_index + 1}",
-                    }
-                )
+        """Check if all tableau cards are revealed and start auto-completion.
+
+        If something subscribed to "auto_complete", the planned moves are
+        handed over to it (to be played with play_auto_move, e.g. animated);
+        otherwise they are played at once. If the game is already won (the
+        last card was placed by hand), "victory" is emitted instead.
+        """
+        if not self.all_tableau_cards_revealed():
+            return False
+        if self.is_won():
+            # No auto-move is left to announce the win
+            self._emit("victory")
+            return False
+        if self._listeners.get("auto_complete"):
+            moves = self.plan_auto_complete()
+            if moves:
+                self._emit("auto_complete", moves)
+            return bool(moves)
+        return self.auto_complete()
+
+    def legal_moves(self):
+        """Yield every legal move as a (kind, src, dst, count) tuple.
+
+        Moves come in this order: discard -> foundation, tableau -> foundation,
+        discard -> tableau, tableau -> tableau (deepest card first), foundation
+        -> tableau, then the stock draw or recycle. Legality is read from the
+        precomputed tables of cartes.py, no Card method is called.
+        """
+        columns = self.grid.game
+        foundation_tops = [p.items[-1].id if p.items else EMPTY for p in self.final_piles]
+        column_tops = [q.items[-1].id if q.items else EMPTY for q, _ in columns]
+        discard = self.discard_pile.items
+
+        if discard:
+            card = discard[-1].id
+            for f, top in enumerate(foundation_tops):
+                if FOUNDATION_STACK[top * DECK_SIZE + card]:
+                    yield (DISCARD_TO_FOUNDATION, 0, f, 1)
+
+        for i, top_card in enumerate(column_tops):
+            if top_card != EMPTY:
+                for f, top in enumerate(foundation_tops):
+                    if FOUNDATION_STACK[top * DECK_SIZE + top_card]:
+                        yield (TABLEAU_TO_FOUNDATION, i, f, 1)
+
+        if discard:
+            card = discard[-1].id
+            for j, top in enumerate(column_tops):
+                if TABLEAU_STACK[top * DECK_SIZE + card]:
+                    yield (DISCARD_TO_TABLEAU, 0, j, 1)
+
+        for i, (queue, _) in enumerate(columns):
+            n = len(queue.items)
+            for k, card in enumerate(queue.items):
+                card = card.id
+                for j, top in enumerate(column_tops):
+                    if j != i and TABLEAU_STACK[top * DECK_SIZE + card]:
+                        yield (TABLEAU_TO_TABLEAU, i, j, n - k)
+
+        for f, card in enumerate(foundation_tops):
+            if card != EMPTY:
+                for j, top in enumerate(column_tops):
+                    if TABLEAU_STACK[top * DECK_SIZE + card]:
+                        yield (FOUNDATION_TO_TABLEAU, f, j, 1)
+
+        if self.stock.items:
+            yield (DRAW, 0, 0, min(3, len(self.stock.items)))
+        elif discard:
+            yield (RECYCLE, 0, 0, len(discard))
+
+    def apply(self, move: tuple) -> int:
+        """Play a legal move as fast as possible: no check, no journal, no
+        turn count and no auto-completion.
+        Returns a token that unapply() uses to revert the move."""
+        kind, src, dst, count = move
+        flipped = self._do(kind, src, dst, count)
+        return pack(kind, src, dst, count, FLIP if flipped else 0)
+
+    def unapply(self, token: int) -> None:
+        """Revert a move played with apply()."""
+        self._revert(token)
+
+    def _hint_priority(self, move: tuple) -> int | None:
+        """Rank a legal move for find_best_hint (1 is best, None is never hinted)."""
+        kind, src, _, count = move
+        if kind in (DISCARD_TO_FOUNDATION, TABLEAU_TO_FOUNDATION):
+            return 1
+        if kind == TABLEAU_TO_TABLEAU:
+            if count == 1 and not self.grid.game[src][1].is_empty():
+                return 2
+            return 4
+        if kind == DISCARD_TO_TABLEAU:
+            return 3
+        if kind in (DRAW, RECYCLE):
+            return 5
+        return None
 
-        # Check tableau piles for moves to foundation
-        for i, elem in enumerate(self.grid.game):
-            queue = elem[0]
-            try:
-                if not queue.is_empty():
-                    top_card = queue.peek()
-                    foundation = self.can_move_to_foundation(top_card)
-                    if foundation:
-                        foundation_index = self.final_piles.index(foundation)
-                        hints.append(
-                            {
-                                "priority": 1,
-                                "type": "tableau_to_foundation",
-                                "card": top_card,
-                                "source_pile": i,
-                                "foundation_index": foundation_index,
-                                "message": f"Placer {top_card.value} de {top_card.family} de la colonne {i + 1} vers la fondation {foundation_index + 1}",
-                            }
-                        )
-            except:
-                pass
-
-        # Priority 2: Reveal hidden cards
-        for i, elem in enumerate(self.grid.game):
-            queue = elem[0]
-            stack = elem[1]
-            try:
-                if not queue.is_empty():
-                    # Check if moving this pile would reveal a hidden card
-                    try:
-                        if queue.size() > 0 and not stack.is_empty():
-                            top_card = queue.peek()
-                            # Try to find a destination for this card
-                            for j, dest_elem in enumerate(self.grid.game):
-                                if i != j:
-                                    dest_queue = dest_elem[0]
-                                    if dest_queue.can_stack(top_card):
-                                        hints.append(
-                                            {
-                                                "priority": 2,
-                                                "type": "tableau_to_tableau_reveal",
-                                                "card": top_card,
-                                                "source_pile": i,
-                                                "dest_pile": j,
-                                                "message": f"Déplacer {top_card.value} de {top_card.family} de la colonne {i + 1} vers la colonne {j + 1} pour révéler une carte",
-                                            }
-                                        )
-                    except:
-                        pass
-            except:
-                pass
-
-        # Priority 3: Move from discard to tableau
-        if not self.discard_pile.is_empty():
-            top_card = self.discard_pile.peek()
-            for i, elem in enumerate(self.grid.game):
-                queue = elem[0]
-                if queue.can_stack(top_card):
-                    hints.append(
-                        {
-                            "priority": 3,
-                            "type": "discard_to_tableau",
-                            "card": top_card,
-                            "dest_pile": i,
-                            "message": f"Placer {top_card.value} de {top_card.family} de la défausse vers la colonne {i + 1}",
-                        }
-                    )
-
-        # Priority 4: General tableau moves
-        for i, elem in enumerate(self.grid.game):
-            queue = elem[0]
-            try:
-                if not queue.is_empty():
-                    # Try moving multiple cards
-                    cards_list = list(queue.items)
-                    for card_idx, card in enumerate(cards_list):
-                        for j, dest_elem in enumerate(self.grid.game):
-                            if i != j:
-                                dest_queue = dest_elem[0]
-                                if dest_queue.can_stack(card):
-                                    num_cards = len(cards_list) - card_idx
-                                    hints.append(
-                                        {
-                                            "priority": 4,
-                                            "type": "tableau_to_tableau",
-                                            "card": card,
-                                            "source_pile": i,
-                                            "dest_pile": j,
-                                            "num_cards": num_cards,
-                                            "message": f"Déplacer {num_cards} carte(s) de la colonne {i + 1} vers la colonne {j + 1}",
-                                        }
-                                    )
-            except:
-                pass
-
-        # Priority 5: Draw from stock
-        if not self.stock.is_empty():
-            hints.append(
-                {
-                    "priority": 5,
-                    "type": "draw_stock",
-                    "message": "Piocher 3 cartes du stock",
-                }
-            )
-        elif not self.discard_pile.is_empty():
-            hints.append(
-                {
-                    "priority": 5,
-                    "type": "recycle_stock",
-                    "message": "Recycler la défausse vers le stock",
-                }
-            )
+    def _describe_hint(self, priority: int, move: tuple) -> dict:
+        """Build the hint dict shown to the player for a move."""
+        kind, src, dst, count = move
+        if kind == DRAW:
+            return {
+                "priority": priority,
+                "type": "draw_stock",
+                "message": "Piocher 3 cartes du stock",
+            }
+        if kind == RECYCLE:
+            return {
+                "priority": priority,
+                "type": "recycle_stock",
+                "message": "Recycler la défausse vers le stock",
+            }
+        if kind in (DISCARD_TO_FOUNDATION, DISCARD_TO_TABLEAU):
+            card = self.discard_pile.peek()
+        elif kind == FOUNDATION_TO_TABLEAU:
+            card = self.final_piles[src].peek()
+        else:
+            card = self.grid.game[src][0].items[-count]
 
-        # Sort by priority and return the best hint
-        if hints:
-            hints.sort(key=lambda h: h["priority"])
-            return hints[0]
+        if kind == DISCARD_TO_FOUNDATION:
+            return {
+                "priority": priority,
+                "type": "discard_to_foundation",
+                "card": card,
+                "foundation_index": dst,
+                "message": f"Placer {card.value} de {card.family} de la défausse vers la fondation {dst + 1}",
+            }
+        if kind == TABLEAU_TO_FOUNDATION:
+            return {
+                "priority": priority,
+                "type": "tableau_to_foundation",
+                "card": card,
+                "source_pile": src,
+                "foundation_index": dst,
+                "message": f"Placer {card.value} de {card.family} de la colonne {src + 1} vers la fondation {dst + 1}",
+            }
+        if kind == DISCARD_TO_TABLEAU:
+            return {
+                "priority": priority,
+                "type": "discard_to_tableau",
+                "card": card,
+                "dest_pile": dst,
+                "message": f"Placer {card.value} de {card.family} de la défausse vers la colonne {dst + 1}",
+            }
+        if kind == FOUNDATION_TO_TABLEAU:
+            return {
+                "priority": priority,
+                "type": "foundation_to_tableau",
+                "card": card,
+                "foundation_index": src,
+                "dest_pile": dst,
+                "message": f"Replacer {card.value} de {card.family} de la fondation {src + 1} vers la colonne {dst + 1}",
+            }
+        if priority == 2:
+            return {
+                "priority": priority,
+                "type": "tableau_to_tableau_reveal",
+                "card": card,
+                "source_pile": src,
+                "dest_pile": dst,
+                "num_cards": count,
+                "message": f"Déplacer {card.value} de {card.family} de la colonne {src + 1} vers la colonne {dst + 1} pour révéler une carte",
+            }
+        return {
+            "priority": priority,
+            "type": "tableau_to_tableau",
+            "card": card,
+            "source_pile": src,
+            "dest_pile": dst,
+            "num_cards": count,
+            "message": f"Déplacer {count} carte(s) de la colonne {src + 1} vers la colonne {dst + 1}",
+        }
 
-        return None
+    def describe_move(self, move: tuple) -> dict:
+        """Build the hint dict of any legal move of the current position."""
+        priority = self._hint_priority(move)
+        return self._describe_hint(6 if priority is None else priority, move)
+
+    def best_hint_move(self) -> tuple:
+        """Return (priority, move) of the move find_best_hint recommends, or
+        (None, None) when there is none.
+
+        Moves are ranked by priority: 1 to a foundation, 2 top card of a column
+        with hidden cards to another column, 3 discard to tableau, 4 other
+        tableau moves, 5 draw or recycle. The first move of the best priority
+        wins.
+        """
+        best_priority, best_move = None, None
+        for move in self.legal_moves():
+            priority = self._hint_priority(move)
+            if priority is not None and (best_priority is None or priority < best_priority):
+                best_priority, best_move = priority, move
+                if priority == 1:
+                    break
+        return best_priority, best_move
+
+    def find_best_hint(self) -> dict | None:
+        """Find the best move hint for the player (see best_hint_move)."""
+        best_priority, best_move = self.best_hint_move()
+        if best_move is None:
+            return None
+        return self._describe_hint(best_priority, best_move)
 
     def get_hint_message(self):
         """Get a hint message for the player."""
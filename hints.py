@@ -0,0 +1,158 @@
+"""Background hint search, so the UI thread never waits for the solver.
+
+HintService runs on a worker thread from a snapshot of the game: it first
+publishes the quick heuristic hint (GameController.find_best_hint), then
+keeps improving it until its time budget runs out. The solver knows every
+hidden card, so it never searches the real position: each round it solves a
+determinization (determinize(): the face-down cards, and the stock until it
+has been recycled, shuffled at random, a deal the player cannot tell from the
+real one) and votes for the first move of the winning line it finds. The
+hint is the move with the most votes, published again whenever it changes,
+with the share of sampled deals it wins; no verdict ever reads the real
+hidden cards. Results are queued and handed to the UI thread by poll(),
+which the UI calls from a timer (root.after in tkinter).
+
+Example:
+    >>> service = HintService(max_seconds=3)
+    >>> service.start(game)
+    >>> for hint, final in service.poll():
+    ...     print(hint["message"])
+"""
+
+import queue
+import random
+import threading
+import time
+from collections import Counter
+from game import GameController
+from solver import Solver, WON, LOST
+
+
+def determinize(game: GameController, rng: random.Random) -> GameController:
+    """Return a copy of the position of game with its unknown cards dealt
+    at random: the face-down cards of the columns, and the stock unless the
+    player has seen it (game.stock_seen)."""
+    state = game.state()
+    unknown = bytearray(b"".join(state.hidden))
+    if not game.stock_seen:
+        unknown += state.stock
+    rng.shuffle(unknown)
+    hidden = []
+    at = 0
+    for pile in state.hidden:
+        hidden.append(bytes(unknown[at : at + len(pile)]))
+        at += len(pile)
+    stock = state.stock if game.stock_seen else bytes(unknown[at:])
+    world = GameController.from_state(state._replace(stock=stock, hidden=tuple(hidden)))
+    world.stock_seen = game.stock_seen
+    return world
+
+
+class HintService:
+    """Anytime hint search running on a worker thread.
+
+    Args:
+        max_seconds (float): Time budget of a hint search.
+        sample_seconds (float): Time budget of the solver on each sampled deal.
+        cache (SolveCache, optional): Solved positions, looked up before the
+            solver searches.
+    """
+
+    def __init__(
+        self, max_seconds: float = 3.0, sample_seconds: float = 0.5, cache=None
+    ) -> None:
+        self.max_seconds = max_seconds
+        self.sample_seconds = sample_seconds
+        self.cache = cache
+        self._results = queue.SimpleQueue()
+        self._cancel = None
+        self._thread = None
+        self._generation = 0
+
+    @property
+    def running(self) -> bool:
+        """True while a search is running or has results not yet polled."""
+        alive = self._thread is not None and self._thread.is_alive()
+        return alive or not self._results.empty()
+
+    def start(self, game: GameController) -> None:
+        """Cancel any running search and start a new one from game's position."""
+        self.cancel()
+        self._generation += 1
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(game.clone(), self._cancel, self._generation),
+            daemon=True,
+        )
+        self._thread.start()
+
+    def cancel(self) -> None:
+        """Stop the running search; its pending results are dropped."""
+        if self._cancel is not None:
+            self._cancel.set()
+            self._cancel = None
+
+    def poll(self) -> list:
+        """Return the (hint, final) pairs published since the last call by the
+        current search. final is True for the last hint of a search."""
+        results = []
+        while not self._results.empty():
+            generation, hint, final = self._results.get()
+            if generation == self._generation and self._cancel is not None:
+                results.append((hint, final))
+        return results
+
+    def _run(
+        self, snapshot: GameController, cancel: threading.Event, generation: int
+    ) -> None:
+        """Worker thread: heuristic hint first, then the votes of the solver
+        over sampled deals.
+
+        The final hint has "samples" (deals solved or proven lost) and, when
+        a winning line was found, "solver" = WON and "wins" (samples won by
+        its move); "solver" = LOST if every sample was proven lost. "exact"
+        is True when the player sees every card, the only sample being the
+        position itself.
+        """
+        hint = snapshot.get_hint_message()
+        self._results.put((generation, hint, False))
+
+        rng = random.Random()
+        votes = Counter()
+        samples = lost = 0
+        best = None
+        # Nothing to shuffle: one sample is the position itself
+        unknown = any(stack.items for stack in snapshot.grid.stack) or not (
+            snapshot.stock_seen or snapshot.stock.is_empty()
+        )
+        deadline = time.perf_counter() + self.max_seconds
+        while not cancel.is_set():
+            left = deadline - time.perf_counter()
+            if left <= 0:
+                break
+            solver = Solver(
+                max_seconds=min(self.sample_seconds, left),
+                should_stop=cancel.is_set,
+                cache=self.cache,
+            )
+            result = solver.solve(determinize(snapshot, rng))
+            if result.status == WON and result.moves:
+                samples += 1
+                votes[result.moves[0]] += 1
+            elif result.status == LOST:
+                samples += 1
+                lost += 1
+            if votes and votes.most_common(1)[0][0] != best:
+                best = votes.most_common(1)[0][0]
+                hint = dict(snapshot.describe_move(best), solver=WON)
+                self._results.put((generation, hint, False))
+            if not unknown:
+                break
+        if cancel.is_set():
+            return
+        if best is not None:
+            hint = dict(hint, wins=votes[best], samples=samples, exact=not unknown)
+        elif samples and lost == samples:
+            hint = dict(hint, solver=LOST, samples=samples, exact=not unknown)
+        self._results.put((generation, hint, True))
@@ -0,0 +1,98 @@
+"""Spatial index of the clickable zones of the table.
+
+Zones are grouped by region (stock, discard, a foundation, a column), in
+the order they are drawn. Regions are bucketed by x so a point only looks
+at the one or two regions under it, and inside a region a binary search on
+the zones' position along the region's fan-out axis finds the top card.
+Regions are replaced one at a time when their layout changes.
+"""
+
+from bisect import bisect_right
+
+
+class HitIndex:
+    """Find the topmost zone under a point in O(log n).
+
+    Args:
+        bucket_size (int): Width in pixels of the x buckets.
+    """
+
+    def __init__(self, bucket_size: int = 50) -> None:
+        self.bucket_size = bucket_size
+        # region -> (bbox, axis, keys, [(zone_id, zone)])
+        self._regions = {}
+        # x bucket -> set of regions overlapping it
+        self._buckets = {}
+
+    def set_region(self, region: str, zones: dict, axis: str = "y") -> None:
+        """Replace the zones of a region.
+
+        zones maps zone id to a zone dict with x1, y1, x2, y2, ordered from
+        bottom to top. Zones must fan out along axis ("x" or "y"): each zone
+        starts after the previous one and ends before the next one ends.
+        """
+        self.remove_region(region)
+        if not zones:
+            return
+        entries = list(zones.items())
+        start = "x1" if axis == "x" else "y1"
+        bbox = (
+            min(zone["x1"] for _, zone in entries),
+            min(zone["y1"] for _, zone in entries),
+            max(zone["x2"] for _, zone in entries),
+            max(zone["y2"] for _, zone in entries),
+        )
+        keys = [zone[start] for _, zone in entries]
+        self._regions[region] = (bbox, axis, keys, entries)
+        for bucket in self._bucket_range(bbox[0], bbox[2]):
+            self._buckets.setdefault(bucket, set()).add(region)
+
+    def remove_region(self, region: str) -> None:
+        """Forget the zones of a region."""
+        old = self._regions.pop(region, None)
+        if old is None:
+            return
+        bbox = old[0]
+        for bucket in self._bucket_range(bbox[0], bbox[2]):
+            regions = self._buckets.get(bucket)
+            if regions is not None:
+                regions.discard(region)
+                if not regions:
+                    del self._buckets[bucket]
+
+    def clear(self) -> None:
+        """Forget every zone."""
+        self._regions.clear()
+        self._buckets.clear()
+
+    def zones(self) -> dict:
+        """Return all zones, keyed by zone id."""
+        return {
+            zone_id: zone
+            for entry in self._regions.values()
+            for zone_id, zone in entry[3]
+        }
+
+    def hit(self, x: float, y: float) -> tuple:
+        """Return (zone_id, zone) of the topmost zone containing (x, y),
+        or (None, None)."""
+        for region in self._buckets.get(int(x // self.bucket_size), ()):
+            (x1, y1, x2, y2), axis, keys, entries = self._regions[region]
+            if not (x1 <= x <= x2 and y1 <= y <= y2):
+                continue
+            coord = x if axis == "x" else y
+            end = "x2" if axis == "x" else "y2"
+            i = bisect_right(keys, coord) - 1
+            # Zones below i start earlier and end earlier: stop at the first
+            # one that ends before the point
+            while i >= 0:
+                zone_id, zone = entries[i]
+                if zone[end] < coord:
+                    break
+                if zone["x1"] <= x <= zone["x2"] and zone["y1"] <= y <= zone["y2"]:
+                    return zone_id, zone
+                i -= 1
+        return None, None
+
+    def _bucket_range(self, x1: float, x2: float) -> range:
+        return range(int(x1 // self.bucket_size), int(x2 // self.bucket_size) + 1)
@@ -0,0 +1,216 @@
+"""Monte Carlo hints that only use what the player can see.
+
+find_best_hint ranks moves by fixed priorities and the solver knows every
+hidden card. MonteCarloHint plays fair instead: it samples many deals
+consistent with what the player knows (determinization: the face-down
+cards of the columns, and the stock until it has been recycled once, are
+shuffled at random), plays each candidate move in every sample, then finishes
+the samples with a greedy rollout. The move with the best estimated win rate
+is the hint. Every candidate is played in the same samples (common random
+numbers), so even a few samples rank the moves by what they change, not by
+the luck of their deals.
+
+A round plays every candidate in every sample: the rows of one
+batch_engine.BatchEngine, and the rollouts advance every row at once. The
+first round only uses a few samples and the next ones are sized on its speed
+to fit in what is left of the budget. The deadline is also checked at every
+step, so a call returns within its budget (plus one step); a round cut by it
+only counts when it is the first one, each candidate having then played the
+same number of steps. Each step plays, per row, the first legal move among
+    - a card from the discard pile or a column top to its foundation,
+    - a whole visible run onto another column, when it reveals a hidden card,
+    - part of a run onto another column, when the card under it can then go
+      to its foundation,
+    - the discard card onto a column,
+    - a whole run from a column without hidden cards onto another card (the
+      empty column can take a king),
+    - a draw from the stock (or a recycle of the discard pile).
+A rollout stops when the game is won, after two passes over the stock with
+no other move, or after max_steps.
+
+Example:
+    >>> mc = MonteCarloHint(samples=128, budget_ms=500)
+    >>> move, win_rate = mc.best_move(game)
+"""
+
+import time
+import numpy as np
+from cartes import DECK_SIZE, EMPTY
+from moves import (
+    DISCARD_TO_FOUNDATION,
+    DISCARD_TO_TABLEAU,
+    TABLEAU_TO_FOUNDATION,
+    TABLEAU_TO_TABLEAU,
+)
+from batch_engine import (
+    BatchEngine,
+    ACTION_OFFSET,
+    COLUMNS,
+    MAX_RUN,
+    N_ACTIONS,
+    STOCK_ACTION,
+    action_index,
+)
+from game import GameController
+
+# Rollout priorities (lower first); moves left at _NEVER are not played
+_NEVER = 99
+_PRIORITY = np.full(N_ACTIONS, _NEVER, np.int8)
+_PRIORITY[STOCK_ACTION] = 7
+_PRIORITY[ACTION_OFFSET[DISCARD_TO_FOUNDATION] : ACTION_OFFSET[DISCARD_TO_TABLEAU]] = 1
+_PRIORITY[ACTION_OFFSET[DISCARD_TO_TABLEAU] : ACTION_OFFSET[TABLEAU_TO_FOUNDATION]] = 5
+_PRIORITY[ACTION_OFFSET[TABLEAU_TO_FOUNDATION] : ACTION_OFFSET[TABLEAU_TO_TABLEAU]] = 1
+# Samples of the first round of an evaluation, small enough to finish within
+# a short budget; the next rounds are sized on its speed
+_FIRST_ROUND = 8
+_RUNS = slice(
+    ACTION_OFFSET[TABLEAU_TO_TABLEAU],
+    ACTION_OFFSET[TABLEAU_TO_TABLEAU] + COLUMNS * COLUMNS * MAX_RUN,
+)
+
+
+def _run_priorities(engine: BatchEngine) -> np.ndarray:
+    """(K, 7, 7, 13) priorities of the moves of count cards from column c
+    onto column d: 3 for a whole run revealing a hidden card, 4 for part of
+    a run when the card under it can then go to its foundation, 6 for a
+    whole run from a column without hidden cards onto another card."""
+    k = len(engine)
+    count = np.arange(1, MAX_RUN + 1)
+    whole = (count == engine.up_n[:, :, None])[:, :, None, :]
+    hidden = (engine.hidden_n > 0)[:, :, None, None]
+    runs = engine.runs()
+    under = np.concatenate([runs[:, :, 1:], np.full((k, COLUMNS, 1), EMPTY, np.int8)], axis=2)
+    unlocks = engine.foundation_fits(under)[:, :, None, :]
+    onto_card = (engine.tops() != EMPTY)[:, None, :, None]
+    priority = np.full((k, COLUMNS, COLUMNS, MAX_RUN), _NEVER, np.int8)
+    priority[np.broadcast_to(whole & ~hidden & onto_card, priority.shape)] = 6
+    priority[np.broadcast_to(unlocks & ~whole, priority.shape)] = 4
+    priority[np.broadcast_to(whole & hidden, priority.shape)] = 3
+    return priority
+
+
+def rollout(engine: BatchEngine, max_steps: int, deadline: float | None = None) -> bool:
+    """Play the greedy policy on every game until won, stalled or max_steps.
+    Returns False if the deadline (a time.perf_counter() value) stopped it
+    before that."""
+    k = len(engine)
+    active = ~engine.won()
+    idle = np.zeros(k, np.int16)
+    for _ in range(max_steps):
+        if not active.any():
+            break
+        if deadline is not None and time.perf_counter() >= deadline:
+            return False
+        priority = np.broadcast_to(_PRIORITY, (k, N_ACTIONS)).copy()
+        priority[:, _RUNS] = _run_priorities(engine).reshape(k, -1)
+        priority[~engine.legal_mask()] = _NEVER
+        actions = priority.argmin(axis=1)
+        playable = active & (priority[np.arange(k), actions] < _NEVER)
+        engine.step(np.where(playable, actions, -1))
+
+        idle = np.where(actions == STOCK_ACTION, idle + 1, 0)
+        stuck = ~playable | (idle > 2 * (engine.talon_n // 3 + 2))
+        active &= ~engine.won() & ~stuck
+    return True
+
+
+class MonteCarloHint:
+    """Determinized Monte Carlo evaluation of the legal moves.
+
+    Args:
+        samples (int): Deals sampled per round, shared by every candidate move.
+        budget_ms (float): Time budget of a call; rounds go on while it
+            lasts, and the rollouts still running at the deadline are cut.
+        max_steps (int): Longest rollout, in moves.
+        seed (int, optional): Seed of the sampling, for reproducible hints.
+    """
+
+    def __init__(
+        self,
+        samples: int = 64,
+        budget_ms: float = 500,
+        max_steps: int = 300,
+        seed: int | None = None,
+    ) -> None:
+        self.samples = samples
+        self.budget_ms = budget_ms
+        self.max_steps = max_steps
+        self.rng = np.random.default_rng(seed)
+
+    def _sample(
+        self, game: GameController, stock_known: bool, n: int, copies: int = 1
+    ) -> BatchEngine:
+        """Build n determinizations of the position of game, repeated copies
+        times: row j * n + i is sample i."""
+        state = game.state()
+        engine = BatchEngine(n * copies)
+        engine.set_state(state)
+        unknown = b"".join(state.hidden) + (b"" if stock_known else state.stock)
+        # One random permutation of the unknown cards per sample
+        order = np.argsort(self.rng.random((n, len(unknown))), axis=1)
+        dealt = np.tile(np.frombuffer(unknown, np.int8)[order], (copies, 1))
+        at = 0
+        for i, hidden in enumerate(state.hidden):
+            engine.hidden[:, i, : len(hidden)] = dealt[:, at : at + len(hidden)]
+            at += len(hidden)
+        if not stock_known:
+            cursor = len(state.discard)
+            engine.talon[:, cursor : cursor + len(state.stock)] = dealt[:, at:]
+        return engine
+
+    def evaluate(self, game: GameController, stock_known: bool | None = None) -> list:
+        """Score every legal move of game.
+
+        stock_known tells whether the player has seen the whole stock (it
+        has been recycled); by default it is game.stock_seen.
+        Returns [(move, win rate, mean share of cards on the foundations,
+        rollouts)], best first.
+        """
+        if stock_known is None:
+            stock_known = game.stock_seen
+        moves = list(game.legal_moves())
+        if not moves:
+            return []
+        indexes = [action_index(move) for move in moves]
+        wins = np.zeros(len(moves))
+        progress = np.zeros(len(moves))
+        played = 0
+        clock = time.perf_counter
+        deadline = clock() + self.budget_ms / 1000
+        n = min(self.samples, _FIRST_ROUND)
+        while n > 0:
+            start = clock()
+            engine = self._sample(game, stock_known, n, len(moves))
+            # Rows j * n to (j + 1) * n - 1 play move j
+            engine.step(np.repeat(indexes, n))
+            finished = rollout(engine, self.max_steps, deadline)
+            if finished or not played:
+                wins += engine.won().reshape(-1, n).sum(axis=1)
+                progress += engine.foundation_cards().reshape(-1, n).sum(axis=1) / DECK_SIZE
+                played += n
+            now = clock()
+            if not finished or now >= deadline:
+                break
+            # As many samples as should finish in 80% of the time left
+            n = min(self.samples, int(0.8 * n * (deadline - now) / (now - start)))
+        scored = [
+            (move, float(wins[i] / played), float(progress[i] / played), played)
+            for i, move in enumerate(moves)
+        ]
+        scored.sort(key=lambda item: (item[1], item[2]), reverse=True)
+        return scored
+
+    def best_move(self, game: GameController) -> tuple:
+        """Return (move, estimated win rate), or (None, 0.0) with no legal move."""
+        scored = self.evaluate(game)
+        if not scored:
+            return None, 0.0
+        return scored[0][0], scored[0][1]
+
+    def hint(self, game: GameController) -> dict | None:
+        """Hint dict of the best move (see GameController.describe_move),
+        with its estimated "win_rate"."""
+        move, win_rate = self.best_move(game)
+        if move is None:
+            return None
+        return dict(game.describe_move(move), win_rate=win_rate)
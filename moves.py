@@ -0,0 +1,62 @@
+"""Compact move encoding shared by the game controller and its undo journal.
+
+A move is a tuple ``(kind, src, dst, count)`` where ``src``/``dst`` are pile
+indexes inside their family (tableau column 0..6, foundation 0..3) and
+``count`` is the number of cards moved. Stock and discard moves use 0 for
+the unused indexes.
+"""
+
+DRAW = 0  # stock -> discard, count = 1..3
+RECYCLE = 1  # discard -> stock, count = size of the discard pile
+DISCARD_TO_FOUNDATION = 2
+DISCARD_TO_TABLEAU = 3
+TABLEAU_TO_FOUNDATION = 4
+TABLEAU_TO_TABLEAU = 5
+FOUNDATION_TO_TABLEAU = 6
+
+# Journal entry flags
+FLIP = 1  # the move revealed the hidden card under the source column
+CHAINED = 2  # the move was played automatically after the previous one
+
+# Bit layout of a journal entry: kind:3 | src:3 | dst:3 | count:6 | flags:2
+_SRC_SHIFT = 3
+_DST_SHIFT = 6
+_COUNT_SHIFT = 9
+_FLAGS_SHIFT = 15
+
+
+def pack(kind: int, src: int, dst: int, count: int, flags: int = 0) -> int:
+    """Pack a move and its flags into a single int (17 bits)."""
+    return (
+        kind
+        | src << _SRC_SHIFT
+        | dst << _DST_SHIFT
+        | count << _COUNT_SHIFT
+        | flags << _FLAGS_SHIFT
+    )
+
+
+def unpack(entry: int) -> tuple[int, int, int, int, int]:
+    """Return (kind, src, dst, count, flags) from a packed entry."""
+    return (
+        entry & 7,
+        entry >> _SRC_SHIFT & 7,
+        entry >> _DST_SHIFT & 7,
+        entry >> _COUNT_SHIFT & 63,
+        entry >> _FLAGS_SHIFT,
+    )
+
+
+def relabel(move: tuple, columns, foundations) -> tuple:
+    """Return move with its column index i replaced by columns[i] and its
+    foundation index j by foundations[j]."""
+    kind, src, dst, count = move
+    if kind in (DISCARD_TO_FOUNDATION, TABLEAU_TO_FOUNDATION):
+        dst = foundations[dst]
+    elif kind in (DISCARD_TO_TABLEAU, TABLEAU_TO_TABLEAU, FOUNDATION_TO_TABLEAU):
+        dst = columns[dst]
+    if kind in (TABLEAU_TO_FOUNDATION, TABLEAU_TO_TABLEAU):
+        src = columns[src]
+    elif kind == FOUNDATION_TO_TABLEAU:
+        src = foundations[src]
+    return kind, src, dst, count
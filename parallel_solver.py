@@ -0,0 +1,251 @@
+"""Parallel search of a single position over several processes.
+
+ParallelSolver expands the first levels of the search tree until there are
+a few subtrees per worker, then hands the subtrees to a process pool where
+each one is searched by solver.Solver. The workers share a transposition
+table in multiprocessing.shared_memory: a position explored by one worker
+is skipped by the others. As soon as a worker wins, the others are told to
+stop and the winning line is returned.
+
+The shared table is a lock-free, open-addressing array of 64-bit hashes
+(GameController.symmetric_zobrist). Two workers racing on a slot can at
+worst both explore the same position, and a full probe window overwrites a
+slot; both only cost time. Each task also keeps its own set of the
+positions it saw, so a search always terminates. A position is proven lost
+only when every subtree is, as with the sequential solver.
+
+Example:
+    >>> result = ParallelSolver(workers=8, max_seconds=60).solve(game)
+    >>> result.status, result.nodes_per_second
+"""
+
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from multiprocessing.shared_memory import SharedMemory
+from game import GameController
+from solver import Solver, SolveResult, WON, LOST, UNKNOWN
+
+# Slots probed before overwriting one
+_PROBES = 8
+
+
+class SharedTable:
+    """Set of 64-bit hashes in shared memory (0 marks an empty slot).
+
+    Args:
+        slots (int): Number of slots, rounded up to a power of two
+            (8 bytes each).
+        name (str, optional): Attach to the table created under this name
+            by another process instead of creating one.
+    """
+
+    def __init__(self, slots: int = 1 << 22, name: str | None = None) -> None:
+        if name is None:
+            slots = 1 << max(slots - 1, 1).bit_length()
+            self._shm = SharedMemory(create=True, size=slots * 8)
+            self._owner = True
+        else:
+            self._shm = SharedMemory(name=name)
+            self._owner = False
+        self.name = self._shm.name
+        self._slots = self._shm.buf.cast("Q")
+        self._mask = len(self._slots) - 1
+
+    def __contains__(self, key: int) -> bool:
+        key = key or 1
+        slots, mask = self._slots, self._mask
+        for i in range(key, key + _PROBES):
+            value = slots[i & mask]
+            if value == key:
+                return True
+            if value == 0:
+                return False
+        return False
+
+    def add(self, key: int) -> None:
+        key = key or 1
+        slots, mask = self._slots, self._mask
+        for i in range(key, key + _PROBES):
+            value = slots[i & mask]
+            if value == key:
+                return
+            if value == 0:
+                slots[i & mask] = key
+                return
+        slots[key & mask] = key
+
+    def close(self) -> None:
+        """Detach from the table; the creating process also frees it."""
+        self._slots.release()
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+class _TaskTable:
+    """Positions seen by one task, backed by the shared table."""
+
+    def __init__(self, shared: SharedTable) -> None:
+        self.local = set()
+        self.shared = shared
+
+    def __contains__(self, key: int) -> bool:
+        return key in self.local or key in self.shared
+
+    def add(self, key: int) -> None:
+        self.local.add(key)
+        self.shared.add(key)
+
+
+# Worker process state, set by _init_worker
+_worker = {}
+
+
+def _init_worker(state, table_name, stop, nodes, max_nodes, deadline) -> None:
+    _worker.update(
+        root=GameController.from_state(state),
+        table=SharedTable(name=table_name),
+        stop=stop,
+        nodes=nodes,
+        max_nodes=max_nodes,
+        deadline=deadline,
+    )
+
+
+def _should_stop() -> bool:
+    """Polled by the solver every 1024 nodes: count them in the shared
+    total and stop on a win elsewhere or when a budget is spent."""
+    nodes, max_nodes = _worker["nodes"], _worker["max_nodes"]
+    with nodes.get_lock():
+        nodes.value += 1024
+        total = nodes.value
+    deadline = _worker["deadline"]
+    return (
+        _worker["stop"].is_set()
+        or (max_nodes is not None and total >= max_nodes)
+        or (deadline is not None and time.time() >= deadline)
+    )
+
+
+def _solve_task(prefix: list) -> tuple:
+    """Search the subtree reached by playing prefix from the root.
+    Returns (status, moves from the root if won, nodes)."""
+    if _worker["stop"].is_set():
+        return UNKNOWN, [], 0
+    game = _worker["root"].clone()
+    for move in prefix:
+        game.apply(move)
+    table = _worker["table"]
+    if game.symmetric_zobrist in table:
+        # Already searched (or being searched) by another task
+        return LOST, [], 0
+    result = Solver(should_stop=_should_stop, table=_TaskTable(table)).solve(game)
+    return result.status, prefix + result.moves, result.nodes
+
+
+class ParallelSolver:
+    """Solver spreading the search of one position over a process pool.
+
+    Args:
+        workers (int, optional): Number of processes (all cores by default).
+        max_nodes (int, optional): Stop after this many positions in total.
+        max_seconds (float, optional): Stop after this many seconds.
+        table_slots (int): Size of the shared transposition table.
+        tasks_per_worker (int): Subtrees to create per worker, so that a
+            worker finishing early picks up another one.
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        max_nodes: int | None = None,
+        max_seconds: float | None = None,
+        table_slots: int = 1 << 22,
+        tasks_per_worker: int = 4,
+    ) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.max_nodes = max_nodes
+        self.max_seconds = max_seconds
+        self.table_slots = table_slots
+        self.tasks_per_worker = tasks_per_worker
+
+    def split(self, game: GameController, table: SharedTable) -> tuple:
+        """Expand the tree breadth first until there are enough subtrees.
+
+        Returns (winning line, []) if a win is met on the way, (None, []) if
+        the position is lost, else (None, move prefixes of the subtrees).
+        Expanded positions are put in the table, so workers skip them.
+        """
+        solver = Solver()
+        work = game.clone()
+        frontier = [[]]
+        keys = {work.symmetric_zobrist}
+        wanted = self.workers * self.tasks_per_worker
+        while len(frontier) < wanted:
+            expanded = []
+            for prefix in frontier:
+                tokens = [work.apply(move) for move in prefix]
+                table.add(work.symmetric_zobrist)
+                for move in solver.ordered_moves(work):
+                    token = work.apply(move)
+                    won = work.is_won()
+                    key = work.symmetric_zobrist
+                    work.unapply(token)
+                    if won:
+                        return prefix + [move], []
+                    if key not in keys:
+                        keys.add(key)
+                        expanded.append(prefix + [move])
+                for token in reversed(tokens):
+                    work.unapply(token)
+            if not expanded:
+                return None, []
+            frontier = expanded
+        return None, frontier
+
+    def solve(self, game: GameController) -> SolveResult:
+        """Search a winning sequence from the current position of game.
+        The game itself is left untouched."""
+        start = time.perf_counter()
+        if game.is_won():
+            return SolveResult(WON, [], 0, 0.0)
+
+        table = SharedTable(self.table_slots)
+        try:
+            line, frontier = self.split(game, table)
+            if line is not None:
+                return SolveResult(WON, line, 0, time.perf_counter() - start)
+            if not frontier:
+                return SolveResult(LOST, [], 0, time.perf_counter() - start)
+
+            context = multiprocessing.get_context()
+            stop = context.Event()
+            nodes = context.Value("q", 0)
+            deadline = time.time() + self.max_seconds if self.max_seconds else None
+            status, moves, total = LOST, [], 0
+            with ProcessPoolExecutor(
+                self.workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(game.state(), table.name, stop, nodes, self.max_nodes, deadline),
+            ) as pool:
+                pending = {pool.submit(_solve_task, prefix) for prefix in frontier}
+                while pending:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        if future.cancelled():
+                            continue
+                        task_status, task_moves, task_nodes = future.result()
+                        total += task_nodes
+                        if task_status == WON and status != WON:
+                            status, moves = WON, task_moves
+                            stop.set()
+                            for other in pending:
+                                other.cancel()
+                        elif task_status == UNKNOWN and status == LOST:
+                            status = UNKNOWN
+            return SolveResult(status, moves, total, time.perf_counter() - start)
+        finally:
+            table.close()
@@ -1,26 +1,38 @@
 from collections import deque
-from cartes import Card
+from cartes import Card, family, height, DECK_SIZE, EMPTY, FOUNDATION_STACK
 import random
 
-# cards defini
-family = ("pique", "trefle", "carreau", "coeur")
-height = ("as", "2", "3", "4", "5", "6", "7", "8", "9", "10", "valet", "dame", "roi")
-
 
 class Stack:
     """A basic stack implementation for card piles."""
     def __init__(self) -> None:
         self.items = deque()
+        self._observers = []
+
+    def __getstate__(self) -> dict:
+        """Observers are neither copied nor pickled with the pile."""
+        state = self.__dict__.copy()
+        state["_observers"] = []
+        return state
+
+    def observe(self, callback) -> None:
+        """Call callback(pile, added, card) after each push (added=True) or pop."""
+        self._observers.append(callback)
 
     def is_empty(self) -> bool:
         return len(self.items) == 0
 
     def push(self, item) -> None:
         self.items.append(item)
+        for callback in self._observers:
+            callback(self, True, item)
 
     def pop(self) -> Card | None:
         if not self.is_empty():
-            return self.items.pop()
+            item = self.items.pop()
+            for callback in self._observers:
+                callback(self, False, item)
+            return item
         else:
             return None
 
@@ -38,16 +50,15 @@ class Stock(Stack):
     """Represents the stock pile in Solitaire."""
     def __init__(self) -> None:
         super().__init__()
-        # Create deck of 52 cards
-        for c in range(4):
-            for h in range(13):
-                new_card = Card(family[c], height[h])
-                self.push(new_card)
-
-    def shuffle(self) -> None:
-        """Shuffle the deck of cards."""
+        # Create deck of 52 cards, in card id order
+        for card_id in range(DECK_SIZE):
+            self.push(Card.from_id(card_id))
+
+    def shuffle(self, rng: random.Random | None = None) -> None:
+        """Shuffle the deck of cards, with rng (a random.Random) if given,
+        else with the global random module."""
         temp_list = list(self.items)
-        random.shuffle(temp_list)
+        (rng or random).shuffle(temp_list)
         self.items = deque(temp_list)
 
     def draw(self) -> list[Card] | None:
@@ -105,16 +116,8 @@ class FinalPile(Stack):
 
     def can_stack(self, elem: Card) -> bool:
         """Check if a card can be placed on this final pile."""
-        if self.is_empty():
-            return elem.value == "as"
-        else:
-            top_card = self.peek()
-            if top_card.family == elem.family:
-                top_index = height.index(top_card.value)
-                elem_index = height.index(elem.value)
-                return elem_index == top_index + 1
-            else:
-                return False
+        top = self.items[-1].id if self.items else EMPTY
+        return FOUNDATION_STACK[top * DECK_SIZE + elem.id] == 1
 
     def stack(self, elem: Card) -> bool:
         """Place a card on this final pile if the move is valid."""
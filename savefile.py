@@ -0,0 +1,341 @@
+"""Binary save files and replay archives of games.
+
+A game is stored as its deal number and its move journal (Save.history and
+Save.redo_history, see moves.pack), each entry as a varint: most moves take
+two bytes. Optional snapshots of the full position every few moves let a
+reader jump to any move without replaying the game from the deal. A game
+whose journal does not start from its deal (a position loaded with
+GameController.set_state) gets a snapshot at move 0.
+
+A file is a header followed by any number of game records, each prefixed
+with its length, so a single save and an archive of hundreds of thousands
+of self-play games share the same format:
+
+    file    = MAGIC, then records
+    record  = varint length, payload
+    payload = zigzag varint seed, varint turns,
+              varint n, n varint history entries,
+              varint n, n varint redo entries,
+              varint n, n snapshots
+    snapshot = varint move index, then for each of the 20 piles of
+               GameState.piles(): one length byte and the card ids
+
+ReplayReader streams the records of a file without loading it; skipping
+records only reads their lengths.
+
+Example:
+    >>> game.save_game("partie.sol")
+    >>> game = GameController.load_game("partie.sol")
+
+    >>> with ReplayWriter("games.sol") as out:
+    ...     for game in games:
+    ...         out.write(game, snapshot_every=32)
+    >>> reader = ReplayReader("games.sol")
+    >>> game = restore(reader[1234], move=80)   # position after 80 moves
+"""
+
+import os
+from array import array
+from collections import namedtuple
+from deals import deal_order, initial_state, layout
+from moves import RECYCLE, unpack
+from state import GameState, SLOTS
+
+MAGIC = b"SOLG\x01"
+
+# history, redo: array("I") of journal entries as in Save; snapshots:
+# [(move index, GameState)], by increasing index.
+GameRecord = namedtuple("GameRecord", "seed turns history redo snapshots")
+
+
+def _put_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _zigzag(value: int) -> int:
+    """Map a signed int to an unsigned one: 0, -1, 1, -2... to 0, 1, 2, 3...
+    (random.Random accepts negative seeds, so GameController does too)."""
+    return 2 * value if value >= 0 else -2 * value - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if value & 1 == 0 else -(value >> 1) - 1
+
+
+def _get_varint(data: bytes, at: int) -> tuple:
+    """Return (value, position after it)."""
+    value = shift = 0
+    while True:
+        byte = data[at]
+        at += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, at
+        shift += 7
+
+
+def record_of(game, snapshot_every: int = 0) -> GameRecord:
+    """Record of a GameController, with a snapshot every snapshot_every
+    moves of its history (none if 0)."""
+    history = array("I", game.save.history)
+    start = game.clone()
+    for entry in reversed(history):
+        start._revert(entry)
+    snapshots = []
+    if start.state() != initial_state(layout(deal_order(game.seed))):
+        snapshots.append((0, start.state()))
+    if snapshot_every:
+        for i, entry in enumerate(history, 1):
+            kind, src, dst, count, _ = unpack(entry)
+            start._do(kind, src, dst, count)
+            if i % snapshot_every == 0:
+                snapshots.append((i, start.state()))
+    redo = array("I", game.save.redo_history)
+    return GameRecord(game.seed, game.turns, history, redo, snapshots)
+
+
+def encode_record(record: GameRecord) -> bytes:
+    """Payload of a record (without its length prefix)."""
+    out = bytearray()
+    _put_varint(out, _zigzag(record.seed))
+    _put_varint(out, record.turns)
+    for entries in (record.history, record.redo):
+        _put_varint(out, len(entries))
+        for entry in entries:
+            _put_varint(out, entry)
+    _put_varint(out, len(record.snapshots))
+    for index, state in record.snapshots:
+        _put_varint(out, index)
+        for pile in state.piles():
+            out.append(len(pile))
+            out += pile
+    return bytes(out)
+
+
+def decode_record(data: bytes) -> GameRecord:
+    """Inverse of encode_record."""
+    seed, at = _get_varint(data, 0)
+    seed = _unzigzag(seed)
+    turns, at = _get_varint(data, at)
+    journals = []
+    for _ in range(2):
+        n, at = _get_varint(data, at)
+        entries = array("I")
+        for _ in range(n):
+            entry, at = _get_varint(data, at)
+            entries.append(entry)
+        journals.append(entries)
+    n, at = _get_varint(data, at)
+    snapshots = []
+    for _ in range(n):
+        index, at = _get_varint(data, at)
+        piles = []
+        for _ in range(SLOTS):
+            size = data[at]
+            piles.append(bytes(data[at + 1 : at + 1 + size]))
+            at += 1 + size
+        state = GameState(
+            piles[0], piles[1], tuple(piles[2:6]), tuple(piles[6:13]), tuple(piles[13:20])
+        )
+        snapshots.append((index, state))
+    return GameRecord(seed, turns, journals[0], journals[1], snapshots)
+
+
+def restore(record: GameRecord, move: int | None = None):
+    """Rebuild the GameController of a record, at the end of its history or
+    after its first move moves. The rest of the record is left to redo, so
+    undo and redo work across the whole game."""
+    from game import GameController
+
+    history = record.history
+    move = len(history) if move is None else max(0, min(move, len(history)))
+    game = GameController(record.seed)
+    start = 0
+    for index, state in record.snapshots:
+        if index > move:
+            break
+        game.set_state(state)
+        start = index
+    for entry in history[start:move]:
+        kind, src, dst, count, _ = unpack(entry)
+        game._do(kind, src, dst, count)
+    game.save.history = history[:move]
+    game.save.redo_history = array("I", record.redo)
+    game.save.redo_history.extend(reversed(history[move:]))
+    game.turns = record.turns - (len(history) - move)
+    # Undone recycles count: the player has seen the stock
+    game.stock_seen = any(
+        unpack(entry)[0] == RECYCLE for entries in (history, record.redo) for entry in entries
+    )
+    return game
+
+
+def replay(record: GameRecord):
+    """Yield (move, game) along the history of a record, game being the
+    position after move (one GameController, updated in place)."""
+    from game import GameController
+
+    game = GameController(record.seed)
+    if record.snapshots and record.snapshots[0][0] == 0:
+        game.set_state(record.snapshots[0][1])
+    for entry in record.history:
+        kind, src, dst, count, _ = unpack(entry)
+        game._do(kind, src, dst, count)
+        yield (kind, src, dst, count), game
+
+
+def save(game, path: str, snapshot_every: int = 0) -> None:
+    """Write a file holding one game (replacing path atomically)."""
+    payload = encode_record(record_of(game, snapshot_every))
+    data = bytearray(MAGIC)
+    _put_varint(data, len(payload))
+    data += payload
+    with open(path + ".tmp", "wb") as f:
+        f.write(data)
+    os.replace(path + ".tmp", path)
+
+
+def load(path: str, move: int | None = None):
+    """GameController of the first game of a file (see restore)."""
+    with ReplayReader(path) as reader:
+        return restore(reader[0], move)
+
+
+class ReplayWriter:
+    """Appends game records to a file (created with its header if needed).
+
+    Args:
+        path (str): File to write.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+
+    def write(self, game, snapshot_every: int = 0) -> None:
+        """Append a GameController (or a GameRecord)."""
+        record = game if isinstance(game, GameRecord) else record_of(game, snapshot_every)
+        payload = encode_record(record)
+        prefix = bytearray()
+        _put_varint(prefix, len(payload))
+        self._file.write(prefix + payload)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "ReplayWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class ReplayReader:
+    """Streams the records of a file written by ReplayWriter or save_game.
+
+    Iterating decodes the records one by one; skip() and indexing only
+    read the length prefixes to find a record. The offsets of the records
+    are collected on the way, so going back to a record already passed is
+    a single seek.
+
+    Args:
+        path (str): File to read.
+
+    Raises:
+        ValueError: If the file is not a save file.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._file = open(path, "rb")
+        if self._file.read(len(MAGIC)) != MAGIC:
+            self._file.close()
+            raise ValueError(f"{path} is not a solitaire save file")
+        self._size = os.fstat(self._file.fileno()).st_size
+        # Offsets of the records found so far
+        self._offsets = [len(MAGIC)]
+        self._complete = False
+
+    def _read_length(self) -> int | None:
+        """Length of the record at the current position, None at the end."""
+        value = shift = 0
+        while True:
+            byte = self._file.read(1)
+            if not byte:
+                return None
+            value |= (byte[0] & 0x7F) << shift
+            if byte[0] < 0x80:
+                return value
+            shift += 7
+
+    def _next(self, decode: bool = True) -> GameRecord | bool | None:
+        """Read or skip the record at the current position (None at the
+        end), noting where the following one starts."""
+        length = self._read_length()
+        if length is None:
+            self._complete = True
+            return None
+        if decode:
+            data = self._file.read(length)
+            if len(data) < length:
+                # Cut by an interrupted write
+                self._complete = True
+                return None
+        else:
+            if self._file.tell() + length > self._size:
+                self._complete = True
+                return None
+            self._file.seek(length, 1)
+        end = self._file.tell()
+        if end > self._offsets[-1]:
+            self._offsets.append(end)
+        return decode_record(data) if decode else True
+
+    def _seek(self, index: int) -> bool:
+        """Move to the start of record index; False if there is none."""
+        while len(self._offsets) <= index and not self._complete:
+            self._file.seek(self._offsets[-1])
+            if self._next(decode=False) is None:
+                break
+        if index >= len(self._offsets):
+            return False
+        self._file.seek(self._offsets[index])
+        return True
+
+    def __iter__(self):
+        return self.skip(0)
+
+    def __getitem__(self, index: int) -> GameRecord:
+        if index < 0 or not self._seek(index):
+            raise IndexError(index)
+        record = self._next()
+        if record is None:
+            raise IndexError(index)
+        return record
+
+    def skip(self, n: int):
+        """Iterate over the records from number n on."""
+        index = n
+        while self._seek(index):
+            record = self._next()
+            if record is None:
+                return
+            yield record
+            index += 1
+
+    def __len__(self) -> int:
+        """Number of records (scans the rest of the file once)."""
+        self._seek(1 << 62)
+        return len(self._offsets) - 1
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "ReplayReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,147 @@
+"""Retained-mode card scene for the Tkinter canvas.
+
+Instead of deleting and recreating every canvas item at each redraw, the
+scene keeps one persistent image item per card (tagged "card_<id>") and a
+few decoration and text items. SolitaireApp describes what each region of
+the table (stock, discard, a foundation, a column) should show, and update()
+only issues coords/itemconfig/tag_raise calls for what actually changed.
+"""
+
+import tkinter as tk
+from sprites import SpriteCache
+
+
+class CardScene:
+    """Persistent canvas items for the cards, decorations and texts.
+
+    Args:
+        canvas (tk.Canvas): Canvas to draw on.
+        sprites (SpriteCache): Source of the card images.
+    """
+
+    def __init__(self, canvas: tk.Canvas, sprites: SpriteCache) -> None:
+        self.canvas = canvas
+        self.sprites = sprites
+        # card id -> canvas item id
+        self._items = {}
+        # card id -> (x, y, face) currently shown, None when hidden
+        self._state = {}
+        # region -> card ids shown in it, bottom to top
+        self._region_cards = {}
+        # card id -> region showing it
+        self._owner = {}
+        # region -> (decoration spec, canvas item ids)
+        self._decor = {}
+        # text name -> (canvas item id, text)
+        self._texts = {}
+
+    @staticmethod
+    def card_tag(card_id: int) -> str:
+        """Canvas tag of a card's image item."""
+        return f"card_{card_id}"
+
+    def update(self, layouts: dict) -> None:
+        """Show the given regions.
+
+        layouts maps a region name to (cards, decor): cards is the list of
+        (card_id, x, y, face) from bottom to top, decor a tuple of
+        (kind, coords, options) items drawn under the cards, e.g.
+        ("rectangle", (x1, y1, x2, y2), {"outline": "white"}). Cards that left
+        the given regions and are not shown elsewhere are hidden.
+        """
+        left = []
+        for region, (cards, decor) in layouts.items():
+            self._set_decor(region, decor)
+            old_ids = self._region_cards.get(region, [])
+            new_ids = [card[0] for card in cards]
+            changed = old_ids != new_ids
+            if changed:
+                left.extend((card_id, region) for card_id in old_ids)
+            for card_id, x, y, face in cards:
+                self._owner[card_id] = region
+                changed |= self._place(card_id, x, y, face)
+            if changed:
+                # Regions never overlap, so restacking a region only needs
+                # its own cards raised from bottom to top
+                for card_id in new_ids:
+                    self.canvas.tag_raise(self.card_tag(card_id))
+            self._region_cards[region] = new_ids
+
+        for card_id, region in left:
+            # Hide the card unless another region (or the same) shows it now
+            if self._owner.get(card_id) != region:
+                continue
+            if card_id not in self._region_cards[region]:
+                del self._owner[card_id]
+                self.canvas.itemconfig(self._items[card_id], state="hidden")
+                self._state[card_id] = None
+
+    def _place(self, card_id: int, x: float, y: float, face: bool) -> bool:
+        """Show a card at (x, y). Returns True if it moved or appeared."""
+        item = self._items.get(card_id)
+        if item is None:
+            self._items[card_id] = self.canvas.create_image(
+                x,
+                y,
+                image=self.sprites.get(card_id, face),
+                anchor="nw",
+                tags=self.card_tag(card_id),
+            )
+            self._state[card_id] = (x, y, face)
+            return True
+
+        state = self._state.get(card_id)
+        if state == (x, y, face):
+            return False
+        moved = state is None or state[0] != x or state[1] != y
+        if state is None:
+            self.canvas.itemconfig(item, state="normal")
+        if moved:
+            self.canvas.coords(item, x, y)
+        if state is None or state[2] != face:
+            self.canvas.itemconfig(item, image=self.sprites.get(card_id, face))
+        self._state[card_id] = (x, y, face)
+        return moved
+
+    def _set_decor(self, region: str, decor: tuple) -> None:
+        """Replace the decoration items of a region if they changed."""
+        old = self._decor.get(region)
+        if old is not None and old[0] == decor:
+            return
+        if old is not None:
+            for item in old[1]:
+                self.canvas.delete(item)
+        items = []
+        for kind, coords, options in decor:
+            create = getattr(self.canvas, f"create_{kind}")
+            item = create(*coords, **options)
+            self.canvas.tag_lower(item)
+            items.append(item)
+        self._decor[region] = (decor, items)
+
+    def set_text(self, name: str, x: float, y: float, text: str, **options) -> None:
+        """Show a text item, created once and updated only when text changes."""
+        current = self._texts.get(name)
+        if current is None:
+            item = self.canvas.create_text(x, y, text=text, **options)
+            self._texts[name] = (item, text)
+        elif current[1] != text:
+            self.canvas.itemconfig(current[0], text=text)
+            self._texts[name] = (current[0], text)
+
+    def refresh(self, card_ids) -> None:
+        """Forget the shown position of cards moved directly on the canvas
+        (drag, animation) so the next update puts them back in place."""
+        for card_id in card_ids:
+            if self._state.get(card_id) is not None:
+                self._state[card_id] = (None, None, self._state[card_id][2])
+
+    def clear(self) -> None:
+        """Delete every item of the scene."""
+        self.canvas.delete("all")
+        self._items.clear()
+        self._state.clear()
+        self._region_cards.clear()
+        self._owner.clear()
+        self._decor.clear()
+        self._texts.clear()
@@ -0,0 +1,183 @@
+"""Self-play of the built-in hint policy, to measure how well it plays.
+
+Each seed is a deal (GameController(seed=...)) played to the end by applying
+the move find_best_hint recommends (GameController.best_hint_move) until the
+game is won or cannot go on:
+
+    - won: the four foundations are complete,
+    - blocked: no move is left (not even a draw),
+    - cycle: a position comes back; the policy is deterministic, so it
+      would loop forever (for instance drawing and recycling the stock with
+      nothing to play, or moving a card back and forth between two columns),
+    - stalled: max_turns moves were played.
+
+Games are spread over a process pool. The report gives the win rate, the
+average number of moves per game, the games per second and the time spent in
+each phase of a turn (choosing the move, playing it, checking for a cycle).
+
+Example:
+    $ python selfplay.py --start 0 --count 10000
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from game import GameController
+
+WON = "won"
+BLOCKED = "blocked"
+CYCLE = "cycle"
+STALLED = "stalled"
+
+# Phases of a turn, in the order of GameResult.phases
+PHASES = ("hint", "move", "cycle check")
+
+GameResult = namedtuple("GameResult", "seed outcome turns phases")
+
+
+def play_game(seed: int, max_turns: int = 2000, on_move=None) -> GameResult:
+    """Play the deal of seed with the hint policy.
+
+    on_move(game, move), if given, is called before each move is played.
+    Returns a GameResult: the outcome (WON, BLOCKED, CYCLE or STALLED), the
+    number of moves played and the seconds spent in each of PHASES.
+    """
+    game = GameController(seed)
+    clock = time.perf_counter
+    hint_time = move_time = check_time = 0.0
+    seen = {game.zobrist}
+    outcome = STALLED
+    turns = 0
+    while turns < max_turns:
+        t0 = clock()
+        _, move = game.best_hint_move()
+        t1 = clock()
+        hint_time += t1 - t0
+        if move is None:
+            outcome = BLOCKED
+            break
+        if on_move is not None:
+            on_move(game, move)
+        game.apply(move)
+        turns += 1
+        t2 = clock()
+        move_time += t2 - t1
+        if game.is_won():
+            outcome = WON
+            break
+        key = game.zobrist
+        repeated = key in seen
+        seen.add(key)
+        check_time += clock() - t2
+        if repeated:
+            outcome = CYCLE
+            break
+    return GameResult(seed, outcome, turns, (hint_time, move_time, check_time))
+
+
+def play_games(seeds: list, max_turns: int = 2000) -> list:
+    """Worker task: play a chunk of seeds (fewer round trips to the pool)."""
+    return [play_game(seed, max_turns) for seed in seeds]
+
+
+class SelfPlayStats:
+    """Running totals of a self-play run."""
+
+    def __init__(self) -> None:
+        self.outcomes = {WON: 0, BLOCKED: 0, CYCLE: 0, STALLED: 0}
+        self.turns = 0
+        self.phases = [0.0] * len(PHASES)
+        self.start = time.perf_counter()
+
+    @property
+    def games(self) -> int:
+        return sum(self.outcomes.values())
+
+    def add(self, result: GameResult) -> None:
+        self.outcomes[result.outcome] += 1
+        self.turns += result.turns
+        for i, seconds in enumerate(result.phases):
+            self.phases[i] += seconds
+
+    def summary(self) -> str:
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        games = self.games
+        if not games:
+            return "0 games"
+        shares = ", ".join(
+            f"{outcome} {100 * n / games:.1f}%" for outcome, n in self.outcomes.items()
+        )
+        total = max(sum(self.phases), 1e-9)
+        phases = ", ".join(
+            f"{name} {100 * seconds / total:.0f}%"
+            for name, seconds in zip(PHASES, self.phases)
+        )
+        return (
+            f"{games} games, {shares}, {self.turns / games:.1f} moves/game, "
+            f"{games / elapsed:.1f} games/s, {self.turns / total:.0f} moves/s "
+            f"per process ({phases})"
+        )
+
+
+def run_selfplay(
+    seeds,
+    workers: int | None = None,
+    max_turns: int = 2000,
+    chunk_size: int = 16,
+    report_every: float = 5.0,
+    log=sys.stderr,
+) -> SelfPlayStats:
+    """Play every seed with the hint policy and return the statistics.
+    With workers=1 the games are played in this process."""
+    stats = SelfPlayStats()
+    workers = workers or os.cpu_count() or 1
+    chunks = []
+    for seed in seeds:
+        if not chunks or len(chunks[-1]) == chunk_size:
+            chunks.append([])
+        chunks[-1].append(seed)
+
+    last_report = time.perf_counter()
+    pool = ProcessPoolExecutor(workers) if workers > 1 else None
+    try:
+        if pool is None:
+            results = (play_games(chunk, max_turns) for chunk in chunks)
+        else:
+            results = pool.map(play_games, chunks, [max_turns] * len(chunks))
+        for chunk in results:
+            for result in chunk:
+                stats.add(result)
+            if log and time.perf_counter() - last_report >= report_every:
+                last_report = time.perf_counter()
+                print(stats.summary(), file=log, flush=True)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    return stats
+
+
+def main(argv: list | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Play seeded deals with the hint policy.")
+    parser.add_argument("--start", type=int, default=0, help="first seed")
+    parser.add_argument("--count", type=int, default=1000, help="number of seeds")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="processes")
+    parser.add_argument(
+        "--max-turns", type=int, default=2000, help="moves before a game is stalled"
+    )
+    parser.add_argument("--chunk", type=int, default=16, help="seeds per worker task")
+    args = parser.parse_args(argv)
+
+    stats = run_selfplay(
+        range(args.start, args.start + args.count),
+        workers=args.workers,
+        max_turns=args.max_turns,
+        chunk_size=args.chunk,
+    )
+    print(stats.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""Reinforcement-learning environment over GameController, Gym style.
+
+SolitaireEnv follows the Gymnasium API without depending on it:
+reset(seed) deals game number seed (see deals.py) and returns
+(observation, info); step(action) returns (observation, reward, terminated,
+truncated, info). Actions are those of batch_engine.ACTIONS (N_ACTIONS of
+them, the stock action draws or recycles) and info["action_mask"] tells
+which ones are legal.
+
+The observation is a fixed vector of OBS_SIZE int8, made only of what the
+player sees:
+
+    [0, 91)     face-up cards of column i at i * 13 + depth (EMPTY if none)
+    [91, 98)    number of face-down cards of each column
+    [98, 102)   top card of each foundation (EMPTY if none)
+    [102, 105)  the three visible cards of the discard pile, top first
+    105, 106    number of cards in the stock and in the discard pile
+
+It is not rebuilt at each step: the environment observes the piles (as
+GameController does for its hashes) and only rewrites the entries of the
+cards that moved, in a buffer allocated once. reset() and step() return
+that buffer, copy it to keep it. The reward is the number of cards the move
+put on the foundations (negative when it took some back); an episode
+terminates when the game is won and is truncated after max_steps.
+
+VectorEnv runs many environments in worker processes that write straight
+into shared-memory arrays, so a step only sends one message per worker.
+Only the engine is imported, never tkinter nor pygame.
+
+Example:
+    >>> env = SolitaireEnv()
+    >>> obs, info = env.reset(seed=42)
+    >>> action = np.flatnonzero(info["action_mask"])[0]
+    >>> obs, reward, terminated, truncated, info = env.step(action)
+
+    >>> with VectorEnv(256, workers=8) as envs:
+    ...     obs, mask = envs.reset(seed=0)
+    ...     obs, reward, terminated, truncated, mask = envs.step(actions)
+"""
+
+import os
+import random
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+from cartes import EMPTY
+from batch_engine import N_ACTIONS, MAX_RUN, action_index
+from deals import COLUMNS, deal_order, initial_state, layout
+from game import GameController
+
+HIDDEN_AT = COLUMNS * MAX_RUN
+FOUNDATIONS_AT = HIDDEN_AT + COLUMNS
+DISCARD_AT = FOUNDATIONS_AT + 4
+STOCK_SIZE_AT = DISCARD_AT + 3
+DISCARD_SIZE_AT = STOCK_SIZE_AT + 1
+OBS_SIZE = DISCARD_SIZE_AT + 1
+
+
+class SolitaireEnv:
+    """One game as a Gym-style environment.
+
+    Args:
+        max_steps (int): Moves before an episode is truncated.
+        seed (int, optional): Seed of the deal numbers drawn by reset()
+            when it gets none.
+        obs (np.ndarray, optional): int8 buffer of OBS_SIZE to write the
+            observations into (allocated if not given).
+        mask (np.ndarray, optional): bool buffer of N_ACTIONS for the legal
+            action mask (allocated if not given).
+    """
+
+    n_actions = N_ACTIONS
+    observation_shape = (OBS_SIZE,)
+
+    def __init__(
+        self,
+        max_steps: int = 1000,
+        seed: int | None = None,
+        obs: np.ndarray | None = None,
+        mask: np.ndarray | None = None,
+    ) -> None:
+        self.max_steps = max_steps
+        self._rng = random.Random(seed)
+        self.obs = np.empty(OBS_SIZE, np.int8) if obs is None else obs
+        self.mask = np.zeros(N_ACTIONS, bool) if mask is None else mask
+        # Move played by each legal action, valid where mask is set
+        self._moves = [None] * N_ACTIONS
+        self._on_foundations = 0
+        self.steps = 0
+        self.info = {"action_mask": self.mask, "seed": None}
+        self.game = GameController(0)
+        # Observation of an empty table, then the observers fill it in
+        self.obs[:] = EMPTY
+        self.obs[HIDDEN_AT:FOUNDATIONS_AT] = 0
+        self.obs[STOCK_SIZE_AT:] = 0
+        self._observe()
+        self.game.set_state(self.game.state())
+
+    def _observe(self) -> None:
+        """Keep self.obs up to date on every push and pop of the piles."""
+        obs = self.obs
+        game = self.game
+
+        def column(index: int):
+            def changed(pile, added: bool, card) -> None:
+                depth = len(pile.items) - 1 if added else len(pile.items)
+                obs[index * MAX_RUN + depth] = card.id if added else EMPTY
+
+            return changed
+
+        def hidden(index: int):
+            def changed(pile, added: bool, card) -> None:
+                obs[HIDDEN_AT + index] = len(pile.items)
+
+            return changed
+
+        def foundation(index: int):
+            def changed(pile, added: bool, card) -> None:
+                obs[FOUNDATIONS_AT + index] = pile.items[-1].id if pile.items else EMPTY
+                self._on_foundations += 1 if added else -1
+
+            return changed
+
+        def discard(pile, added: bool, card) -> None:
+            items = pile.items
+            n = len(items)
+            for i in range(3):
+                obs[DISCARD_AT + i] = items[n - 1 - i].id if i < n else EMPTY
+            obs[DISCARD_SIZE_AT] = n
+
+        def stock(pile, added: bool, card) -> None:
+            obs[STOCK_SIZE_AT] = len(pile.items)
+
+        for i, (queue, stack) in enumerate(game.grid.game):
+            queue.observe(column(i))
+            stack.observe(hidden(i))
+        for i, pile in enumerate(game.final_piles):
+            pile.observe(foundation(i))
+        game.discard_pile.observe(discard)
+        game.stock.observe(stock)
+
+    def _update_mask(self) -> None:
+        self.mask[:] = False
+        for move in self.game.legal_moves():
+            action = action_index(move)
+            self.mask[action] = True
+            self._moves[action] = move
+
+    def reset(self, seed: int | None = None) -> tuple:
+        """Deal game number seed (a random one by default).
+        Returns (observation, info)."""
+        if seed is None:
+            seed = self._rng.getrandbits(32)
+        self.game.set_state(initial_state(layout(deal_order(seed))))
+        self.game.seed = seed
+        self._on_foundations = 0
+        self.steps = 0
+        self._update_mask()
+        self.info["seed"] = seed
+        return self.obs, self.info
+
+    def step(self, action: int) -> tuple:
+        """Play a legal action.
+        Returns (observation, reward, terminated, truncated, info)."""
+        if not self.mask[action]:
+            raise ValueError(f"illegal action {action}")
+        before = self._on_foundations
+        self.game.apply(self._moves[action])
+        self.steps += 1
+        self._update_mask()
+        terminated = self._on_foundations == 52
+        truncated = not terminated and self.steps >= self.max_steps
+        return self.obs, self._on_foundations - before, terminated, truncated, self.info
+
+
+# Arrays of the shared buffer of a VectorEnv: name, shape per environment, dtype
+_SHARED = [
+    ("actions", (), np.int64),
+    ("reward", (), np.float32),
+    ("obs", (OBS_SIZE,), np.int8),
+    ("mask", (N_ACTIONS,), np.bool_),
+    ("terminated", (), np.bool_),
+    ("truncated", (), np.bool_),
+]
+
+
+def _shared_arrays(buf, n_envs: int) -> dict:
+    """Name -> array in buf (None to only compute the sizes)."""
+    arrays = {}
+    offset = 0
+    for name, shape, dtype in _SHARED:
+        shape = (n_envs,) + shape
+        if buf is not None:
+            arrays[name] = np.ndarray(shape, dtype, buf, offset)
+        offset += int(np.prod(shape)) * np.dtype(dtype).itemsize
+    arrays["size"] = offset
+    return arrays
+
+
+def _vector_worker(pipe, name: str, n_envs: int, lo: int, hi: int, max_steps: int) -> None:
+    """Run environments lo to hi - 1 of a VectorEnv until told to stop."""
+    shm = SharedMemory(name=name)
+    arrays = _shared_arrays(shm.buf, n_envs)
+    envs = [
+        SolitaireEnv(max_steps, obs=arrays["obs"][i], mask=arrays["mask"][i])
+        for i in range(lo, hi)
+    ]
+    seeds = [0] * len(envs)
+    try:
+        while True:
+            message = pipe.recv()
+            if message is None:
+                break
+            if message[0] == "reset":
+                seeds = list(message[1])
+                for env, seed in zip(envs, seeds):
+                    env.reset(seed)
+            else:
+                actions = arrays["actions"]
+                for j, env in enumerate(envs):
+                    i = lo + j
+                    _, reward, terminated, truncated, _ = env.step(actions[i])
+                    arrays["reward"][i] = reward
+                    arrays["terminated"][i] = terminated
+                    arrays["truncated"][i] = truncated
+                    if terminated or truncated:
+                        # Next deal of this environment's lane
+                        seeds[j] += n_envs
+                        env.reset(seeds[j])
+            pipe.send(True)
+    finally:
+        del envs, arrays
+        shm.close()
+
+
+class VectorEnv:
+    """n_envs SolitaireEnv stepped together in worker processes.
+
+    Observations, masks, rewards and done flags are (n_envs, ...) arrays in
+    shared memory, returned as is (copy them to keep them). An environment
+    whose episode ends is reset at once to its next deal (environment i
+    plays deals seed + i, seed + i + n_envs, ...), so the observation
+    returned with a done flag is already the one of the new game.
+
+    Args:
+        n_envs (int): Number of environments.
+        workers (int, optional): Number of processes (all cores by default).
+        max_steps (int): Moves before an episode is truncated.
+    """
+
+    def __init__(self, n_envs: int, workers: int | None = None, max_steps: int = 1000) -> None:
+        self.n_envs = n_envs
+        workers = min(workers or os.cpu_count() or 1, n_envs)
+        self._shm = SharedMemory(create=True, size=_shared_arrays(None, n_envs)["size"])
+        self._arrays = _shared_arrays(self._shm.buf, n_envs)
+        context = multiprocessing.get_context()
+        self._bounds = [(w * n_envs // workers, (w + 1) * n_envs // workers) for w in range(workers)]
+        self._pipes = []
+        self._processes = []
+        for lo, hi in self._bounds:
+            parent, child = context.Pipe()
+            process = context.Process(
+                target=_vector_worker,
+                args=(child, self._shm.name, n_envs, lo, hi, max_steps),
+                daemon=True,
+            )
+            process.start()
+            child.close()
+            self._pipes.append(parent)
+            self._processes.append(process)
+
+    def _wait(self) -> None:
+        for pipe in self._pipes:
+            pipe.recv()
+
+    def reset(self, seed: int = 0) -> tuple:
+        """Deal games seed to seed + n_envs - 1. Returns (obs, mask)."""
+        for pipe, (lo, hi) in zip(self._pipes, self._bounds):
+            pipe.send(("reset", range(seed + lo, seed + hi)))
+        self._wait()
+        self._arrays["terminated"][:] = False
+        self._arrays["truncated"][:] = False
+        return self._arrays["obs"], self._arrays["mask"]
+
+    def step(self, actions) -> tuple:
+        """Play one legal action per environment.
+        Returns (obs, reward, terminated, truncated, mask)."""
+        self._arrays["actions"][:] = actions
+        for pipe in self._pipes:
+            pipe.send(("step",))
+        self._wait()
+        a = self._arrays
+        return a["obs"], a["reward"], a["terminated"], a["truncated"], a["mask"]
+
+    def close(self) -> None:
+        """Stop the workers and free the shared memory."""
+        for pipe in self._pipes:
+            try:
+                pipe.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join()
+        self._arrays = None
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self) -> "VectorEnv":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
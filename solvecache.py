@@ -0,0 +1,236 @@
+"""Persistent cache of solved positions, shared by processes and sessions.
+
+Solver results are stored in an SQLite database keyed by the Zobrist hash of
+the canonical form of the position (state.canonical_form), so positions that
+only differ by column order, foundation slots or a colour-preserving suit
+swap share one entry; moves are stored in the canonical column and
+foundation indexes and translated back on lookup. The canonical position is
+stored too and checked on lookup, so a hash collision is a miss, never a
+wrong answer. Only
+proven results are kept: WON with its winning line, and LOST. When a line is
+found, every position along it is stored with the rest of the line, so the
+next hints of a player following it are read from the cache.
+
+The database runs in WAL mode: any number of processes (batch workers, the
+game, a background hint thread) can read while one writes. Each thread and
+process opens its own connection. The least recently used positions are
+evicted once the cache holds more than max_entries. A lookup only reads:
+the hits are remembered and their recency written in one batch with the next
+put(), evict() or close() (or once HIT_BATCH hits are pending), so readers
+never wait for the write lock.
+
+Example:
+    >>> cache = SolveCache("solved.sqlite")
+    >>> result = Solver(max_seconds=5, cache=cache).solve(game)  # looks up first
+    >>> cache.get(game)  # (status, moves) or None
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+import time
+from array import array
+from moves import pack, unpack, relabel
+from state import canonical_form, zobrist_hash
+
+
+def data_dir() -> str:
+    """Per-user data directory of the game (not created here):
+    %LOCALAPPDATA%/solitaire on Windows, ~/Library/Application Support/solitaire
+    on macOS, $XDG_DATA_HOME/solitaire (~/.local/share/solitaire) elsewhere."""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Application Support")
+    else:
+        base = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    return os.path.join(base, "solitaire")
+
+
+DEFAULT_PATH = os.path.join(data_dir(), "solved.sqlite")
+
+# Pile separator in the stored positions (card ids are 0..51)
+_SEP = b"\xff"
+# Seconds a write waits for the lock held by another connection
+_TIMEOUT = 30
+# Pending hits that make get() write their recency itself
+HIT_BATCH = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS solved (
+    hash INTEGER PRIMARY KEY,
+    position BLOB NOT NULL,
+    status TEXT NOT NULL,
+    moves BLOB NOT NULL,
+    used INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS solved_used ON solved (used);
+"""
+
+
+def _signed(h: int) -> int:
+    """SQLite integers are signed 64-bit."""
+    return h - (1 << 64) if h >= 1 << 63 else h
+
+
+def _canonical(game) -> tuple:
+    """Return (hash, position, columns, foundations) of the canonical form
+    of the position of game (see state.canonical_form)."""
+    state, columns, foundations = canonical_form(game.state())
+    return _signed(zobrist_hash(state)), _SEP.join(state.piles()), columns, foundations
+
+
+def _pack_moves(moves: list, columns, foundations) -> bytes:
+    """Pack moves of a position into the indexes of its canonical form."""
+    to_canonical = [0] * 7
+    for i, column in enumerate(columns):
+        to_canonical[column] = i
+    to_foundation = [0] * 4
+    for i, foundation in enumerate(foundations):
+        to_foundation[foundation] = i
+    return array(
+        "I", (pack(*relabel(move, to_canonical, to_foundation), 0) for move in moves)
+    ).tobytes()
+
+
+def _unpack_moves(blob: bytes) -> list:
+    entries = array("I")
+    entries.frombytes(blob)
+    return [unpack(entry)[:4] for entry in entries]
+
+
+class SolveCache:
+    """Disk-backed store of solver results with LRU eviction.
+
+    Args:
+        path (str): SQLite database file, created with its directory if
+            needed (by default in the game's data_dir()).
+        max_entries (int): Number of positions kept; the least recently used
+            are evicted beyond it.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, max_entries: int = 1_000_000) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._puts = 0
+        # hash -> time of the last hit not yet written, shared by the threads
+        self._hits = {}
+        self._hits_lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Connection of the current thread (reopened after a fork)."""
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=_TIMEOUT, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            local.connection = connection
+            local.pid = os.getpid()
+        return local.connection
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT count(*) FROM solved").fetchone()[0]
+
+    def get(self, game) -> tuple | None:
+        """Return (status, moves) stored for the position of game, or None.
+        A database error (locked too long, unwritable file) is a miss."""
+        key, position, columns, foundations = _canonical(game)
+        try:
+            connection = self._connection()
+            row = connection.execute(
+                "SELECT position, status, moves FROM solved WHERE hash = ?", (key,)
+            ).fetchone()
+            if row is None or row[0] != position:
+                return None
+        except sqlite3.Error:
+            return None
+        with self._hits_lock:
+            self._hits[key] = time.time_ns()
+            full = len(self._hits) >= HIT_BATCH
+        if full:
+            # Never wait for the write lock on a lookup: if it is taken, the
+            # hits are written later
+            connection.execute("PRAGMA busy_timeout = 0")
+            try:
+                with connection:
+                    connection.execute("BEGIN IMMEDIATE")
+                    self._write_hits(connection)
+            except sqlite3.Error:
+                pass
+            finally:
+                connection.execute(f"PRAGMA busy_timeout = {_TIMEOUT * 1000}")
+        return row[1], [relabel(m, columns, foundations) for m in _unpack_moves(row[2])]
+
+    def put(self, game, status: str, moves: list = ()) -> None:
+        """Store a proven result (WON with its line, or LOST) for game.
+        For WON, the positions along the line are stored as well (played on
+        a clone, game is left untouched). Database errors are ignored: the
+        result is simply not cached."""
+        now = time.time_ns()
+        key, position, columns, foundations = _canonical(game)
+        rows = [(key, position, status, _pack_moves(moves, columns, foundations), now)]
+        if len(moves) > 1:
+            work = game.clone()
+            for i, move in enumerate(moves[:-1]):
+                work.apply(move)
+                key, position, columns, foundations = _canonical(work)
+                rest = _pack_moves(moves[i + 1 :], columns, foundations)
+                rows.append((key, position, status, rest, now))
+        try:
+            connection = self._connection()
+            with connection:
+                connection.execute("BEGIN IMMEDIATE")
+                self._write_hits(connection)
+                connection.executemany(
+                    "INSERT OR REPLACE INTO solved VALUES (?, ?, ?, ?, ?)", rows
+                )
+            self._puts += len(rows)
+            if self._puts >= 1000:
+                self._puts = 0
+                self.evict()
+        except sqlite3.Error:
+            pass
+
+    def _write_hits(self, connection: sqlite3.Connection) -> None:
+        """Write the recency of the pending hits (inside a transaction)."""
+        with self._hits_lock:
+            hits, self._hits = self._hits, {}
+        connection.executemany(
+            "UPDATE solved SET used = ? WHERE hash = ?",
+            [(used, key) for key, used in hits.items()],
+        )
+
+    def evict(self) -> None:
+        """Drop the least recently used positions beyond max_entries."""
+        connection = self._connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            self._write_hits(connection)
+            excess = len(self) - self.max_entries
+            if excess > 0:
+                connection.execute(
+                    "DELETE FROM solved WHERE hash IN "
+                    "(SELECT hash FROM solved ORDER BY used LIMIT ?)",
+                    (excess,),
+                )
+
+    def close(self) -> None:
+        """Write the pending hits and close the connection of the current
+        thread."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None and self._local.pid == os.getpid():
+            if self._hits:
+                try:
+                    with connection:
+                        connection.execute("BEGIN IMMEDIATE")
+                        self._write_hits(connection)
+                except sqlite3.Error:
+                    pass
+            connection.close()
+        self._local.pid = None
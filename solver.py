@@ -0,0 +1,243 @@
+"""Klondike solver: tells whether a position can still be won.
+
+The search is a depth-first search over GameController.legal_moves() with a
+transposition table of the positions already explored. It knows the hidden
+cards (it answers "is this deal winnable?", not "what should a player who
+cannot see the cards do?") and plays with the game rules: three-card draw
+and unlimited recycling of the discard pile.
+
+Only pruning rules that cannot lose a win are used, so when the search
+runs out of moves without hitting its budget the position is proven lost:
+    - a card that can safely go to a foundation is played as the only move,
+    - a run starting with a king is never moved from a column with no
+      hidden card to an empty column (it would give the same position),
+    - of several empty columns, only the first one is a move target.
+
+Positions equal up to the order of the columns and of the foundations are
+the same node: the transposition table is keyed by
+GameController.symmetric_zobrist, kept up to date by the game itself.
+
+Example:
+    >>> from game import GameController
+    >>> result = Solver(max_seconds=5).solve(GameController())
+    >>> result.status, len(result.moves), result.nodes_per_second
+"""
+
+import time
+from cartes import RANK, SUIT, COLOR
+from game import GameController
+from moves import (
+    DRAW,
+    RECYCLE,
+    DISCARD_TO_FOUNDATION,
+    DISCARD_TO_TABLEAU,
+    TABLEAU_TO_FOUNDATION,
+    TABLEAU_TO_TABLEAU,
+    FOUNDATION_TO_TABLEAU,
+)
+
+WON = "won"
+LOST = "lost"
+UNKNOWN = "unknown"
+
+class SolveResult:
+    """Outcome of a search.
+
+    Attributes:
+        status (str): WON, LOST (proven) or UNKNOWN (budget exhausted).
+        moves (list): Winning moves from the searched position, if WON.
+        nodes (int): Number of positions generated by the search.
+        elapsed (float): Search time in seconds.
+        cached (bool): True if the result was read from a SolveCache.
+    """
+
+    def __init__(
+        self,
+        status: str,
+        moves: list,
+        nodes: int,
+        elapsed: float,
+        cached: bool = False,
+    ) -> None:
+        self.status = status
+        self.moves = moves
+        self.nodes = nodes
+        self.elapsed = elapsed
+        self.cached = cached
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"SolveResult({self.status}, {len(self.moves)} moves, "
+            f"{self.nodes} nodes, {self.nodes_per_second:.0f} nodes/s)"
+        )
+
+
+def _is_safe_for_foundation(card: int, reached: list) -> bool:
+    """A card is safe to play on its foundation when no card that could
+    still need it in the tableau is left: both opposite-colour cards one rank
+    below, and the same-colour cards two ranks below, are already up."""
+    rank = RANK[card] + 1
+    if rank <= 2:
+        return True
+    colour = COLOR[card]
+    for suit in range(4):
+        if suit == SUIT[card]:
+            continue
+        needed = rank - 1 if suit // 2 != colour else rank - 2
+        if reached[suit] < needed:
+            return False
+    return True
+
+
+class Solver:
+    """Depth-first Klondike solver with a transposition table.
+
+    Args:
+        max_nodes (int, optional): Stop after generating this many positions.
+        max_seconds (float, optional): Stop after this many seconds.
+        should_stop (callable, optional): Polled during the search; returning
+            True stops it (used to cancel a background search).
+        cache (SolveCache, optional): Looked up before searching; proven
+            results are stored in it.
+        table (optional): Transposition table with "in" and add(), e.g.
+            shared between processes by parallel_solver; by default each
+            search uses a new set.
+    """
+
+    def __init__(
+        self,
+        max_nodes: int | None = None,
+        max_seconds: float | None = None,
+        should_stop=None,
+        cache=None,
+        table=None,
+    ) -> None:
+        self.max_nodes = max_nodes
+        self.max_seconds = max_seconds
+        self.should_stop = should_stop
+        self.cache = cache
+        self.table = table
+
+    def solve(self, game: GameController) -> SolveResult:
+        """Search a winning sequence from the current position of game.
+        The game itself is left untouched (the search runs on a clone)."""
+        if self.cache is None:
+            return self._search(game)
+        start = time.perf_counter()
+        hit = self.cache.get(game)
+        if hit is not None:
+            status, moves = hit
+            return SolveResult(status, moves, 0, time.perf_counter() - start, cached=True)
+        result = self._search(game)
+        if result.status != UNKNOWN:
+            self.cache.put(game, result.status, result.moves)
+        return result
+
+    def _search(self, game: GameController) -> SolveResult:
+        """The depth-first search itself."""
+        start = time.perf_counter()
+        deadline = start + self.max_seconds if self.max_seconds is not None else None
+        max_nodes = self.max_nodes
+        should_stop = self.should_stop
+
+        work = game.clone()
+        if work.is_won():
+            return SolveResult(WON, [], 0, 0.0)
+
+        seen = self.table if self.table is not None else set()
+        seen.add(work.symmetric_zobrist)
+        tokens = []
+        path = []
+        frames = [iter(self.ordered_moves(work))]
+        nodes = 0
+
+        while frames:
+            if nodes & 1023 == 0 and nodes:
+                if (
+                    (max_nodes is not None and nodes >= max_nodes)
+                    or (deadline is not None and time.perf_counter() >= deadline)
+                    or (should_stop is not None and should_stop())
+                ):
+                    return SolveResult(UNKNOWN, [], nodes, time.perf_counter() - start)
+
+            move = next(frames[-1], None)
+            if move is None:
+                frames.pop()
+                if tokens:
+                    work.unapply(tokens.pop())
+                    path.pop()
+                continue
+
+            token = work.apply(move)
+            nodes += 1
+            if work.is_won():
+                path.append(move)
+                return SolveResult(WON, path, nodes, time.perf_counter() - start)
+
+            key = work.symmetric_zobrist
+            if key in seen:
+                work.unapply(token)
+                continue
+            seen.add(key)
+            tokens.append(token)
+            path.append(move)
+            frames.append(iter(self.ordered_moves(work)))
+
+        return SolveResult(LOST, [], nodes, time.perf_counter() - start)
+
+    def ordered_moves(self, game: GameController) -> list:
+        """Return the moves worth searching from a position, best first."""
+        reached = [0, 0, 0, 0]
+        for pile in game.final_piles:
+            if pile.items:
+                reached[SUIT[pile.items[0].id]] = len(pile.items)
+
+        # Empty columns are interchangeable: only the first one is a target
+        empty = [i for i, (queue, _) in enumerate(game.grid.game) if not queue.items]
+        scored = []
+        for move in game.legal_moves():
+            kind, src, dst, count = move
+            if kind in (DISCARD_TO_TABLEAU, TABLEAU_TO_TABLEAU, FOUNDATION_TO_TABLEAU):
+                if dst in empty and dst != empty[0]:
+                    continue
+            if kind in (DISCARD_TO_FOUNDATION, TABLEAU_TO_FOUNDATION):
+                if kind == DISCARD_TO_FOUNDATION:
+                    card = game.discard_pile.items[-1].id
+                else:
+                    card = game.grid.game[src][0].items[-1].id
+                if _is_safe_for_foundation(card, reached):
+                    return [move]
+                scored.append((0, move))
+            elif kind == TABLEAU_TO_TABLEAU:
+                queue, stack = game.grid.game[src]
+                whole_run = count == len(queue.items)
+                if whole_run and not stack.items:
+                    if not game.grid.game[dst][0].items:
+                        continue  # king run to an empty column: same position
+                    scored.append((3, move))
+                elif whole_run:
+                    scored.append((1, move))  # reveals a hidden card
+                else:
+                    scored.append((5, move))
+            elif kind == DISCARD_TO_TABLEAU:
+                scored.append((2, move))
+            elif kind in (DRAW, RECYCLE):
+                scored.append((4, move))
+            elif kind == FOUNDATION_TO_TABLEAU:
+                scored.append((6, move))
+
+        scored.sort(key=lambda item: item[0])
+        return [move for _, move in scored]
+
+
+def solve(
+    game: GameController,
+    max_nodes: int | None = None,
+    max_seconds: float | None = None,
+) -> SolveResult:
+    """Shortcut for Solver(max_nodes, max_seconds).solve(game)."""
+    return Solver(max_nodes, max_seconds).solve(game)
@@ -0,0 +1,102 @@
+"""Card sprite cache: each card image is decoded, resized and rounded once.
+
+SolitaireApp asks the cache for a card face or for the card back at every
+redraw; only the first request of a (card, face, size) key touches the disk
+and PIL, later ones return the same ImageTk.PhotoImage. The cache also keeps
+the references Tkinter needs to avoid garbage collection of the images.
+"""
+
+from collections import OrderedDict
+from PIL import Image, ImageDraw, ImageTk
+from cartes import DECK_SIZE, family, height, RANK, SUIT
+
+CARD_SIZE = (100, 150)
+# Key used in place of a card id for the card back
+BACK = -1
+
+
+def round_corners(img: Image.Image, radius: int = 15) -> Image.Image:
+    """Arrondir les coins d'une image."""
+    # Créer un masque circulaire
+    mask = Image.new("L", img.size, 0)
+    draw = ImageDraw.Draw(mask)
+
+    # Dessiner les coins arrondis
+    draw.rounded_rectangle([(0, 0), img.size], radius=radius, fill=255)
+
+    # Appliquer le masque
+    img.putalpha(mask)
+    return img
+
+
+class SpriteCache:
+    """Bounded LRU cache of card PhotoImages keyed by (card, face, size).
+
+    Args:
+        directory (str): Folder holding {valeur}_{famille}.png and the back.
+        size (tuple): Default sprite size in pixels.
+        radius (int): Corner radius of the sprites.
+        max_entries (int): Maximum number of sprites kept; the least recently
+            used ones are dropped beyond it. The default holds the 52 faces
+            and the back in two sizes.
+    """
+
+    def __init__(
+        self,
+        directory: str = "assets/cartes",
+        size: tuple = CARD_SIZE,
+        radius: int = 5,
+        max_entries: int = 2 * (DECK_SIZE + 1),
+    ) -> None:
+        self.directory = directory
+        self.size = size
+        self.radius = radius
+        self.max_entries = max_entries
+        self._sprites = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sprites)
+
+    def get(
+        self, card_id: int, face: bool = True, size: tuple | None = None
+    ) -> ImageTk.PhotoImage:
+        """Return the sprite of a card face (or of the back if face is False)."""
+        key = (card_id if face else BACK, size or self.size)
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            sprite = self._load(*key)
+            self._sprites[key] = sprite
+            if len(self._sprites) > self.max_entries:
+                self._sprites.popitem(last=False)
+        else:
+            self._sprites.move_to_end(key)
+        return sprite
+
+    def back(self, size: tuple | None = None) -> ImageTk.PhotoImage:
+        """Return the card back sprite."""
+        return self.get(BACK, False, size)
+
+    def preload(self, size: tuple | None = None) -> None:
+        """Build the 52 faces and the back so redraws never touch the disk."""
+        self.back(size)
+        for card_id in range(DECK_SIZE):
+            self.get(card_id, True, size)
+
+    def invalidate(self, size: tuple | None = None) -> None:
+        """Drop every sprite, or only those of one size."""
+        if size is None:
+            self._sprites.clear()
+        else:
+            for key in [k for k in self._sprites if k[1] == size]:
+                del self._sprites[key]
+
+    def _load(self, card_id: int, size: tuple) -> ImageTk.PhotoImage:
+        """Decode, resize and round one sprite."""
+        if card_id == BACK:
+            img = Image.open(f"{self.directory}/dos_de_carte.jpg")
+        else:
+            img = Image.open(
+                f"{self.directory}/{height[RANK[card_id]]}_{family[SUIT[card_id]]}.png"
+            )
+        img = round_corners(img.resize(size), radius=self.radius)
+        return ImageTk.PhotoImage(img)
@@ -0,0 +1,170 @@
+"""Immutable game positions and their Zobrist hash.
+
+GameState is a compact, hashable snapshot of a position, exported by
+GameController.state() and loaded back with GameController.set_state(). Two
+states are equal when every pile holds the same cards in the same order, so
+states can key dicts and sets directly.
+
+The Zobrist hash of a position is the XOR of one random 64-bit key per card,
+chosen by the pile slot holding the card and its depth in the pile (see
+SLOTS). GameController keeps it up to date on every push and pop, so reading
+GameController.zobrist costs nothing, whatever the size of the position.
+
+Positions that only differ by the order of the columns, by which
+foundation slot holds which suit, or by a relabelling of the suits that keeps
+colours paired (spades/clubs, diamonds/hearts, or the two colours swapped)
+play exactly the same. canonical() picks one representative of each such
+class, for caches shared between deals (SolveCache is keyed by it;
+canonical_form() also tells where each column and foundation went, to
+translate moves). symmetric_hash() ignores the order of
+columns and foundations only; GameController keeps it up to date as
+symmetric_zobrist for searches, where suit relabellings of a position never
+come up (every card of a deal is in a known place).
+
+Example:
+    >>> game = GameController(seed=1)
+    >>> state = game.state()
+    >>> game.draw_from_stock(); game.undo_move()
+    >>> game.state() == state, game.zobrist == zobrist_hash(state)
+    (True, True)
+"""
+
+import random
+from collections import namedtuple
+from itertools import permutations
+from cartes import DECK_SIZE
+
+# Pile slots of the hash: stock, discard, the four foundations, then the
+# visible run and the hidden cards of the seven columns.
+STOCK_SLOT = 0
+DISCARD_SLOT = 1
+FOUNDATION_SLOT = 2
+COLUMN_SLOT = 6
+HIDDEN_SLOT = 13
+SLOTS = 20
+# No pile of a legal position holds more cards than this (stock or discard)
+MAX_DEPTH = 24
+
+# Slot whose keys the symmetric hash uses for each slot: every foundation
+# uses the first one's, every column the first column's.
+SYMMETRIC_SLOT = (
+    [STOCK_SLOT, DISCARD_SLOT]
+    + [FOUNDATION_SLOT] * 4
+    + [COLUMN_SLOT] * 7
+    + [HIDDEN_SLOT] * 7
+)
+
+_MASK = (1 << 64) - 1
+
+# ZOBRIST[(slot * MAX_DEPTH + depth) * DECK_SIZE + card]; a fixed seed keeps
+# hashes stable between runs and processes.
+_rng = random.Random(0x5EED)
+ZOBRIST = [_rng.getrandbits(64) for _ in range(SLOTS * MAX_DEPTH * DECK_SIZE)]
+del _rng
+
+
+class GameState(
+    namedtuple("GameState", "stock discard foundations columns hidden")
+):
+    """A position as card ids, every pile bottom to top.
+
+    Attributes:
+        stock (bytes): Stock (the top card is drawn first).
+        discard (bytes): Discard pile.
+        foundations (tuple): Four bytes, one per foundation.
+        columns (tuple): Seven bytes, the face-up cards of each column.
+        hidden (tuple): Seven bytes, the face-down cards of each column.
+    """
+
+    __slots__ = ()
+
+    def piles(self) -> list:
+        """Return the piles in hash slot order."""
+        return [self.stock, self.discard, *self.foundations, *self.columns, *self.hidden]
+
+
+# Suit relabellings that keep colours paired (suits 0-1 are black, 2-3 are
+# red), as bytes.translate tables over card ids. The identity comes first.
+_SUIT_TABLES = [
+    bytes(perm[suit] * 13 + rank for suit in range(4) for rank in range(13))
+    + bytes(range(DECK_SIZE, 256))
+    for perm in permutations(range(4))
+    if perm[0] // 2 == perm[1] // 2
+]
+
+
+def zobrist_hash(state: GameState) -> int:
+    """Compute the Zobrist hash of a state from scratch."""
+    h = 0
+    for slot, pile in enumerate(state.piles()):
+        base = slot * MAX_DEPTH
+        for depth, card in enumerate(pile):
+            h ^= ZOBRIST[(base + depth) * DECK_SIZE + card]
+    return h
+
+
+def mix64(h: int) -> int:
+    """Scramble a 64-bit hash (splitmix64 finaliser), so that XORing mixed
+    column hashes keeps track of which cards share a column."""
+    h = ((h ^ (h >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    h = ((h ^ (h >> 27)) * 0x94D049BB133111EB) & _MASK
+    return h ^ (h >> 31)
+
+
+def symmetric_parts(state: GameState) -> tuple:
+    """Return (base, column hashes) of the symmetric hash: base covers the
+    stock, the discard and the foundations, then one hash per column."""
+    base = 0
+    columns = [0] * 7
+    for slot, pile in enumerate(state.piles()):
+        offset = SYMMETRIC_SLOT[slot] * MAX_DEPTH
+        h = 0
+        for depth, card in enumerate(pile):
+            h ^= ZOBRIST[(offset + depth) * DECK_SIZE + card]
+        if slot < COLUMN_SLOT:
+            base ^= h
+        else:
+            columns[(slot - COLUMN_SLOT) % 7] ^= h
+    return base, columns
+
+
+def combine_symmetric(base: int, columns: list) -> int:
+    """Symmetric hash from its parts (see symmetric_parts)."""
+    for h in columns:
+        base ^= mix64(h)
+    return base
+
+
+def symmetric_hash(state: GameState) -> int:
+    """Hash of a state that ignores the order of columns and foundations."""
+    return combine_symmetric(*symmetric_parts(state))
+
+
+def canonical_form(state: GameState) -> tuple:
+    """Return (canonical state, columns, foundations) for state, where
+    columns[i] and foundations[i] are the indexes in state of column i and
+    foundation i of the canonical state (to map moves between the two)."""
+    best = None
+    for table in _SUIT_TABLES:
+        hidden = [pile.translate(table) for pile in state.hidden]
+        visible = [pile.translate(table) for pile in state.columns]
+        found = [pile.translate(table) for pile in state.foundations]
+        columns = sorted(range(7), key=lambda i: (hidden[i], visible[i]))
+        foundations = sorted(range(4), key=found.__getitem__)
+        candidate = GameState(
+            state.stock.translate(table),
+            state.discard.translate(table),
+            tuple(found[i] for i in foundations),
+            tuple(visible[i] for i in columns),
+            tuple(hidden[i] for i in columns),
+        )
+        if best is None or candidate < best[0]:
+            best = (candidate, columns, foundations)
+    return best
+
+
+def canonical(state: GameState) -> GameState:
+    """Return the representative of the positions equivalent to state: the
+    smallest of its suit relabellings, each with sorted columns and sorted
+    foundations."""
+    return canonical_form(state)[0]
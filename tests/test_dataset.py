@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from dataset import (  # noqa: E402
+    POSITION_SIZE,
+    Dataset,
+    DatasetWriter,
+    decode_state,
+    encode_state,
+    export,
+    export_chunk,
+)
+from game import GameController  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def concat(chunks: list) -> dict:
+    return {name: np.concatenate([c[name] for c in chunks]) for name in chunks[0]}
+
+
+def assert_rows(data: Dataset, rows: dict) -> None:
+    assert len(data) == len(rows["positions"])
+    for name, expected in rows.items():
+        assert (data.read(name, 0, len(data)) == expected).all(), name
+
+
+def test_encode_decode_round_trip():
+    game = GameController(2)
+    row = np.empty(POSITION_SIZE, np.int8)
+    for _ in range(40):
+        encode_state(game.state(), row)
+        assert decode_state(row) == game.state()
+        game.apply(next(iter(game.legal_moves())))
+
+
+def test_writer_spreads_rows_over_shards(tmp_path):
+    rows = export_chunk([1, 2, 3], "selfplay", {})
+    n = len(rows["positions"])
+    with DatasetWriter(str(tmp_path), shard_size=n // 2 + 1) as writer:
+        writer.append(rows)
+        writer.append(rows)
+    data = Dataset(str(tmp_path))
+    assert [s["rows"] for s in data.manifest["shards"]][-1] < n // 2 + 1
+    assert_rows(data, concat([rows, rows]))
+    # Reading across a shard boundary
+    start, stop = n // 2 - 2, n // 2 + 3
+    assert (data.read("seeds", start, stop) == rows["seeds"][start:stop]).all()
+
+
+def test_export_matches_export_chunk(tmp_path):
+    written = export(
+        str(tmp_path), (s for s in range(12)), "selfplay", workers=2, chunk_size=2, log=None
+    )
+    rows = export_chunk(list(range(12)), "selfplay", {})
+    assert written == len(rows["positions"])
+    assert_rows(Dataset(str(tmp_path)), rows)
+
+
+def test_interrupted_export_resumes(tmp_path):
+    path = str(tmp_path)
+    # A writer killed without close(): only its checkpoints are in the manifest
+    script = (
+        "import os\n"
+        "from dataset import DatasetWriter, export_chunk\n"
+        f"writer = DatasetWriter({path!r}, shard_size=1000, checkpoint_seconds=0)\n"
+        "for seed in range(4):\n"
+        "    writer.append(export_chunk([seed], 'selfplay', {}))\n"
+        "os._exit(0)\n"
+    )
+    subprocess.run([sys.executable, "-c", script], cwd=ROOT, check=True)
+    first = concat([export_chunk([seed], "selfplay", {}) for seed in range(4)])
+    assert_rows(Dataset(path), first)
+
+    # Resuming appends the remaining seeds after the recorded rows
+    export(path, range(4, 8), "selfplay", workers=1, shard_size=1000, log=None)
+    assert_rows(Dataset(path), concat([first, export_chunk(list(range(4, 8)), "selfplay", {})]))
@@ -0,0 +1,41 @@
+from game import GameController
+from moves import TABLEAU_TO_FOUNDATION
+from state import GameState
+
+
+def one_king_left() -> GameState:
+    """Every card on its foundation but the king of suit 0, alone in column 0."""
+    foundations = (bytes(range(12)),) + tuple(
+        bytes(range(suit * 13, suit * 13 + 13)) for suit in (1, 2, 3)
+    )
+    columns = (bytes([12]),) + (b"",) * 6
+    return GameState(b"", b"", foundations, columns, (b"",) * 7)
+
+
+def test_manual_win_emits_victory():
+    game = GameController.from_state(one_king_left())
+    events = []
+    game.subscribe("victory", lambda: events.append("victory"))
+    game.subscribe("auto_complete", events.append)
+    game.apply((TABLEAU_TO_FOUNDATION, 0, 0, 1))
+    assert game.is_won()
+    assert game.check_and_auto_complete() is False
+    assert events == ["victory"]
+
+
+def test_manual_win_through_move_card():
+    game = GameController.from_state(one_king_left())
+    events = []
+    game.subscribe("victory", lambda: events.append("victory"))
+    assert game.move_card(game.grid.queue[0], game.final_piles[0])
+    assert game.is_won()
+    assert events == ["victory"]
+
+
+def test_auto_complete_emits_victory_once():
+    game = GameController.from_state(one_king_left())
+    events = []
+    game.subscribe("victory", lambda: events.append("victory"))
+    assert game.check_and_auto_complete()
+    assert game.is_won()
+    assert events == ["victory"]
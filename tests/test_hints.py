@@ -0,0 +1,43 @@
+import random
+import time
+from game import GameController
+from hints import HintService, determinize
+from state import GameState
+
+
+def test_determinize_only_shuffles_unknown_cards():
+    game = GameController(4)
+    rng = random.Random(0)
+    for _ in range(10):
+        game.apply(rng.choice(list(game.legal_moves())))
+    state = game.state()
+    worlds = [determinize(game, rng).state() for _ in range(5)]
+    for world in worlds:
+        assert (world.discard, world.foundations, world.columns) == (
+            state.discard,
+            state.foundations,
+            state.columns,
+        )
+        assert [len(pile) for pile in world.hidden] == [len(pile) for pile in state.hidden]
+        if game.stock_seen:
+            assert world.stock == state.stock
+        unknown = sorted(b"".join(world.hidden) + world.stock)
+        assert unknown == sorted(b"".join(state.hidden) + state.stock)
+    assert any(world.hidden != state.hidden for world in worlds)
+
+
+def test_hint_is_exact_when_every_card_is_visible():
+    foundations = (bytes(range(12)),) + tuple(
+        bytes(range(suit * 13, suit * 13 + 13)) for suit in (1, 2, 3)
+    )
+    state = GameState(b"", b"", foundations, (bytes([12]),) + (b"",) * 6, (b"",) * 7)
+    service = HintService(max_seconds=2)
+    service.start(GameController.from_state(state))
+    results = []
+    deadline = time.perf_counter() + 5
+    while service.running and time.perf_counter() < deadline:
+        results += service.poll()
+        time.sleep(0.01)
+    hint, final = results[-1]
+    assert final
+    assert hint["solver"] == "won" and hint["exact"] and hint["samples"] == 1
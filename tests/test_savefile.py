@@ -0,0 +1,156 @@
+import random
+import pytest
+from game import GameController
+from savefile import (
+    MAGIC,
+    ReplayReader,
+    ReplayWriter,
+    decode_record,
+    encode_record,
+    record_of,
+    replay,
+    restore,
+)
+
+
+def play(game: GameController, moves: int, seed: int = 0) -> list:
+    """Play random legal moves, journaled as a player's moves; return the
+    states met, the start included."""
+    rng = random.Random(seed)
+    states = [game.state()]
+    for _ in range(moves):
+        game._play(*rng.choice(list(game.legal_moves())))
+        states.append(game.state())
+    return states
+
+
+def same_game(a: GameController, b: GameController) -> bool:
+    return (
+        a.seed == b.seed
+        and a.turns == b.turns
+        and a.state() == b.state()
+        and list(a.save.history) == list(b.save.history)
+        and list(a.save.redo_history) == list(b.save.redo_history)
+    )
+
+
+@pytest.mark.parametrize("snapshot_every", [0, 7])
+def test_save_load_round_trip(tmp_path, snapshot_every):
+    game = GameController(11)
+    play(game, 60)
+    game.undo_move()
+    game.undo_move()
+    path = str(tmp_path / "game.sol")
+    game.save_game(path, snapshot_every)
+    loaded = GameController.load_game(path)
+    assert same_game(loaded, game)
+    loaded.redo_move()
+    game.redo_move()
+    assert loaded.state() == game.state()
+
+
+@pytest.mark.parametrize("snapshot_every", [0, 16])
+def test_load_at_move_then_redo(tmp_path, snapshot_every):
+    game = GameController(7)
+    states = play(game, 50)
+    path = str(tmp_path / "game.sol")
+    game.save_game(path, snapshot_every)
+    for move in (0, 1, 16, 17, 33, 50):
+        loaded = GameController.load_game(path, move=move)
+        assert loaded.state() == states[move]
+        assert len(loaded.save.history) == move
+        for expected in states[move + 1 :]:
+            loaded.redo_move()
+            assert loaded.state() == expected
+        assert loaded.state() == game.state()
+
+
+def test_game_started_from_set_state(tmp_path):
+    game = GameController(5)
+    game.set_state(GameController(9).state())
+    play(game, 30)
+    path = str(tmp_path / "game.sol")
+    game.save_game(path)
+    assert GameController.load_game(path).state() == game.state()
+
+
+@pytest.mark.parametrize("seed", [0, -1, -123456789, 2**40])
+def test_any_int_seed(tmp_path, seed):
+    game = GameController(seed)
+    play(game, 20)
+    path = str(tmp_path / "game.sol")
+    game.save_game(path)
+    loaded = GameController.load_game(path)
+    assert same_game(loaded, game)
+    assert GameController.load_game(path, move=0).state() == GameController(seed).state()
+
+
+def test_record_encoding_round_trip():
+    game = GameController(3)
+    play(game, 40)
+    game.undo_move()
+    record = record_of(game, snapshot_every=10)
+    assert decode_record(encode_record(record)) == record
+
+
+def test_replay_yields_every_position():
+    game = GameController(8)
+    states = play(game, 25)
+    positions = [position.state() for _, position in replay(record_of(game))]
+    assert positions == states[1:]
+
+
+@pytest.fixture
+def archive(tmp_path):
+    path = str(tmp_path / "games.sol")
+    finals = []
+    with ReplayWriter(path) as out:
+        for seed in range(30):
+            game = GameController(seed)
+            play(game, 20 + seed, seed)
+            out.write(game, snapshot_every=8 if seed % 2 else 0)
+            finals.append(game.state())
+    return path, finals
+
+
+def test_reader_iterates_indexes_and_skips(archive):
+    path, finals = archive
+    with ReplayReader(path) as reader:
+        assert len(reader) == 30
+        assert restore(reader[17]).state() == finals[17]
+        assert restore(reader[3]).state() == finals[3]
+        assert [restore(r).state() for r in reader.skip(25)] == finals[25:]
+        assert [restore(r).state() for r in reader] == finals
+        with pytest.raises(IndexError):
+            reader[30]
+
+
+def test_writer_appends_to_an_existing_file(archive):
+    path, finals = archive
+    with ReplayWriter(path) as out:
+        out.write(GameController(99))
+    with ReplayReader(path) as reader:
+        assert len(reader) == 31
+        assert reader[30].seed == 99
+
+
+def test_truncated_tail_is_dropped(archive, tmp_path):
+    path, finals = archive
+    with open(path, "rb") as f:
+        data = f.read()
+    cut = str(tmp_path / "cut.sol")
+    with open(cut, "wb") as f:
+        f.write(data[:-5])
+    with ReplayReader(cut) as reader:
+        assert [restore(r).state() for r in reader] == finals[:-1]
+    with ReplayReader(cut) as reader:
+        assert len(reader) == 29
+        with pytest.raises(IndexError):
+            reader[29]
+
+
+def test_not_a_save_file(tmp_path):
+    path = tmp_path / "other.sol"
+    path.write_bytes(b"not" + MAGIC)
+    with pytest.raises(ValueError):
+        ReplayReader(str(path))
@@ -0,0 +1,129 @@
+import sqlite3
+import time
+import pytest
+import solvecache
+from game import GameController
+from solver import Solver, WON
+from solvecache import SolveCache
+from state import GameState, _SUIT_TABLES, canonical, canonical_form
+
+
+def symmetric(state: GameState, table: bytes, columns: list, foundations: list) -> GameState:
+    """state with its suits relabelled by table, column i taken from
+    columns[i] and foundation i from foundations[i]."""
+    return GameState(
+        state.stock.translate(table),
+        state.discard.translate(table),
+        tuple(state.foundations[i].translate(table) for i in foundations),
+        tuple(state.columns[i].translate(table) for i in columns),
+        tuple(state.hidden[i].translate(table) for i in columns),
+    )
+
+
+@pytest.fixture(scope="module")
+def solved():
+    """A deal with a winning line, and the position 40 moves along it."""
+    game = GameController(10)
+    result = Solver(max_nodes=100_000).solve(game)
+    assert result.status == WON
+    for move in result.moves[:40]:
+        game.apply(move)
+    return game, result.moves[40:]
+
+
+def test_canonical_form_maps_piles(solved):
+    state = solved[0].state()
+    form, columns, foundations = canonical_form(state)
+    assert form == canonical(state)
+    for table in _SUIT_TABLES:
+        other = symmetric(state, table, [3, 0, 6, 1, 5, 2, 4], [2, 0, 3, 1])
+        assert canonical(other) == form
+    # columns[i] is the column of state that became column i of the form
+    assert sorted(columns) == list(range(7)) and sorted(foundations) == list(range(4))
+    assert [len(form.hidden[i]) for i in range(7)] == [len(state.hidden[c]) for c in columns]
+
+
+def test_hit_after_permuting_columns_and_swapping_suits(solved, tmp_path):
+    game, moves = solved
+    cache = SolveCache(str(tmp_path / "solved.sqlite"))
+    cache.put(game, WON, moves)
+    for table in _SUIT_TABLES:
+        state = symmetric(game.state(), table, [3, 0, 6, 1, 5, 2, 4], [2, 0, 3, 1])
+        other = GameController.from_state(state)
+        hit = cache.get(other)
+        assert hit is not None and hit[0] == WON
+        for move in hit[1]:
+            assert move in list(other.legal_moves())
+            other.apply(move)
+        assert other.is_won()
+    cache.close()
+
+
+def test_positions_along_the_line_are_cached(solved, tmp_path):
+    game, moves = solved
+    cache = SolveCache(str(tmp_path / "solved.sqlite"))
+    cache.put(game, WON, moves)
+    work = game.clone()
+    for move in moves[:-1]:
+        work.apply(move)
+        status, rest = cache.get(work)
+        assert status == WON
+        # The stored line wins from there (equal empty columns may swap indexes)
+        line = work.clone()
+        for step in rest:
+            line.apply(step)
+        assert line.is_won()
+    cache.close()
+
+
+def test_solver_reads_the_cache(solved, tmp_path):
+    game, moves = solved
+    cache = SolveCache(str(tmp_path / "solved.sqlite"))
+    cache.put(game, WON, moves)
+    result = Solver(max_nodes=1, cache=cache).solve(game)
+    assert result.cached and result.status == WON
+    cache.close()
+
+
+def used(path: str) -> dict:
+    connection = sqlite3.connect(path)
+    try:
+        return dict(connection.execute("SELECT hash, used FROM solved"))
+    finally:
+        connection.close()
+
+
+def test_hits_are_written_in_batches(solved, tmp_path):
+    game, moves = solved
+    path = str(tmp_path / "solved.sqlite")
+    cache = SolveCache(path)
+    cache.put(game, WON, moves)
+    before = used(path)
+    assert cache.get(game) is not None
+    # A lookup does not write
+    assert used(path) == before
+    # The next write carries the recency of the hits
+    cache.evict()
+    after = used(path)
+    assert sum(after[key] != before[key] for key in before) == 1
+    cache.close()
+
+
+def test_lookup_never_waits_for_the_write_lock(solved, tmp_path, monkeypatch):
+    game, moves = solved
+    path = str(tmp_path / "solved.sqlite")
+    cache = SolveCache(path)
+    cache.put(game, WON, moves)
+    monkeypatch.setattr(solvecache, "HIT_BATCH", 1)
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    start = time.perf_counter()
+    assert cache.get(game) is not None
+    assert time.perf_counter() - start < 1
+    other.execute("COMMIT")
+    other.close()
+    before = used(path)
+    # Written by the next full batch, once the lock is free
+    assert cache.get(game) is not None
+    assert used(path) != before
+    cache.close()